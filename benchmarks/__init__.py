@@ -0,0 +1,16 @@
+"""
+Performance benchmarks of the render pipeline, headless (EGL surfaceless on
+machines without a display, e.g. Mesa llvmpipe).
+
+    python -m benchmarks run -o results.json            # every suite
+    python -m benchmarks run --quick -k "padding.*"     # smaller sizes, one suite
+    python -m benchmarks compare base.json results.json # exit code 1 on regressions
+
+Suites (one module each, registered in harness.SUITES): geometry, layers,
+compositing, incremental, export, readback, padding, png, textures, blur,
+project_io, batch, startup.
+"""
+# Registration order is the run order
+from benchmarks import (bench_geometry, bench_layers, bench_compositing, bench_incremental,  # noqa: F401
+                        bench_export, bench_readback, bench_padding, bench_png, bench_textures, bench_blur,
+                        bench_project_io, bench_batch, bench_startup)
@@ -0,0 +1,82 @@
+"""Command line of the benchmark suite, see benchmarks/__init__.py"""
+# Must come before anything that imports OpenGL (selects EGL on machines without a display)
+from src.core import headless
+
+import argparse
+import sys
+
+import benchmarks  # noqa: F401 (registers the suites)
+from benchmarks import harness
+
+
+def _cmd_run(args):
+    unknown = sorted(set(args.suites) - set(harness.SUITES))
+    if unknown:
+        print(f"Unknown suite(s): {', '.join(unknown)} (available: {', '.join(harness.SUITES)})")
+        return 2
+    bench = harness.Bench(quick=args.quick, patterns=args.filter, backend=args.backend)
+    try:
+        data = bench.run(args.suites)
+    finally:
+        bench.release()
+    if args.output:
+        harness.save_results(data, args.output)
+        print(f"Results: {args.output} ({len(data['results'])} cases)")
+    if data["errors"]:
+        print(f"{len(data['errors'])} case(s) failed")
+        return 1
+    return 0
+
+
+def _cmd_compare(args):
+    base = harness.load_results(args.base)
+    new = harness.load_results(args.new)
+    if base.get("quick") != new.get("quick"):
+        print("Warning: comparing a --quick run with a full run")
+    rows = harness.compare(base, new, args.tolerance, args.min_delta)
+    print(harness.format_comparison(rows))
+    return 1 if any(row[4] == "regression" for row in rows) else 0
+
+
+def _cmd_list(args):
+    for name in harness.SUITES:
+        print(name)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Matcap Maker benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmark suites")
+    run.add_argument("suites", nargs="*", metavar="suite",
+                     help=f"Suites to run (default: all): {', '.join(harness.SUITES)}")
+    run.add_argument("-o", "--output", help="Write the results as JSON")
+    run.add_argument("-k", "--filter", action="append",
+                     help="Only cases matching this glob, e.g. 'compositing.depth_*' (repeatable)")
+    run.add_argument("--quick", action="store_true", help="Smaller sizes and fewer cases (CI, smoke tests)")
+    run.add_argument("--backend", choices=("auto",) + headless.HeadlessContext.BACKENDS, default="auto",
+                     help="Headless GL backend (default: auto)")
+    run.set_defaults(func=_cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare two result files")
+    compare.add_argument("base", help="Baseline results (JSON)")
+    compare.add_argument("new", help="Results to check (JSON)")
+    compare.add_argument("-t", "--tolerance", type=float, default=harness.DEFAULT_TOLERANCE,
+                         help=f"Relative slowdown flagged as a regression (default: {harness.DEFAULT_TOLERANCE})")
+    compare.add_argument("--min-delta", type=float, default=harness.DEFAULT_MIN_DELTA_MS,
+                         help=f"Ignore differences below this many ms (default: {harness.DEFAULT_MIN_DELTA_MS})")
+    compare.set_defaults(func=_cmd_compare)
+
+    list_cmd = sub.add_parser("list", help="List the suites")
+    list_cmd.set_defaults(func=_cmd_list)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
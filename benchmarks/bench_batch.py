@@ -0,0 +1,68 @@
+"""
+Batch export scaling: a fixed generated corpus of projects rendered by
+`python -m src.cli render` with 1, 2, 4 and 8 worker processes. The time is
+the manifest's total_ms (without interpreter startup). Worker counts above
+the number of CPU cores show the oversubscription cost.
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+
+from benchmarks.harness import ROOT, suite
+
+
+def generate_corpus(root, count, seed=1234):
+    """Same seed -> same projects (3-8 layers of the procedural types) -> project.json paths"""
+    import src.layers  # noqa: F401 (registers the layer types with LayerRegistry)
+    from src.core.layer_stack import LayerStack
+    from src.core.project_io import ProjectIO
+    from src.layers.base_layer import BaseLayer
+    from src.layers.spot_light_layer import SpotLightLayer
+    from src.layers.fresnel_layer import FresnelLayer
+    from src.layers.noise_layer import NoiseLayer
+
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        stack = LayerStack()
+        base = BaseLayer()
+        base.base_color = [rng.random() for _ in range(3)]
+        stack.add_layer(base)
+        for _ in range(rng.randint(2, 7)):
+            layer = rng.choice((SpotLightLayer, FresnelLayer, NoiseLayer))()
+            layer.blend_mode = rng.choice(("Normal", "Add", "Multiply", "Screen"))
+            stack.add_layer(layer)
+        project_dir = os.path.join(root, f"project_{i:04d}")
+        ProjectIO.save_project(project_dir, stack)
+        paths.append(os.path.join(project_dir, "project.json"))
+    return paths
+
+
+@suite("batch")
+def run(bench):
+    count = bench.pick(64, 8)
+    resolution = bench.pick(512, 256)
+    with bench.quiet():
+        projects = generate_corpus(bench.path("batch_projects"), count)
+
+    for workers in bench.pick((1, 2, 4, 8), (1, 2)):
+        name = f"workers_{workers}"
+        if not bench.selected(f"batch.{name}"):
+            continue
+        out_dir = bench.path(f"batch_out_{workers}")
+        try:
+            subprocess.run([sys.executable, "-m", "src.cli", "render", *projects, "-o", out_dir,
+                            "-r", str(resolution), "-p", "4", "-j", str(workers)],
+                           cwd=ROOT, capture_output=True, text=True, timeout=1800, check=True)
+            with open(os.path.join(out_dir, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            bench.fail(name, e)
+            continue
+        if manifest["failed"]:
+            bench.fail(name, f"{manifest['failed']} project(s) failed")
+            continue
+        bench.record(name, [manifest["total_ms"]], {"projects": count, "resolution": resolution,
+                                                    "workers": workers, "cpu_count": os.cpu_count()})
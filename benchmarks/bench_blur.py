@@ -0,0 +1,48 @@
+"""
+Frame time of a blurred image layer: with the blur unchanged (the blurred
+copy of the image is reused) and with the blur changing every frame (one
+blurred copy made per frame, see src.core.texture_blur).
+"""
+import itertools
+
+from benchmarks.harness import suite
+
+
+@suite("blur")
+def run(bench):
+    from src.core.layer_stack import LayerStack
+    from src.core.resource_manager import ResourceManager
+    from src.layers.base_layer import BaseLayer
+    from src.layers.image_layer import ImageLayer
+
+    renderer = bench.renderer
+    size = bench.pick(2048, 512)
+    image_size = bench.pick(2048, 512)
+    params = {"size": size, "image_size": image_size}
+
+    stack = LayerStack()
+    stack.add_layer(BaseLayer())
+    layer = ImageLayer()
+    layer.image_path = bench.image(image_size)
+    layer.blur = 1.0
+    stack.add_layer(layer)
+    with bench.quiet():
+        renderer.render(stack, size, size)
+
+    def frame():
+        return renderer.render(stack, size, size)
+
+    bench.measure("unchanged", frame, setup=layer.mark_dirty, params=params)
+
+    # Blurred copies are cached per 1/64 step: every frame gets a step not made yet
+    steps = itertools.count(1)
+
+    def new_blur():
+        layer.blur = next(steps) / ImageLayer.BLUR_STEPS
+        layer.mark_dirty()
+
+    bench.measure("changed", frame, setup=new_blur, params=params)
+
+    for l in stack:
+        l.release()
+    ResourceManager().release_texture(layer.image_path)
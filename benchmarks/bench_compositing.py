@@ -0,0 +1,37 @@
+"""
+Compositing cost against stack depth at 512x512: a full re-render and a frame
+where only the top layer changed (incremental compositing resumes below it).
+"""
+from benchmarks.harness import suite
+from benchmarks.scenes import build_stack, release_stack
+
+SIZE = 512
+
+
+@suite("compositing")
+def run(bench):
+    renderer = bench.renderer
+    engine = renderer.engine
+    engine.resize(SIZE, SIZE)
+
+    for depth in bench.pick((1, 10, 25, 50, 100), (1, 10, 25)):
+        stack = build_stack(depth)
+        renderer.initialize_layers(stack)
+        params = {"size": SIZE, "layers": depth}
+        repeat = 3 if depth >= 50 else 5
+
+        def full():
+            engine.compositor.invalidate()
+            engine.render(stack)
+
+        bench.measure(f"depth_{depth}", full, repeat=repeat, gpu=True, params=params)
+
+        top = stack[len(stack) - 1]
+
+        def edit_top():
+            top.mark_dirty()
+            engine.render(stack)
+
+        engine.render(stack)
+        bench.measure(f"depth_{depth}_edit_top", edit_top, repeat=repeat, gpu=True, params=params)
+        release_stack(stack)
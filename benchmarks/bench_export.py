@@ -0,0 +1,38 @@
+"""
+Export of a 12-layer stack: offscreen render with 4px padding and readback
+(render_*), and the same written to a PNG file (png_*).
+"""
+from benchmarks.harness import suite
+from benchmarks.scenes import build_stack, release_stack
+
+LAYERS = 12
+PADDING = 4
+
+
+@suite("export")
+def run(bench):
+    renderer = bench.renderer
+    engine = renderer.engine
+    # Padding pass as in batch exports: NumPy on software rasterizers, jump flooding on GPUs
+    engine.set_gpu_padding(not renderer.context.software)
+    stack = build_stack(LAYERS)
+    renderer.initialize_layers(stack)
+
+    for size in bench.pick((512, 2048, 4096), (512,)):
+        params = {"size": size, "layers": LAYERS, "padding": PADDING}
+        repeat = 1 if size >= 4096 else 3
+        # Pooled compositors skip stacks they have already rendered
+        invalidate = engine.offscreen_pool.invalidate
+
+        def render():
+            with renderer.map_pixels(stack, size, size, padding=PADDING) as pixels:
+                return int(pixels[0, 0, 3])
+
+        bench.measure(f"render_{size}", render, repeat=repeat, setup=invalidate, params=params)
+
+        path = bench.path(f"export_{size}.png")
+        bench.measure(f"png_{size}", lambda: engine.save_offscreen(path, size, size, stack, preview_mode_override=0,
+                                                                   force_no_normal=True, padding=PADDING),
+                      repeat=repeat, setup=invalidate, params=params)
+        engine.offscreen_pool.clear()
+    release_stack(stack)
@@ -0,0 +1,59 @@
+"""
+Sphere mesh generation: the vectorized GeometryEngine.generate_sphere (memo
+cleared) against the per-vertex loop it replaced (loop_*), and the first
+upload of the mesh.
+"""
+import math
+
+from benchmarks.harness import suite
+
+
+def loop_sphere(radius=1.0, stacks=30, sectors=30, offset_x=0.0):
+    """Reference: the list.extend generator GeometryEngine used before vectorization"""
+    import numpy as np
+
+    vertices = []
+    indices = []
+    for i in range(stacks + 1):
+        lat = math.pi * i / stacks
+        y = math.cos(lat)
+        r_plane = math.sin(lat)
+        for j in range(sectors + 1):
+            lon = 2 * math.pi * j / sectors
+            x = r_plane * math.cos(lon)
+            z = r_plane * math.sin(lon)
+            vertices.extend([x*radius + offset_x, y*radius, z*radius, x, y, z,
+                             j / sectors, i / stacks, -math.sin(lon), 0.0, math.cos(lon)])
+    for i in range(stacks):
+        for j in range(sectors):
+            first = (i * (sectors + 1)) + j
+            second = first + sectors + 1
+            indices.extend([first, second, first + 1, second, second + 1, first + 1])
+    return np.array(vertices, dtype=np.float32), np.array(indices, dtype=np.uint32)
+
+
+@suite("geometry")
+def run(bench):
+    from src.core.geometry import GeometryEngine, Mesh
+
+    for segments in bench.pick((30, 128, 512), (30, 128)):
+        def generate():
+            GeometryEngine._sphere.cache_clear()
+            return GeometryEngine.generate_sphere(stacks=segments, sectors=segments)
+
+        repeat = 3 if segments >= 256 else 10
+        params = {"segments": segments}
+        bench.measure(f"sphere_{segments}", generate, repeat=repeat, params=params)
+        bench.measure(f"loop_{segments}", lambda: loop_sphere(stacks=segments, sectors=segments),
+                      repeat=repeat, params=params)
+
+    def clear_memos():
+        GeometryEngine._sphere.cache_clear()
+        GeometryEngine.generate_comparison_spheres.cache_clear()
+
+    bench.measure("comparison_spheres", GeometryEngine.generate_comparison_spheres, setup=clear_memos, repeat=10)
+
+    vertices, indices = GeometryEngine.generate_sphere()
+    bench.renderer.context.make_current()
+    bench.measure("mesh_upload_30", lambda: Mesh(vertices, indices), teardown=lambda mesh: mesh.release(),
+                  gpu=True, repeat=10, params={"segments": 30})
@@ -0,0 +1,56 @@
+"""
+Frame time while dragging a slider on one layer of a 30-layer stack (top,
+middle, bottom), with incremental compositing off (cache budget 0, full_*)
+and on (incremental_*). Also checks that the incremental result matches a
+full re-render.
+"""
+import itertools
+
+from benchmarks.harness import suite
+from benchmarks.scenes import build_stack, release_stack
+
+FRAMES = 20
+
+
+@suite("incremental")
+def run(bench):
+    import numpy as np
+
+    renderer = bench.renderer
+    engine = renderer.engine
+    size = bench.pick(1024, 512)
+    count = bench.pick(30, 10)
+    engine.resize(size, size)
+    stack = build_stack(count)
+    renderer.initialize_layers(stack)
+    default_budget = engine.compositor.DEFAULT_CACHE_BUDGET_MB
+
+    for label, budget in (("full", 0), ("incremental", default_budget)):
+        engine.set_cache_budget(budget)
+        engine.compositor.invalidate()
+        for position, index in (("top", count - 1), ("middle", count // 2), ("bottom", 1)):
+            layer = stack[index]
+            frames = itertools.count()
+
+            def edit():
+                # Any edit: the version bump is what matters
+                layer.opacity = 1.0 - (next(frames) % FRAMES) / FRAMES
+                layer.mark_dirty()
+                engine.render(stack)
+
+            engine.render(stack)
+            bench.measure(f"{label}_{position}", edit, repeat=FRAMES, gpu=True,
+                          params={"size": size, "layers": count, "edited": index, "cache_budget_mb": budget})
+
+    if bench.selected("incremental.matches_full"):
+        engine.set_cache_budget(default_budget)
+        stack[count // 2].mark_dirty()
+        engine.render(stack)
+        cached = engine.compositor.final_fbo.read_pixels().copy()
+        engine.compositor.invalidate()
+        engine.render(stack)
+        if not np.array_equal(cached, engine.compositor.final_fbo.read_pixels()):
+            bench.fail("matches_full", "incremental render differs from a full re-render")
+
+    engine.set_cache_budget(default_budget)
+    release_stack(stack)
@@ -0,0 +1,39 @@
+"""
+Render cost per layer type: the base layer alone, and the base layer plus one
+layer of every registered type, re-rendered from scratch at 512x512.
+"""
+from benchmarks.harness import suite
+
+SIZE = 512
+
+
+@suite("layers")
+def run(bench):
+    from src.core.layer_registry import LayerRegistry
+    from src.core.layer_stack import LayerStack
+    from src.layers.base_layer import BaseLayer
+
+    renderer = bench.renderer
+    engine = renderer.engine
+    engine.resize(SIZE, SIZE)
+
+    for name in LayerRegistry.get_registered_names():
+        stack = LayerStack()
+        stack.add_layer(BaseLayer())
+        if name != "BaseLayer":
+            layer = LayerRegistry.create(name)
+            if layer is None:
+                continue
+            if hasattr(layer, "image_path"):
+                layer.image_path = bench.image(1024)
+            stack.add_layer(layer)
+        with bench.quiet():
+            renderer.initialize_layers(stack)
+
+        def frame():
+            engine.compositor.invalidate()
+            engine.render(stack)
+
+        bench.measure(name, frame, gpu=True, params={"size": SIZE, "layers": len(stack)})
+        for layer in stack:
+            layer.release()
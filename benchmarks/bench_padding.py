@@ -0,0 +1,71 @@
+"""
+Export edge padding of an anti-aliased disc: the NumPy distance transform
+(src.core.padding.apply_padding) and the jump-flood pass (Compositor.pad),
+against the iterative 8-neighbour dilation they replaced (loop_*, timed once:
+it takes seconds at 2048 px).
+"""
+from benchmarks.harness import suite
+from benchmarks.scenes import disc_image
+
+SHIFTS = [
+    (-1, 0), (1, 0), (0, -1), (0, 1),
+    (-1, -1), (-1, 1), (1, -1), (1, 1)
+]
+
+
+def loop_padding(pixels, padding):
+    """Reference: the loop PreviewWidget.save_render used before src.core.padding"""
+    import numpy as np
+
+    current_img = pixels.copy()
+    height, width = current_img.shape[:2]
+    for _ in range(padding):
+        holes = current_img[:, :, 3] == 0
+        mixed_color = np.zeros_like(current_img, dtype=np.float32)
+        count = np.zeros((height, width, 1), dtype=np.float32)
+        for dy, dx in SHIFTS:
+            rolled = np.zeros_like(current_img)
+            sy_start, sy_end = max(0, -dy), min(height, height - dy)
+            sx_start, sx_end = max(0, -dx), min(width, width - dx)
+            dy_start, dy_end = max(0, dy), min(height, height + dy)
+            dx_start, dx_end = max(0, dx), min(width, width + dx)
+            rolled[dy_start:dy_end, dx_start:dx_end] = current_img[sy_start:sy_end, sx_start:sx_end]
+            fill_candidate = holes & (rolled[:, :, 3] > 0)
+            mixed_color[fill_candidate] += rolled[fill_candidate]
+            count[fill_candidate] += 1
+        valid_fills = count[:, :, 0] > 0
+        mixed_color[valid_fills] /= count[valid_fills]
+        fill_values = mixed_color.astype(np.uint8)
+        current_img[valid_fills] = fill_values[valid_fills]
+    final_mask = current_img[:, :, 3] == 0
+    current_img[final_mask] = [0, 0, 0, 255]
+    return current_img
+
+
+@suite("padding")
+def run(bench):
+    from src.core.compositor import Compositor
+    from src.core.framebuffer import FrameBuffer
+    from src.core.padding import apply_padding
+
+    size = bench.pick(2048, 512)
+    straight = disc_image(size)
+    premultiplied = straight.copy()
+    premultiplied[..., :3] = (straight[..., :3].astype("uint32") * straight[..., 3:4] + 127) // 255
+
+    bench.renderer.context.make_current()
+    comp = Compositor(size, size)
+    comp.initialize()
+    source = FrameBuffer(size, size, depth=False)
+    source.write_pixels(premultiplied)
+    comp.final_fbo = source
+
+    for padding in (4, 16, 32):
+        params = {"size": size, "padding": padding}
+        bench.measure(f"loop_{padding}", lambda: loop_padding(straight, padding), repeat=1, warmup=0, params=params)
+        bench.measure(f"cpu_{padding}", lambda: apply_padding(straight, padding), repeat=3, params=params)
+        bench.measure(f"gpu_{padding}", lambda: comp.pad(padding), repeat=3, gpu=True, params=params)
+
+    source.delete()
+    comp.final_fbo = comp.fbo_ping
+    comp.release()
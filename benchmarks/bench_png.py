@@ -0,0 +1,73 @@
+"""
+PNG encoding of a padded matcap render: Pillow (compress_level 6), QImage.save
+and src.core.png_writer.write_png (level 6) per filter and thread count.
+Every file is decoded again and checked against the input; params["kb"] is
+its size.
+"""
+import os
+
+from benchmarks.harness import suite
+
+FILTERS = ("up", "paeth", "adaptive")
+
+
+def matcap_image(renderer, size):
+    from src.core.layer_stack import LayerStack
+    from src.layers.base_layer import BaseLayer
+    from src.layers.fresnel_layer import FresnelLayer
+    from src.layers.noise_layer import NoiseLayer
+
+    stack = LayerStack()
+    base = BaseLayer()
+    base.base_color = [0.35, 0.3, 0.5]
+    stack.add_layer(base)
+    stack.add_layer(FresnelLayer())
+    noise = NoiseLayer()
+    noise.intensity = 0.2
+    stack.add_layer(noise)
+    pixels = renderer.render(stack, size, size, padding=4)
+    for layer in stack:
+        layer.release()
+    return pixels
+
+
+def qimage_save(pixels, path):
+    from PySide6.QtGui import QImage
+    height, width = pixels.shape[:2]
+    QImage(pixels.data, width, height, width * 4, QImage.Format.Format_RGBA8888).save(path)
+
+
+@suite("png")
+def run(bench):
+    import numpy as np
+    from PIL import Image
+    from src.core.png_writer import write_png
+
+    renderer = bench.renderer
+    gpu_padding = renderer.engine.gpu_padding
+    renderer.engine.set_gpu_padding(False) # NumPy padding: the same image on every machine
+    cpus = os.cpu_count() or 1
+    thread_counts = bench.pick(sorted({1, 2, 4, cpus}), sorted({1, cpus}))
+    filters = bench.pick(FILTERS, ("adaptive",))
+    path = bench.path("encode.png")
+
+    for size in bench.pick((1024, 2048, 4096), (512,)):
+        pixels = matcap_image(renderer, size)
+        repeat = 1 if size >= 4096 else 3
+
+        def case(name, fn, threads):
+            entry = bench.measure(f"{name}_{size}", fn, repeat=repeat, params={"size": size, "threads": threads})
+            if entry is None:
+                return
+            with Image.open(path) as img:
+                if not np.array_equal(np.asarray(img.convert("RGBA")), pixels):
+                    bench.fail(f"{name}_{size}", "decoded image differs")
+            entry["params"]["kb"] = round(os.path.getsize(path) / 1024)
+
+        case("pillow", lambda: Image.fromarray(pixels).save(path, compress_level=6), 1)
+        case("qimage", lambda: qimage_save(pixels, path), 1)
+        for png_filter in filters:
+            for threads in thread_counts:
+                case(f"write_png_{png_filter}_t{threads}",
+                     lambda: write_png(path, pixels, png_filter=png_filter, threads=threads), threads)
+    renderer.engine.set_gpu_padding(gpu_padding)
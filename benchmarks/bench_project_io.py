@@ -0,0 +1,40 @@
+"""
+Project bundles with many image assets: first save (every asset hashed and
+copied), saving again (hashes indexed, assets already stored) and loading.
+"""
+import shutil
+
+from benchmarks.harness import suite
+
+
+@suite("project_io")
+def run(bench):
+    import src.layers  # Registers the layer types for load_project
+    from src.core.asset_index import AssetIndex
+    from src.core.layer_stack import LayerStack
+    from src.core.project_io import ProjectIO
+    from src.layers.base_layer import BaseLayer
+    from src.layers.image_layer import ImageLayer
+
+    assets = bench.pick(50, 10)
+    stack = LayerStack()
+    stack.add_layer(BaseLayer())
+    for i in range(assets):
+        layer = ImageLayer()
+        layer.image_path = bench.image(256, seed=i)
+        stack.add_layer(layer)
+    params = {"assets": assets, "image_size": 256}
+    project_dir = bench.path("project")
+    index = AssetIndex()
+
+    def fresh():
+        shutil.rmtree(project_dir, ignore_errors=True)
+        for layer in stack:
+            if getattr(layer, "image_path", None):
+                index.forget(layer.image_path)
+
+    bench.measure("save_cold", lambda: ProjectIO.save_project(project_dir, stack), setup=fresh, params=params)
+    bench.measure("save_warm", lambda: ProjectIO.save_project(project_dir, stack), params=params)
+
+    project_file = bench.path("project", "project.json")
+    bench.measure("load", lambda: ProjectIO.load_project(project_file, None), params=params)
@@ -0,0 +1,133 @@
+"""
+One export through the previous readback (glReadPixels into a bytes object,
+flipped copy, QImage copy, QImage.save) and through Engine.save_offscreen
+(pixel pack buffer mapped as a NumPy view, encoded in place), with and
+without padding.
+
+Every run is a child process: one export first (FBOs, shaders, the reused
+readback buffer: the steady state of repeated exports), then the peak RSS is
+reset (/proc/self/clear_refs, Linux only) and a second export is timed.
+params["peak_mb"] is its peak memory over the RSS before it.
+"""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.harness import ROOT, suite
+
+MODES = ("previous", "mapped")
+PADDING = 16
+
+CHILD = r"""
+import sys
+sys.path.insert(0, {root!r})
+from src.core import headless
+from benchmarks.bench_readback import measure
+peak_mb, ms = measure({mode!r}, {size}, {padding})
+print("result:", peak_mb, ms)
+"""
+
+
+def _status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def previous_export(engine, stack, size, padding, path):
+    """Reference: Engine.render_offscreen + QImage.save before the pixel pack buffer readback"""
+    import numpy as np
+    from OpenGL.GL import (glBindFramebuffer, glPixelStorei, glReadPixels, GL_READ_FRAMEBUFFER,
+                           GL_PACK_ALIGNMENT, GL_RGBA, GL_UNSIGNED_BYTE)
+    from PySide6.QtGui import QImage
+    from src.core.padding import unpremultiply, apply_padding
+
+    comp = engine.offscreen_pool.acquire(size, size)
+    comp.render(stack, {'preview_mode_int': 0, 'use_global_normal': False})
+    fbo = comp.final_fbo
+    glBindFramebuffer(GL_READ_FRAMEBUFFER, fbo.fbo)
+    glPixelStorei(GL_PACK_ALIGNMENT, 1)
+    data = glReadPixels(0, 0, size, size, GL_RGBA, GL_UNSIGNED_BYTE)
+    glBindFramebuffer(GL_READ_FRAMEBUFFER, 0)
+    pixels = np.ascontiguousarray(np.frombuffer(data, dtype=np.uint8).reshape(size, size, 4)[::-1])
+    fmt = QImage.Format.Format_RGBA8888_Premultiplied
+    if padding > 0:
+        pixels = apply_padding(unpremultiply(pixels), padding)
+        fmt = QImage.Format.Format_RGBA8888
+    image = QImage(pixels.data, size, size, size * 4, fmt).copy()
+    image.save(path)
+
+
+def measure(mode, size, padding):
+    """Child process: second export -> (peak over the RSS before it in MB, ms)"""
+    from src.core.headless import HeadlessRenderer
+    from src.core.layer_stack import LayerStack
+    from src.layers.base_layer import BaseLayer
+    from src.layers.fresnel_layer import FresnelLayer
+
+    renderer = HeadlessRenderer(64, 64)
+    engine = renderer.engine
+    engine.set_gpu_padding(False) # Same CPU padding in both modes
+    stack = LayerStack()
+    stack.add_layer(BaseLayer())
+    stack.add_layer(FresnelLayer())
+    renderer.initialize_layers(stack)
+
+    def export(path):
+        if mode == "previous":
+            previous_export(engine, stack, size, padding, path)
+        else:
+            engine.save_offscreen(path, size, size, stack, preview_mode_override=0, force_no_normal=True,
+                                  padding=padding)
+
+    path = os.path.join(tempfile.mkdtemp(), "export.png")
+    export(path)
+    engine.offscreen_pool.invalidate()
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5") # Reset the peak (VmHWM) to the current RSS
+    before = _status_kb("VmRSS")
+    start = time.perf_counter()
+    export(path)
+    ms = (time.perf_counter() - start) * 1000.0
+    peak = _status_kb("VmHWM")
+    os.remove(path)
+    renderer.release()
+    return (peak - before) / 1024.0, ms
+
+
+@suite("readback")
+def run(bench):
+    if not os.path.exists("/proc/self/clear_refs"):
+        bench.fail("*", "needs /proc/self/clear_refs (Linux)")
+        return
+    size = bench.pick(4096, 1024)
+    repeat = bench.pick(3, 1)
+    frame_mb = size * size * 4 / (1024.0 * 1024.0)
+
+    for padding in (0, PADDING):
+        for mode in MODES:
+            name = f"{mode}_pad{padding}"
+            if not bench.selected(f"readback.{name}"):
+                continue
+            code = CHILD.format(root=ROOT, mode=mode, size=size, padding=padding)
+            times = []
+            peak_mb = 0.0
+            try:
+                for _ in range(repeat):
+                    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                                         timeout=600, check=True)
+                    match = re.search(r"result: ([\d.]+) ([\d.]+)", out.stdout)
+                    if match is None:
+                        raise RuntimeError(f"no result in output: {out.stdout[-500:]}")
+                    peak_mb = max(peak_mb, float(match.group(1)))
+                    times.append(float(match.group(2)))
+            except (subprocess.SubprocessError, RuntimeError) as e:
+                bench.fail(name, e)
+                continue
+            bench.record(name, times, {"size": size, "padding": padding, "peak_mb": round(peak_mb, 1),
+                                       "frames": round(peak_mb / frame_mb, 2)})
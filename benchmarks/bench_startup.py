@@ -0,0 +1,65 @@
+"""
+Startup of a fresh process: time to the shown main window (offscreen Qt
+platform, `--profile-startup`) and time to the first headless frame with
+every layer type, with a warm program binary cache.
+"""
+import os
+import re
+import subprocess
+import sys
+
+from benchmarks.harness import ROOT, suite
+
+FIRST_FRAME = r"""
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from src.core.headless import HeadlessRenderer
+from src.core.layer_registry import LayerRegistry
+from src.core.layer_stack import LayerStack
+from src.core.resource_manager import ResourceManager
+import src.layers
+
+ResourceManager().program_cache.directory = {cache!r}
+renderer = HeadlessRenderer(512, 512)
+stack = LayerStack()
+for name in LayerRegistry.get_registered_names():
+    layer = LayerRegistry.create(name)
+    if layer is not None:
+        stack.add_layer(layer)
+renderer.render(stack, padding=4)
+print("first frame:", (time.perf_counter() - start) * 1000.0)
+renderer.release()
+"""
+
+
+def _child_ms(args, pattern, **env):
+    out = subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True, timeout=300,
+                         env=dict(os.environ, **env), check=True)
+    match = re.search(pattern, out.stdout)
+    if match is None:
+        raise RuntimeError(f"no timing in output: {out.stdout[-500:]}")
+    return float(match.group(1))
+
+
+@suite("startup")
+def run(bench):
+    repeat = bench.pick(3, 1)
+
+    if bench.selected("startup.time_to_window"):
+        try:
+            times = [_child_ms(["-m", "src.main", "--profile-startup"], r"time to window:\s+([\d.]+) ms",
+                               QT_QPA_PLATFORM="offscreen")
+                     for _ in range(repeat)]
+            bench.record("time_to_window", times)
+        except (subprocess.SubprocessError, RuntimeError) as e:
+            bench.fail("time_to_window", e)
+
+    if bench.selected("startup.first_frame"):
+        code = FIRST_FRAME.format(root=ROOT, cache=bench.path("program_cache"))
+        try:
+            _child_ms(["-c", code], r"first frame: ([\d.]+)") # Fills the program cache
+            times = [_child_ms(["-c", code], r"first frame: ([\d.]+)") for _ in range(repeat)]
+            bench.record("first_frame", times, {"size": 512, "padding": 4})
+        except (subprocess.SubprocessError, RuntimeError) as e:
+            bench.fail("first_frame", e)
@@ -0,0 +1,31 @@
+"""
+Image textures by size: PNG decode + content hash (decode threads) and the GL
+upload with mipmaps (ResourceManager).
+"""
+from benchmarks.harness import suite
+
+
+@suite("textures")
+def run(bench):
+    from OpenGL.GL import glDeleteTextures
+    from PIL import Image
+    from src.core.asset_index import AssetIndex
+    from src.core.resource_manager import ResourceManager
+
+    rm = ResourceManager()
+    bench.renderer.context.make_current()
+
+    for size in bench.pick((256, 1024, 2048, 4096), (256, 1024)):
+        params = {"size": size, "bytes": size * size * 4}
+        repeat = 3 if size >= 2048 else 5
+        path = bench.image(size)
+
+        # Hashes are indexed by size and modification time: forget them to hash again
+        bench.measure(f"decode_{size}", lambda: rm._decode_image(path), repeat=repeat,
+                      setup=lambda: AssetIndex().forget(path), params=params)
+
+        with Image.open(path) as img:
+            pixels = img.convert("RGBA").tobytes()
+        bench.measure(f"upload_{size}", lambda: rm._upload_texture(path, ((size, size), pixels)),
+                      teardown=lambda tex_id: glDeleteTextures(1, [tex_id]),
+                      repeat=repeat, gpu=True, params=params)
@@ -0,0 +1,304 @@
+"""
+Benchmark runner, result files and regression comparison.
+
+Suites are functions registered with @suite(name); they receive a Bench and
+time their cases with Bench.measure (or Bench.record for times measured
+elsewhere, e.g. in a child process). Case names are "<suite>.<case>".
+
+Result file (JSON):
+
+    {
+        "schema": 1,
+        "created": "2026-01-01T12:00:00",
+        "quick": false,
+        "environment": {"python": ..., "gl_renderer": ..., ...},
+        "results": {
+            "compositing.depth_10": {"ms": 41.2, "median_ms": 42.0, "max_ms": 44.8,
+                                     "repeat": 5, "params": {"layers": 10, "size": 512}},
+            ...
+        },
+        "errors": {"<suite>.<case>": "message", ...}
+    }
+
+"ms" is the best of `repeat` runs (the least noisy statistic on a shared
+machine); compare() uses it.
+"""
+import contextlib
+import datetime
+import fnmatch
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCHEMA = 1
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Suite name -> function(bench), in registration order
+SUITES = {}
+
+# compare(): a case regresses if it is this much slower (relative) ...
+DEFAULT_TOLERANCE = 0.15
+# ... and at least this much slower in absolute terms (timer noise on tiny cases)
+DEFAULT_MIN_DELTA_MS = 0.5
+
+
+def suite(name):
+    """Register a benchmark suite: @suite("padding") def run(bench): ..."""
+    def register(fn):
+        SUITES[name] = fn
+        return fn
+    return register
+
+
+class Bench:
+    """
+    State shared by the suites of one run: options, results, a scratch directory
+    and (on first use) a headless renderer. Output of the code under test is
+    swallowed; one line per case is printed instead.
+    """
+    def __init__(self, quick=False, patterns=None, backend="auto", out=None):
+        self.quick = quick
+        self.patterns = list(patterns or [])
+        self.backend = backend
+        self.out = out or sys.stdout
+        self.results = {}
+        self.errors = {}
+        self.tmp = tempfile.mkdtemp(prefix="matcap_benchmarks_")
+        self._renderer = None
+        self._suite = None
+        self._previous_index = None
+
+    # --- Options ---
+
+    def pick(self, full, quick):
+        """Parameter values for the current mode"""
+        return quick if self.quick else full
+
+    def selected(self, name):
+        return not self.patterns or any(fnmatch.fnmatchcase(name, p) for p in self.patterns)
+
+    def suite_selected(self, suite_name):
+        # "padding.*" or "padding.gpu_*" select the suite; the case filter comes later
+        return not self.patterns or any(fnmatch.fnmatchcase(suite_name, p.split(".", 1)[0]) for p in self.patterns)
+
+    # --- Shared resources ---
+
+    @property
+    def renderer(self):
+        """HeadlessRenderer (512x512) shared by the GL suites, created on first use"""
+        if self._renderer is None:
+            from src.core import headless
+            with self.quiet():
+                self._renderer = headless.HeadlessRenderer(512, 512, self.backend)
+        self._renderer.context.make_current()
+        return self._renderer
+
+    @property
+    def engine(self):
+        return self.renderer.engine
+
+    def path(self, *names):
+        """Path in the run's scratch directory"""
+        return os.path.join(self.tmp, *names)
+
+    def image(self, size, seed=0):
+        """Random RGBA PNG of size x size in the scratch directory (cached per size and seed)"""
+        path = self.path(f"image_{size}_{seed}.png")
+        if not os.path.exists(path):
+            import numpy as np
+            from PIL import Image
+            rng = np.random.default_rng(seed)
+            Image.fromarray(rng.integers(0, 256, (size, size, 4), dtype=np.uint8), "RGBA").save(path, compress_level=1)
+        return path
+
+    # --- Timing ---
+
+    def measure(self, name, fn, repeat=5, warmup=1, setup=None, teardown=None, gpu=False, params=None):
+        """
+        Time fn() `repeat` times after `warmup` untimed runs. setup() runs before
+        and teardown(result) after every call, both untimed. gpu: wait for the GL
+        queue (glFinish) inside the timed region.
+        """
+        full_name = f"{self._suite}.{name}"
+        if not self.selected(full_name):
+            return None
+        finish = None
+        if gpu:
+            from OpenGL.GL import glFinish
+            finish = glFinish
+
+        times = []
+        try:
+            with self.quiet():
+                for i in range(warmup + repeat):
+                    if setup:
+                        setup()
+                    start = time.perf_counter()
+                    result = fn()
+                    if finish:
+                        finish()
+                    ms = (time.perf_counter() - start) * 1000.0
+                    if teardown:
+                        teardown(result)
+                    if i >= warmup:
+                        times.append(ms)
+        except Exception as e:
+            self.fail(name, e)
+            return None
+        return self.record(name, times, params)
+
+    def record(self, name, times, params=None):
+        """Store times (ms) measured by the suite itself"""
+        full_name = name if name.startswith(f"{self._suite}.") else f"{self._suite}.{name}"
+        entry = {
+            "ms": round(min(times), 4),
+            "median_ms": round(statistics.median(times), 4),
+            "max_ms": round(max(times), 4),
+            "repeat": len(times),
+            "params": dict(params or {}),
+        }
+        self.results[full_name] = entry
+        print(f"{full_name:<44}{entry['ms']:>12.2f} ms{entry['median_ms']:>12.2f} ms median", file=self.out)
+        return entry
+
+    def fail(self, name, error):
+        full_name = f"{self._suite}.{name}"
+        self.errors[full_name] = str(error)
+        print(f"{full_name:<44}  failed: {error}", file=self.out)
+
+    @contextlib.contextmanager
+    def quiet(self):
+        """Swallow stdout (log lines of the code under test)"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+
+    # --- Run ---
+
+    def run(self, suite_names=None):
+        from src.core.asset_index import AssetIndex
+        # Keep content hashes of scratch images out of the user's asset index
+        index = AssetIndex()
+        self._previous_index = index.index_file
+        index.set_index_file(self.path("asset_index.json"))
+        try:
+            for name, fn in SUITES.items():
+                if suite_names and name not in suite_names:
+                    continue
+                if not self.suite_selected(name):
+                    continue
+                self._suite = name
+                try:
+                    fn(self)
+                except Exception as e:
+                    self.fail("*", e)
+        finally:
+            self._suite = None
+            index.set_index_file(self._previous_index)
+        return self.to_dict()
+
+    def environment(self):
+        env = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "commit": _git_commit(),
+        }
+        try:
+            import numpy
+            env["numpy"] = numpy.__version__
+        except ImportError:
+            pass
+        if self._renderer is not None:
+            env["gl_backend"] = self._renderer.context.backend
+            env["gl_renderer"] = self._renderer.context.renderer_name
+        return env
+
+    def to_dict(self):
+        return {
+            "schema": SCHEMA,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "quick": self.quick,
+            "environment": self.environment(),
+            "results": dict(self.results),
+            "errors": dict(self.errors),
+        }
+
+    def release(self):
+        if self._renderer is not None:
+            with self.quiet():
+                self._renderer.release()
+            self._renderer = None
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+# --- Result files ---
+
+def save_results(data, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("schema") != SCHEMA:
+        raise ValueError(f"{path}: unsupported result schema {data.get('schema')!r}")
+    return data
+
+
+def compare(base, new, tolerance=DEFAULT_TOLERANCE, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Case-by-case comparison of two result dicts -> [(name, base ms, new ms, ratio, status)],
+    status: "regression" (slower by more than tolerance and min_delta_ms), "improvement"
+    (faster by as much), "ok", "missing" (only in base) or "new" (only in new).
+    """
+    base_results = base["results"]
+    new_results = new["results"]
+    rows = []
+    for name in sorted(set(base_results) | set(new_results)):
+        if name not in new_results:
+            rows.append((name, base_results[name]["ms"], None, None, "missing"))
+            continue
+        if name not in base_results:
+            rows.append((name, None, new_results[name]["ms"], None, "new"))
+            continue
+        before = base_results[name]["ms"]
+        after = new_results[name]["ms"]
+        ratio = after / before if before > 0 else float("inf")
+        status = "ok"
+        if after - before > min_delta_ms and ratio > 1.0 + tolerance:
+            status = "regression"
+        elif before - after > min_delta_ms and ratio < 1.0 / (1.0 + tolerance):
+            status = "improvement"
+        rows.append((name, before, after, ratio, status))
+    return rows
+
+
+def format_comparison(rows):
+    def fmt(ms):
+        return "-" if ms is None else f"{ms:.2f}"
+
+    lines = [f"{'case':<44}{'base (ms)':>12}{'new (ms)':>12}{'ratio':>8}  status"]
+    for name, before, after, ratio, status in rows:
+        ratio_col = "-" if ratio is None else f"{ratio:.2f}x"
+        lines.append(f"{name:<44}{fmt(before):>12}{fmt(after):>12}{ratio_col:>8}  {status}")
+    regressions = sum(1 for row in rows if row[4] == "regression")
+    lines.append(f"{regressions} regression(s) in {len(rows)} case(s)")
+    return "\n".join(lines)
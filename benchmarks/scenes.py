@@ -0,0 +1,45 @@
+"""Inputs shared by the suites: layer stacks and test images."""
+import numpy as np
+
+# Blend modes cycled through by build_stack: hardware-blended and blend.frag ones
+MODES = ("Normal", "Add", "Multiply", "Screen", "Overlay")
+
+
+def build_stack(count):
+    """Base layer + count - 1 procedural layers of mixed types and blend modes (not initialized)"""
+    from src.core.layer_stack import LayerStack
+    from src.layers.base_layer import BaseLayer
+    from src.layers.spot_light_layer import SpotLightLayer
+    from src.layers.fresnel_layer import FresnelLayer
+    from src.layers.noise_layer import NoiseLayer
+    from src.layers.adjustment_layer import AdjustmentLayer
+
+    stack = LayerStack()
+    stack.add_layer(BaseLayer())
+    kinds = (SpotLightLayer, FresnelLayer, NoiseLayer, AdjustmentLayer)
+    for i in range(count - 1):
+        layer = kinds[i % len(kinds)]()
+        layer.blend_mode = MODES[i % len(MODES)]
+        if isinstance(layer, SpotLightLayer):
+            layer.intensity = 0.3
+        stack.add_layer(layer)
+    return stack
+
+
+def release_stack(stack):
+    for layer in stack:
+        layer.release()
+
+
+def disc_image(size):
+    """Straight-alpha RGBA: shaded disc with a 1px anti-aliased rim and transparent corners, like an export"""
+    c = (np.arange(size) + 0.5) / size * 2.0 - 1.0
+    x, y = np.meshgrid(c, c)
+    r = np.sqrt(x * x + y * y)
+    coverage = np.clip(0.5 - (r - 0.9) * size / 2.0, 0.0, 1.0)
+    img = np.zeros((size, size, 4), dtype=np.uint8)
+    img[..., 0] = np.clip((x + 1.0) * 127.5, 0, 255)
+    img[..., 1] = np.clip((y + 1.0) * 127.5, 0, 255)
+    img[..., 2] = 128
+    img[..., 3] = np.round(coverage * 255.0)
+    return img
@@ -0,0 +1,97 @@
+"""
+Command-line tools.
+
+    python -m src.cli render projects/*/project.json -r 1024 -p 8 -o exports/
+
+render: re-exports project bundles (ProjectIO.save_project) without the UI
+(see src.core.batch_export). Projects share one headless GL context per process,
+so compiled shaders, meshes and image textures are created once per batch;
+-j N shards them over N worker processes.
+Writes <output-dir>/manifest.json with per-project timings.
+"""
+# Must come before anything that imports OpenGL (selects EGL on machines without a display)
+from src.core import headless
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+from src.core.batch_export import FORMATS, render_projects
+from src.core import png_writer
+
+
+def expand_inputs(patterns):
+    """Project files, bundle directories or glob patterns -> sorted unique project.json paths"""
+    paths = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"cli: No match for {pattern}")
+        for match in matches:
+            if os.path.isdir(match):
+                match = os.path.join(match, "project.json")
+            paths.append(os.path.abspath(match))
+    return sorted(set(paths))
+
+
+def _cmd_render(args):
+    projects = expand_inputs(args.inputs)
+    if not projects:
+        print("cli: No project files given")
+        return 2
+
+    manifest = render_projects(
+        projects, args.output_dir, resolution=args.resolution, padding=args.padding,
+        fmt=args.format, analytic=args.analytic, backend=args.backend,
+        workers=args.workers, timeout=args.timeout, retries=args.retries,
+        png_options={"level": args.png_level, "png_filter": args.png_filter, "strategy": args.png_strategy},
+        profile=args.profile
+    )
+    manifest_path = args.manifest or os.path.join(args.output_dir, "manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+
+    print(f"Rendered {manifest['rendered']}/{len(projects)} projects in {manifest['total_ms'] / 1000.0:.2f}s "
+          f"({manifest['backend']}), manifest: {manifest_path}")
+    return 1 if manifest["failed"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Matcap Maker command-line tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    render = sub.add_parser("render", help="Export project bundles to images")
+    render.add_argument("inputs", nargs="+", help="project.json files, bundle directories or glob patterns")
+    render.add_argument("-o", "--output-dir", default="exports", help="Output directory (default: exports)")
+    render.add_argument("-r", "--resolution", type=int, default=2048, help="Square output size in pixels (default: 2048)")
+    render.add_argument("-p", "--padding", type=int, default=4, help="Edge padding in pixels, 0 = none (default: 4)")
+    render.add_argument("-f", "--format", choices=sorted(FORMATS), default="png", help="Image format (default: png)")
+    render.add_argument("--manifest", help="Manifest path (default: <output-dir>/manifest.json)")
+    render.add_argument("--analytic", action="store_true", help="Per-pixel analytic sphere instead of the mesh")
+    render.add_argument("--backend", choices=("auto",) + headless.HeadlessContext.BACKENDS, default="auto",
+                        help="Headless GL backend (default: auto)")
+    render.add_argument("-j", "--workers", type=int, default=1,
+                        help="Worker processes, each with its own GL context (default: 1, in-process)")
+    render.add_argument("--timeout", type=float, help="Per-project time limit in seconds with --workers")
+    render.add_argument("--retries", type=int, default=1, help="Retries of a project whose worker crashed (default: 1)")
+    render.add_argument("--png-level", type=int, choices=range(10), default=png_writer.DEFAULT_LEVEL, metavar="0-9",
+                        help=f"PNG zlib compression level (default: {png_writer.DEFAULT_LEVEL})")
+    render.add_argument("--png-filter", choices=list(png_writer.FILTERS), default=png_writer.DEFAULT_FILTER,
+                        help=f"PNG row filter (default: {png_writer.DEFAULT_FILTER})")
+    render.add_argument("--png-strategy", choices=list(png_writer.STRATEGIES), default=png_writer.DEFAULT_STRATEGY,
+                        help=f"zlib strategy for PNG (default: {png_writer.DEFAULT_STRATEGY})")
+    render.add_argument("--profile", action="store_true",
+                        help="Add per-layer GPU/CPU times and draw call counts to the manifest")
+    render.set_defaults(func=_cmd_render)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
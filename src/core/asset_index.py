@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+
+# Streaming read size for hashing
+CHUNK_BYTES = 1 << 20
+
+
+def content_hash(path):
+    """BLAKE2b (128 bit) of a file's bytes as hex, read in chunks"""
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = bytearray(CHUNK_BYTES)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+class AssetIndex:
+    """
+    Content hashes of image files, persisted as {path: [size, mtime_ns, hash]}.
+    A file whose size and modification time match its entry is not read again,
+    so unchanged assets are hashed once, across sessions. The hash identifies
+    the content: textures of identical images are shared (ResourceManager) and
+    project assets are stored under it (ProjectIO).
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AssetIndex, cls).__new__(cls)
+            cls._instance._init()
+        return cls._instance
+
+    def _init(self):
+        self.index_file = None # Default: asset_index.json next to config.json
+        self._entries = None # Loaded on first use
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def set_index_file(self, path):
+        """Use another index file (loaded on next use)"""
+        with self._lock:
+            self.index_file = path
+            self._entries = None
+            self._dirty = False
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        if self.index_file is None:
+            from src.core.settings import Settings
+            self.index_file = str(Settings().base_dir / "asset_index.json")
+        self._entries = {}
+        try:
+            with open(self.index_file, 'r') as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"AssetIndex: Failed to load {self.index_file}: {e}")
+
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def lookup(self, path):
+        """Hash of an indexed, unchanged file, else None (never reads the file)"""
+        path = os.path.abspath(path)
+        try:
+            stat = self._stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._load()
+            entry = self._entries.get(path)
+        if entry and entry[:2] == stat:
+            return entry[2]
+        return None
+
+    def hash_file(self, path, data=None):
+        """
+        Hash of a file, read (and indexed) only if it is new or changed. OSError if missing.
+        data: the file's bytes if the caller has read them anyway.
+        """
+        path = os.path.abspath(path)
+        digest = self.lookup(path)
+        if digest is not None:
+            return digest
+        stat = self._stat(path)
+        if data is None:
+            digest = content_hash(path)
+        else:
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self._lock:
+            self._entries[path] = stat + [digest]
+            self._dirty = True
+        return digest
+
+    def forget(self, path):
+        with self._lock:
+            self._load()
+            if self._entries.pop(os.path.abspath(path), None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """Write the index if it changed (entries of deleted files are dropped)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = {p: e for p, e in self._entries.items() if os.path.exists(p)}
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.index_file)), exist_ok=True)
+                tmp = f"{self.index_file}.{os.getpid()}.tmp"
+                with open(tmp, 'w') as f:
+                    json.dump(entries, f)
+                os.replace(tmp, self.index_file)
+                self._entries = entries
+                self._dirty = False
+            except Exception as e:
+                print(f"AssetIndex: Failed to save {self.index_file}: {e}")
@@ -0,0 +1,408 @@
+"""
+Batch export of project bundles (ProjectIO.save_project) without the UI.
+
+BatchRenderer renders projects one after another on one headless context,
+so compiled shaders, meshes and image textures stay warm across projects.
+render_projects() runs it in this process; with workers > 1 the projects
+are sharded over worker processes, each with its own context (GL contexts
+cannot be shared between processes):
+
+  - Workers pull the next job whenever they are idle, so slow projects do not
+    hold up a fixed shard (dynamic scheduling, the pool form of work stealing).
+  - A job running longer than `timeout` seconds is failed and its worker replaced.
+  - A worker that dies mid-job is replaced and the job retried up to `retries` times.
+  - Manifest entries are returned in input order, whatever order workers finish in.
+
+Import src.core.headless before OpenGL in the calling process (see src.cli);
+workers are spawned fresh and inherit its platform choice through the environment.
+"""
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+
+from src.core.image_io import save_rgba
+
+FORMATS = {"png": ".png", "jpg": ".jpg", "tga": ".tga"}
+
+
+def _ms(start):
+    return round((time.perf_counter() - start) * 1000.0, 3)
+
+
+def project_image_paths(project_path):
+    """Image files a project references, resolved like ProjectIO.load_project (JSON only, no layers)"""
+    try:
+        with open(project_path, 'r') as f:
+            project_data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    paths = []
+    for layer_data in project_data.get("layers", []):
+        p = layer_data.get("params", {}).get("image_path")
+        if p and p.startswith("./"):
+            p = str((Path(project_path).parent / p).resolve())
+        if p:
+            paths.append(p)
+    return paths
+
+
+def output_paths(project_paths, output_dir, fmt):
+    """One unique output file per project, named after its bundle directory"""
+    used = set()
+    outputs = []
+    for project_path in project_paths:
+        stem, _ = os.path.splitext(os.path.basename(project_path))
+        if stem == "project":
+            stem = os.path.basename(os.path.dirname(project_path)) or stem
+        name = stem
+        suffix = 2
+        while name in used:
+            name = f"{stem}_{suffix}"
+            suffix += 1
+        used.add(name)
+        outputs.append(os.path.join(output_dir, name + FORMATS[fmt]))
+    return outputs
+
+
+class BatchRenderer:
+    """
+    Renders projects one after another on one HeadlessRenderer.
+    image_refs: {image path: number of projects still to come that use it};
+    textures are released after their last use, or right away if not listed.
+    png_options: PNG encoder settings (see src.core.image_io.save_rgba).
+    profile: add the frame's per-layer timings (FrameProfiler) to each manifest entry.
+    """
+    def __init__(self, resolution=2048, padding=4, fmt="png", analytic=False, backend="auto", image_refs=None,
+                 png_options=None, profile=False):
+        from src.core import headless
+        import src.layers  # Registers the layer types with LayerRegistry
+
+        self.resolution = resolution
+        self.padding = padding
+        self.fmt = fmt
+        self.image_refs = dict(image_refs or {})
+        self.png_options = dict(png_options or {})
+
+        start = time.perf_counter()
+        self.renderer = headless.HeadlessRenderer(resolution, resolution, backend)
+        self.renderer.engine.set_analytic_geometry(analytic)
+        # Padding: jump flooding on GPUs, NumPy distance transform on llvmpipe (faster there)
+        self.renderer.engine.set_gpu_padding(not self.renderer.context.software)
+        self.profiler = None
+        if profile:
+            from src.core.frame_profiler import FrameProfiler
+            self.profiler = FrameProfiler()
+            self.renderer.engine.set_profiler(self.profiler)
+        self.context_ms = _ms(start)
+
+    @property
+    def backend(self):
+        return self.renderer.context.backend
+
+    def info(self):
+        """Context details for the manifest"""
+        return {"backend": self.backend, "context_ms": self.context_ms,
+                "gl_renderer": self.renderer.context.renderer_name,
+                "gpu_padding": self.renderer.engine.gpu_padding}
+
+    def render_project(self, project_path, out_path):
+        """Render one project to out_path -> manifest entry (errors are reported in the entry, not raised)"""
+        from src.core.layer_stack import LayerStack
+        from src.core.project_io import ProjectIO
+
+        entry = {"project": project_path, "output": None, "status": "ok", "error": None}
+        start = time.perf_counter()
+        layers = ProjectIO.load_project(project_path, None) if os.path.isfile(project_path) else None
+        entry["load_ms"] = _ms(start)
+        if layers is None:
+            entry["status"] = "error"
+            entry["error"] = "Failed to load project"
+            return entry
+        entry["layers"] = len(layers)
+
+        stack = LayerStack()
+        for layer in layers:
+            stack.add_layer(layer)
+
+        try:
+            # Layer init: shaders come from the cache after the first project
+            start = time.perf_counter()
+            self.renderer.initialize_layers(stack)
+            entry["init_ms"] = _ms(start)
+
+            # Render + readback, then encode straight from the mapped buffer
+            if self.profiler:
+                self.profiler.clear()
+            start = time.perf_counter()
+            with self.renderer.map_pixels(stack, padding=self.padding) as pixels:
+                entry["render_ms"] = _ms(start)
+                start = time.perf_counter()
+                save_rgba(out_path, pixels, premultiplied=self.padding <= 0, **self.png_options)
+                entry["write_ms"] = _ms(start)
+            entry["output"] = out_path
+            if self.profiler:
+                self.profiler.finish()
+                entry["profile"] = self.profiler.last_frame
+        except Exception as e:
+            entry["status"] = "error"
+            entry["error"] = str(e)
+            print(f"BatchRenderer: Failed to render {project_path}: {e}")
+        finally:
+            self._release_project(layers)
+        return entry
+
+    def _release_project(self, layers):
+        from src.core.resource_manager import ResourceManager
+        rm = ResourceManager()
+
+        self.renderer.context.make_current()
+        for layer in layers:
+            layer.release()
+        for image_path in {getattr(layer, "image_path", None) for layer in layers} - {None, ""}:
+            remaining = self.image_refs.get(image_path, 1) - 1
+            if remaining > 0:
+                self.image_refs[image_path] = remaining
+            else:
+                self.image_refs.pop(image_path, None)
+                rm.release_texture(image_path)
+
+    def release(self):
+        if self.profiler:
+            self.renderer.context.make_current()
+            self.profiler.release()
+        self.renderer.release()
+
+
+def _image_refs(project_paths):
+    refs = {}
+    for project_path in project_paths:
+        for image_path in set(project_image_paths(project_path)):
+            refs[image_path] = refs.get(image_path, 0) + 1
+    return refs
+
+
+def render_projects(project_paths, output_dir, resolution=2048, padding=4, fmt="png",
+                    analytic=False, backend="auto", workers=1, timeout=None, retries=1, png_options=None,
+                    profile=False):
+    """
+    Render every project into output_dir -> manifest dict (the caller decides
+    where to write it). workers > 1 shards the projects over worker processes.
+    png_options: PNG encoder settings (see src.core.image_io.save_rgba).
+    profile: per-layer GPU/CPU timings and draw counts in each entry's "profile".
+    """
+    from src.core.project_io import ProjectIO
+
+    os.makedirs(output_dir, exist_ok=True)
+    batch_start = time.perf_counter()
+    outputs = output_paths(project_paths, output_dir, fmt)
+    options = {"resolution": resolution, "padding": padding, "fmt": fmt,
+               "analytic": analytic, "backend": backend, "image_refs": _image_refs(project_paths),
+               "png_options": dict(png_options or {}), "profile": profile}
+
+    if workers > 1 and len(project_paths) > 1:
+        entries, info = _render_parallel(list(zip(project_paths, outputs)), options,
+                                         workers, timeout, retries)
+    else:
+        renderer = BatchRenderer(**options)
+        try:
+            entries = [renderer.render_project(p, o) for p, o in zip(project_paths, outputs)]
+            info = renderer.info()
+            info["workers"] = 1
+        finally:
+            renderer.release()
+
+    failed = sum(1 for entry in entries if entry["status"] != "ok")
+    manifest = {
+        "app_version": ProjectIO.APP_VERSION,
+        "resolution": resolution,
+        "padding": padding,
+        "format": fmt,
+        "analytic_geometry": analytic,
+    }
+    if fmt == "png":
+        manifest["png_options"] = options["png_options"]
+    manifest.update(info)
+    manifest.update({
+        "total_ms": _ms(batch_start),
+        "rendered": len(entries) - failed,
+        "failed": failed,
+        "projects": entries,
+    })
+    return manifest
+
+
+# --- Worker pool ---
+
+def _worker_main(conn, options, renderer_class=BatchRenderer, driver_threads=None):
+    """
+    Worker process: ("ready", info) or ("error", message) once, then
+    ("done", index, entry) for every ("job", index, project, out_path) until None.
+    """
+    if driver_threads:
+        # llvmpipe starts one rasterizer thread per core in every process; split the cores instead
+        os.environ.setdefault("LP_NUM_THREADS", str(driver_threads))
+        # Same for the PNG deflate threads
+        png_options = dict(options.get("png_options") or {})
+        png_options.setdefault("threads", driver_threads)
+        options = dict(options, png_options=png_options)
+    from src.core import headless  # Before OpenGL
+
+    try:
+        renderer = renderer_class(**options)
+    except Exception as e:
+        conn.send(("error", str(e)))
+        return
+    info = renderer.info()
+    info["pid"] = os.getpid()
+    conn.send(("ready", info))
+    try:
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            _, index, project_path, out_path = task
+            entry = renderer.render_project(project_path, out_path)
+            entry["worker"] = os.getpid()
+            conn.send(("done", index, entry))
+    except EOFError:
+        pass
+    finally:
+        renderer.release()
+
+
+class _Worker:
+    def __init__(self, mp_context, options, renderer_class, driver_threads):
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(target=_worker_main, daemon=True,
+                                          args=(child_conn, options, renderer_class, driver_threads))
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.job = None      # index of the running job
+        self.started = 0.0   # perf_counter at job start
+
+    def assign(self, index, project_path, out_path):
+        self.job = index
+        self.started = time.perf_counter()
+        self.conn.send(("job", index, project_path, out_path))
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(timeout=None if kill else 10)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def _render_parallel(jobs, options, workers, timeout, retries, renderer_class=BatchRenderer):
+    """
+    jobs: [(project path, output path)] -> ([entry per job, in order], manifest info).
+    renderer_class: BatchRenderer (subclass) the workers run.
+    """
+    import multiprocessing
+    from multiprocessing.connection import wait
+
+    # Fresh interpreters: a forked child would inherit the parent's GL state
+    mp_context = multiprocessing.get_context("spawn")
+    entries = [None] * len(jobs)
+    attempts = [0] * len(jobs)
+    pending = deque(range(len(jobs)))
+    startup_errors = []
+    info = {"workers": min(workers, len(jobs)), "worker_contexts": [], "timeouts": 0, "crashes": 0, "retried": 0}
+
+    def fail(index, message):
+        entries[index] = {"project": jobs[index][0], "output": None, "status": "error",
+                          "error": message, "attempts": attempts[index]}
+
+    driver_threads = max(1, (os.cpu_count() or 1) // info["workers"])
+
+    def spawn():
+        return _Worker(mp_context, options, renderer_class, driver_threads)
+
+    pool = [spawn() for _ in range(info["workers"])]
+    try:
+        while pending or any(w.job is not None for w in pool):
+            # Hand the next job to every idle worker
+            for worker in pool:
+                if worker.ready and worker.job is None and pending:
+                    index = pending.popleft()
+                    attempts[index] += 1
+                    worker.assign(index, *jobs[index])
+
+            if not pool:
+                # Every worker failed to start: nothing can render the rest
+                reason = "; ".join(startup_errors) or "No worker available"
+                while pending:
+                    fail(pending.popleft(), f"Worker startup failed: {reason}")
+                break
+
+            wait_timeout = None
+            if timeout:
+                busy = [w.started + timeout for w in pool if w.job is not None]
+                if busy:
+                    wait_timeout = max(0.0, min(busy) - time.perf_counter())
+            ready = wait([w.conn for w in pool] + [w.process.sentinel for w in pool], wait_timeout)
+
+            for worker in list(pool):
+                message = None
+                if worker.conn in ready:
+                    try:
+                        message = worker.conn.recv()
+                    except (EOFError, OSError):
+                        message = None
+                if message is not None:
+                    if message[0] == "ready":
+                        worker.ready = True
+                        info["worker_contexts"].append(message[1])
+                    elif message[0] == "done":
+                        _, index, entry = message
+                        entry["attempts"] = attempts[index]
+                        entries[index] = entry
+                        worker.job = None
+                    elif message[0] == "error":
+                        startup_errors.append(message[1])
+                        pool.remove(worker)
+                        worker.stop(kill=True)
+                    continue
+
+                timed_out = timeout and worker.job is not None and time.perf_counter() - worker.started > timeout
+                died = worker.conn in ready or worker.process.sentinel in ready
+                if not (timed_out or died):
+                    continue
+
+                # Lost worker: replace it and decide what happens to its job
+                pool.remove(worker)
+                worker.stop(kill=True)
+                index = worker.job
+                if not worker.ready:
+                    startup_errors.append(f"exit code {worker.process.exitcode}")
+                    continue
+                if timed_out:
+                    info["timeouts"] += 1
+                    fail(index, f"Timed out after {timeout}s")
+                elif index is not None:
+                    info["crashes"] += 1
+                    if attempts[index] <= retries:
+                        info["retried"] += 1
+                        pending.appendleft(index)
+                    else:
+                        fail(index, f"Worker crashed (exit code {worker.process.exitcode})")
+                if pending:
+                    pool.append(spawn())
+    finally:
+        for worker in pool:
+            worker.stop(kill=worker.job is not None)
+
+    contexts = info["worker_contexts"]
+    info["backend"] = contexts[0]["backend"] if contexts else None
+    info["context_ms"] = max((c["context_ms"] for c in contexts), default=0.0)
+    return entries, info
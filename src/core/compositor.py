@@ -1,8 +1,10 @@
 from OpenGL.GL import *
-from PySide6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
 import numpy as np
 import ctypes
-from src.layers.adjustment_layer import AdjustmentLayer
+from src.core.shader_builder import FusedShaderCache
+from src.core.resource_manager import ResourceManager
+from src.core.framebuffer import FrameBuffer, PixelPackBuffer
+from src.core.frame_profiler import count, use_program, bind_texture
 
 class Compositor:
     # Blend Modes Mapping (matches shader)
@@ -21,6 +23,8 @@ class Compositor:
         "Difference": 11
     }
 
+    DEFAULT_CACHE_BUDGET_MB = 256
+
     def __init__(self, width=512, height=512):
         self.width = width
         self.height = height
@@ -34,11 +38,42 @@ class Compositor:
         # Resources
         self.blend_program = None
         self.quad_vao = None
+        self.quad_vbo = None
+        self.frame_ubo = None
+        self._normal_map_tex = 0
+
+        # Render Path: fused (one generated program for the whole stack) or multi-pass.
+        # Multi-pass is the reference implementation and the fallback.
+        self.fused = False
+        # Normal/Multiply/Screen layers draw straight into the accumulator with
+        # fixed-function blending instead of a layer FBO + blend.frag pass.
+        self.hardware_blend = True
+        # Analytic geometry: layers are drawn as a full-screen quad and the sphere
+        # is reconstructed per pixel (exact normals/UVs, anti-aliased rim) instead
+        # of rasterising the tessellated mesh. See AnalyticSphere.
+        self.analytic = False
+
+        # Incremental Compositing
+        # Snapshots of the accumulated image after layer i: {i: (prefix keys, fbo)}.
+        # An edit to layer k resumes from the nearest valid snapshot below k.
+        self.cache_budget_mb = self.DEFAULT_CACHE_BUDGET_MB
+        self._snapshots = {}
+        self._frame_key = None
+        self._rendered_keys = None
+        self._hot_index = -1
+
+        # Edge padding (see pad): RG32F seed-coordinate ping-pong, allocated on first use
+        self._pad_fbos = None
+        # Readback target shared by all FBOs of this compositor (see map_pixels)
+        self.readback = PixelPackBuffer()
+        # Per-layer timing and counters (src.core.frame_profiler.FrameProfiler); None = off, no extra GL calls
+        self.profiler = None
 
     def initialize(self):
         self._create_fbos()
         self._init_blend_shader()
         self._init_quad_geometry()
+        self._init_frame_ubo()
 
     def resize(self, width, height):
         self.width = width
@@ -57,184 +92,537 @@ class Compositor:
         if not self.fbo_ping:
             return
 
-        # Context Unpacking
-        global_normal_id = context.get('global_normal_id')
-        use_global_normal = context.get('use_global_normal', False)
-        ns = context.get('normal_strength', 1.0)
-        nsc = context.get('normal_scale', 1.0)
-        noff = context.get('normal_offset', (0.0, 0.0))
-        pm = context.get('preview_mode_int', 0)
-
         # Flush errors
         while glGetError() != GL_NO_ERROR: pass
 
         glViewport(0, 0, self.width, self.height)
 
-        # Clear Accumulators
-        self.fbo_ping.bind()
-        glClearColor(0.0, 0.0, 0.0, 0.0)
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        self.fbo_ping.release()
+        layers = [l for l in layer_stack if l.enabled and l.shader_program and l.prepare()]
+        layer_keys = [self._layer_key(l) for l in layers]
 
-        self.fbo_pong.bind()
-        glClearColor(0.0, 0.0, 0.0, 0.0)
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        self.fbo_pong.release()
+        frame_key = self._make_frame_key(context)
+        if frame_key != self._frame_key:
+            self._drop_snapshots()
+            self._frame_key = frame_key
+            self._rendered_keys = None
+
+        # Nothing changed since the last frame: final_fbo is still valid
+        if layer_keys == self._rendered_keys:
+            return
+
+        dirty = self._first_dirty_index(layer_keys)
+        if dirty > 0:
+            self._hot_index = dirty - 1
+        self._rendered_keys = layer_keys
+
+        prof = self.profiler
+        if prof:
+            prof.begin_frame(self.width, self.height)
+        path = self._render_frame(layers, layer_keys, context, prof)
+        if prof:
+            prof.end_frame(path)
+
+    def _render_frame(self, layers, layer_keys, context, prof):
+        """Draw the changed part of the stack into final_fbo -> name of the path used"""
+        self._upload_frame_globals(context)
+        rm = ResourceManager()
+
+        if self.fused and self._render_fused(layers, context, prof):
+            return "fused"
+
+        keep = self._snapshot_plan(len(layers))
+        start, current_fbo = self._find_resume_point(layer_keys)
 
+        if current_fbo is None:
+            # Clear Accumulator
+            self.fbo_ping.bind()
+            self._clear()
+            self.fbo_ping.unbind()
+        else:
+            # Resume from a snapshot. Copied, as hardware-blended layers draw into the accumulator.
+            self._blit(current_fbo, self.fbo_ping)
+            if prof:
+                for i in range(start):
+                    prof.cached_layer(i, layers[i].name, type(layers[i]).__name__)
         current_fbo = self.fbo_ping
-        next_fbo = self.fbo_pong
 
-        for layer in layer_stack:
-            if not layer.enabled or not layer.shader_program:
+        for i in range(start, len(layers)):
+            layer = layers[i]
+            next_fbo = self.fbo_pong if current_fbo is self.fbo_ping else self.fbo_ping
+            if prof:
+                prof.begin_layer(i, layer.name, type(layer).__name__)
+
+            # --- Hardware Blend Logic ---
+            if self.hardware_blend and self._render_direct(layer, current_fbo, context):
+                self._store_snapshot(i, layer_keys, current_fbo, keep)
+                if prof:
+                    prof.end_layer("direct")
                 continue
 
             # --- Adjustment Layer Logic ---
-            if isinstance(layer, AdjustmentLayer):
+            # Layers that filter the accumulated image (input_sampler), e.g. AdjustmentLayer
+            if layer.input_sampler:
                 next_fbo.bind()
-                glClearColor(0.0, 0.0, 0.0, 0.0)
-                glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+                self._clear()
                 
                 glDisable(GL_BLEND)
-                glUseProgram(layer.shader_program)
+                use_program(layer.shader_program)
                 
-                glActiveTexture(GL_TEXTURE0)
-                glBindTexture(GL_TEXTURE_2D, current_fbo.texture())
+                bind_texture(0, current_fbo.texture)
                 
-                layer.render() # Calls glDrawArrays typically? No, layer.render sets uniforms.
-                # We need to draw the quad here?
-                # Engine.py lines 159-163: layer.render(), then draw quad.
+                # layer.render() only sets uniforms; the full-screen quad is drawn here
+                layer.render()
                 
-                glBindVertexArray(self.quad_vao)
-                glDrawArrays(GL_TRIANGLES, 0, 6)
-                glBindVertexArray(0)
+                self._draw_quad()
                 
-                next_fbo.release()
-                current_fbo, next_fbo = next_fbo, current_fbo
+                next_fbo.unbind()
+                current_fbo = next_fbo
+                self._store_snapshot(i, layer_keys, current_fbo, keep)
+                if prof:
+                    prof.end_layer("adjustment")
                 continue
 
             # --- Standard Layer Logic ---
+            # 1. Draw the layer alone into fbo_layer (layer.render() sets uniforms and draws its geometry)
             self.fbo_layer.bind()
-            glClearColor(0.0, 0.0, 0.0, 0.0)
-            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            self._clear()
             
             glDisable(GL_BLEND)
-            glUseProgram(layer.shader_program)
-
-            # Uniforms
-            glUniform1i(glGetUniformLocation(layer.shader_program, "normalMap"), 5)
-            glActiveTexture(GL_TEXTURE5)
-            if use_global_normal and global_normal_id:
-                glBindTexture(GL_TEXTURE_2D, global_normal_id)
+            analytic_program = self._analytic_program(layer)
+            if analytic_program:
+                use_program(analytic_program)
+                self._set_frame_uniforms(analytic_program)
+                layer.upload_uniforms(analytic_program)
+                self._draw_quad()
             else:
-                glBindTexture(GL_TEXTURE_2D, 0)
-            
-            glUniform1i(glGetUniformLocation(layer.shader_program, "useNormalMap"), 1 if use_global_normal else 0)
-            glUniform1f(glGetUniformLocation(layer.shader_program, "normalStrength"), ns)
-            glUniform1f(glGetUniformLocation(layer.shader_program, "normalScale"), nsc)
-            glUniform2f(glGetUniformLocation(layer.shader_program, "normalOffset"), *noff)
-            glUniform1i(glGetUniformLocation(layer.shader_program, "previewMode"), pm)
-
-            # Scaling / Aspect Ratio
-            content_hw = 0.95 if pm == 1 else 1.0
-            content_hh = 0.45 if pm == 1 else 1.0
-            content_aspect = content_hw / content_hh
-            
-            vp_w = max(1.0, float(self.width))
-            vp_h = max(1.0, float(self.height))
-            screen_aspect = vp_w / vp_h
-            
-            raw_zoom = 1.0
-            if screen_aspect > content_aspect:
-                 raw_zoom = 1.0 / content_hh
-            else:
-                 raw_zoom = screen_aspect / content_hw # Fit Width logic corrected in Engine?
-            
-            # Re-check Engine.py logic (Step 14):
-            # else: raw_zoom = screen_aspect / content_hw
-            # scale_y = raw_zoom
-            # scale_x = raw_zoom / screen_aspect
-            
-            scale_y = raw_zoom
-            scale_x = raw_zoom / screen_aspect 
-            
-            glUniform3f(glGetUniformLocation(layer.shader_program, "uScale"), scale_x, scale_y, 1.0)
-            
-            layer.render() # Sets other uniforms? And Draws?
-            # Wait, layer.render() in Engine.py line 223 calls `layer.render()`.
-            # BaseLayer.render() typically does NOT draw, it update uniforms.
-            # Engine.py does NOT draw quad for Standard Layer??
-            # Let's check Engine.py line 223.
-            # `layer.render()`
-            # Does `layer.render()` draw?
-            # `src/layers/interface.py`: `render` is pass.
-            # `src/layers/base_layer.py`: Usually draws geometry?
-            # Let's check `src/layers/base_layer.py`.
-            
-            # Assuming layer.render() sets uniforms and draws geometry.
-            # But wait, AdjustmentLayer logic EXPLICITLY draws quad in Engine.py (line 163).
-            # But Standard Layer logic (line 223) calls `layer.render()`.
-            # I must check `BaseLayer.render` implementation.
+                use_program(layer.shader_program)
+                self._set_frame_uniforms(layer.shader_program)
+
+                layer.render()
             
-            self.fbo_layer.release()
+            self.fbo_layer.unbind()
             
-            # Composite
+            # 2. Composite: blend.frag reads fbo_layer (uSrc) over current_fbo (uDst) into next_fbo
             next_fbo.bind()
-            glClearColor(0.0, 0.0, 0.0, 0.0) # OR retain background? Engine clears it.
-            # Logic: We blend fbo_layer over current_fbo.
-            # If next_fbo is cleared, we need to draw current_fbo? 
-            # Engine.py line 230: glClear.
-            # Line 246: binds `current_fbo` as TEXTURE1.
-            # So the blend shader reads both and outputs result.
-            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT) 
+            self._clear()
             
             glDisable(GL_BLEND)
-            glUseProgram(self.blend_program)
+            use_program(self.blend_program)
             
-            glActiveTexture(GL_TEXTURE0)
-            glBindTexture(GL_TEXTURE_2D, self.fbo_layer.texture())
-            glUniform1i(glGetUniformLocation(self.blend_program, "uSrc"), 0)
+            bind_texture(0, self.fbo_layer.texture)
+            rm.set_uniform(self.blend_program, "uSrc", 0)
             
-            glActiveTexture(GL_TEXTURE1)
-            glBindTexture(GL_TEXTURE_2D, current_fbo.texture())
-            glUniform1i(glGetUniformLocation(self.blend_program, "uDst"), 1)
+            bind_texture(1, current_fbo.texture)
+            rm.set_uniform(self.blend_program, "uDst", 1)
             
             mode_id = self.BLEND_MODES.get(layer.blend_mode, 0)
-            glUniform1i(glGetUniformLocation(self.blend_program, "uMode"), mode_id)
-            glUniform1f(glGetUniformLocation(self.blend_program, "uOpacity"), 1.0)
+            rm.set_uniform(self.blend_program, "uMode", mode_id)
+            rm.set_uniform(self.blend_program, "uOpacity", 1.0)
             
-            glBindVertexArray(self.quad_vao)
-            glDrawArrays(GL_TRIANGLES, 0, 6)
-            glBindVertexArray(0)
+            self._draw_quad()
             
-            next_fbo.release()
+            next_fbo.unbind()
             
-            current_fbo, next_fbo = next_fbo, current_fbo
+            current_fbo = next_fbo
+            self._store_snapshot(i, layer_keys, current_fbo, keep)
+            if prof:
+                prof.end_layer("blend")
 
         self.final_fbo = current_fbo
+        self._prune_snapshots(layer_keys, keep)
+        return "multipass"
+
+    # --- Incremental Compositing ---
+
+    @staticmethod
+    def _layer_key(layer):
+        """
+        Everything the layer's output depends on, by value: uniforms, texture contents,
+        blend mode, program and mesh (plus the mark_dirty() version). Parameters set
+        without mark_dirty() are seen, and another stack with the same parameters
+        (the next export) reuses the cached result.
+        """
+        uniforms = tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in sorted(layer.get_uniforms().items()))
+        return (type(layer), layer.version, layer.blend_mode, layer.shader_program, layer.mesh, uniforms,
+                tuple(sorted(layer.get_texture_keys().items())))
+
+    def _make_frame_key(self, context):
+        """Global inputs shared by all layers; any change invalidates every snapshot."""
+        items = []
+        for k in sorted(context):
+            v = context[k]
+            items.append((k, tuple(v) if isinstance(v, list) else v))
+        return (self.width, self.height, self.fused, self.hardware_blend, self.analytic, tuple(items))
+
+    def _first_dirty_index(self, layer_keys):
+        prev = self._rendered_keys or []
+        for i, key in enumerate(layer_keys):
+            if i >= len(prev) or prev[i] != key:
+                return i
+        return len(layer_keys)
+
+    def _snapshot_plan(self, count):
+        """
+        Snapshot indices to keep within the memory budget: the one right below
+        the most recently edited layer (slider drags hit the same layer every
+        frame), plus evenly spaced checkpoints for edits elsewhere.
+        The top layer is never a resume point, so candidates are 0..count-2.
+        """
+        candidates = count - 1
+        snapshot_bytes = self.width * self.height * 4
+        slots = int(self.cache_budget_mb * 1024 * 1024) // max(1, snapshot_bytes)
+        slots = min(slots, candidates)
+        if slots <= 0:
+            return set()
+
+        keep = set()
+        if 0 <= self._hot_index < candidates:
+            keep.add(self._hot_index)
+
+        remaining = slots - len(keep)
+        for j in range(remaining):
+            keep.add(((j + 1) * candidates) // (remaining + 1))
+        return keep
+
+    def _find_resume_point(self, layer_keys):
+        """Highest snapshot whose prefix still matches -> (first layer to render, source fbo)."""
+        for i in sorted(self._snapshots, reverse=True):
+            prefix, fbo = self._snapshots[i]
+            if i < len(layer_keys) and prefix == tuple(layer_keys[:i + 1]):
+                return i + 1, fbo
+        return 0, None
+
+    def _store_snapshot(self, index, layer_keys, source_fbo, keep):
+        if index not in keep:
+            return
+        entry = self._snapshots.get(index)
+        fbo = entry[1] if entry else FrameBuffer(self.width, self.height, depth=False)
+        self._blit(source_fbo, fbo)
+        self._snapshots[index] = (tuple(layer_keys[:index + 1]), fbo)
+
+    def _prune_snapshots(self, layer_keys, keep):
+        for i in list(self._snapshots):
+            prefix, _ = self._snapshots[i]
+            if i not in keep or prefix != tuple(layer_keys[:i + 1]):
+                self._snapshots.pop(i)[1].delete()
+
+    def _drop_snapshots(self):
+        for _, fbo in self._snapshots.values():
+            fbo.delete()
+        self._snapshots.clear()
+
+    def invalidate(self):
+        """Force a full re-render on the next frame (e.g. after external GL state changes)."""
+        self._drop_snapshots()
+        self._frame_key = None
+        self._rendered_keys = None
+
+    def _blit(self, src, dst):
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, src.fbo)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, dst.fbo)
+        glBlitFramebuffer(0, 0, self.width, self.height, 0, 0, self.width, self.height, GL_COLOR_BUFFER_BIT, GL_NEAREST)
+        count("fbo_binds", 2)
+        count("blits")
+        src.unbind()
+
+    def _clear(self):
+        """Clear the bound FBO to transparent black"""
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        count("clears")
+
+    def _render_direct(self, layer, target_fbo, context):
+        """
+        Draw a layer onto the accumulator with fixed-function blending.
+        Returns False if its blend mode needs the blend.frag pass.
+        """
+        if layer.input_sampler or not layer.fragment_shader:
+            return False
+        if not (self.analytic or layer.mesh):
+            return False
+        if not layer.setup_blend_func():
+            return False
+        program = FusedShaderCache().get_direct(layer.fragment_shader, self.analytic)
+        if not program:
+            return False
+
+        target_fbo.bind()
+        depth_test = glIsEnabled(GL_DEPTH_TEST)
+        cull_face = glIsEnabled(GL_CULL_FACE)
+
+        # Each pixel must be blended once: keep only the front (z < 0) hemisphere,
+        # the one that ends up visible in the multi-pass layer FBO.
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_CULL_FACE)
+        glCullFace(GL_BACK)
+        glEnable(GL_BLEND)
+
+        use_program(program)
+        self._set_frame_uniforms(program)
+        layer.upload_uniforms(program)
+
+        if self.analytic:
+            self._draw_quad()
+        else:
+            layer.mesh.draw()
+
+        glDisable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        if depth_test:
+            glEnable(GL_DEPTH_TEST)
+        if not cull_face:
+            glDisable(GL_CULL_FACE)
+        target_fbo.unbind()
+        return True
+
+    def _render_fused(self, layers, context, prof=None):
+        """
+        Single-pass path: the whole stack is evaluated by one generated program
+        (see FusedShaderBuilder) in one sphere draw. Returns False if the stack
+        cannot be fused, in which case the multi-pass path is used.
+        """
+        entries = []
+        mesh = None
+        for layer in layers:
+            if not layer.fragment_shader:
+                return False
+            entries.append((layer.fragment_shader, self.BLEND_MODES.get(layer.blend_mode, 0), layer.input_sampler))
+            if mesh is None and layer.mesh:
+                mesh = layer.mesh
+
+        if entries and mesh is None and not self.analytic:
+            return False
+
+        fused = FusedShaderCache().get(entries, self.analytic) if entries else None
+        if entries and fused is None:
+            return False
+
+        if prof:
+            # One pass for the whole stack: timed as a single entry
+            prof.begin_layer(None, ", ".join(layer.name for layer in layers), "fused")
+        self.fbo_ping.bind()
+        self._clear()
+
+        if fused:
+            glDisable(GL_BLEND)
+            glDepthFunc(GL_LEQUAL)
+            glDepthMask(GL_FALSE)
+            use_program(fused.program)
+            self._set_frame_uniforms(fused.program)
+            for layer, suffix, units in zip(layers, fused.suffixes, fused.texture_units):
+                layer.upload_uniforms(fused.program, suffix, units)
+
+            if self.analytic:
+                self._draw_quad()
+            else:
+                mesh.draw()
+
+            glDepthFunc(GL_LESS)
+            glDepthMask(GL_TRUE)
+
+        self.fbo_ping.unbind()
+        self.final_fbo = self.fbo_ping
+        if prof:
+            prof.end_layer("fused")
+        return True
+
+    def _analytic_program(self, layer):
+        """Full-screen quad program for a mesh layer in analytic mode, or None to draw the mesh."""
+        if not self.analytic or not layer.fragment_shader:
+            return None
+        return FusedShaderCache().get_analytic(layer.fragment_shader)
+
+    def _draw_quad(self):
+        glBindVertexArray(self.quad_vao)
+        glDrawArrays(GL_TRIANGLES, 0, 6)
+        glBindVertexArray(0)
+        count("draw_calls")
+
+    def _upload_frame_globals(self, context):
+        """
+        Per-frame globals shared by all layer shaders (normal map, preview mode,
+        aspect scaling): one std140 FrameGlobals block upload instead of setting
+        them on every program.
+        """
+        global_normal_id = context.get('global_normal_id')
+        use_global_normal = context.get('use_global_normal', False)
+        ns = context.get('normal_strength', 1.0)
+        nsc = context.get('normal_scale', 1.0)
+        noff = context.get('normal_offset', (0.0, 0.0))
+        pm = context.get('preview_mode_int', 0)
+        scale_x, scale_y = self._content_scale(pm)
+
+        # std140 layout: vec3 uScale @0, float normalStrength @12, vec2 normalOffset @16,
+        # float normalScale @24, int previewMode @28, bool useNormalMap @32, size 48
+        data = np.zeros(12, dtype=np.float32)
+        data[0:3] = (scale_x, scale_y, 1.0)
+        data[3] = ns
+        data[4:6] = noff
+        data[6] = nsc
+        data[7:9].view(np.int32)[:] = (pm, 1 if use_global_normal else 0)
+
+        glBindBuffer(GL_UNIFORM_BUFFER, self.frame_ubo)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, data.nbytes, data)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+        glBindBufferBase(GL_UNIFORM_BUFFER, ResourceManager.FRAME_GLOBALS_BINDING, self.frame_ubo)
+
+        self._normal_map_tex = global_normal_id if (use_global_normal and global_normal_id) else 0
+
+    def _set_frame_uniforms(self, program):
+        """Bind the shared normal map on unit 5 for a layer program (the rest comes from FrameGlobals)."""
+        # Rebound per draw: texture uploads and FBO creation in between may use the active unit
+        bind_texture(5, self._normal_map_tex)
+        glActiveTexture(GL_TEXTURE0)
+        ResourceManager().set_uniform(program, "normalMap", 5)
+
+    def _content_scale(self, preview_mode):
+        """Scaling / Aspect Ratio: fit the content (1 or 2 spheres) into the viewport."""
+        content_hw = 0.95 if preview_mode == 1 else 1.0
+        content_hh = 0.45 if preview_mode == 1 else 1.0
+        content_aspect = content_hw / content_hh
+        
+        vp_w = max(1.0, float(self.width))
+        vp_h = max(1.0, float(self.height))
+        screen_aspect = vp_w / vp_h
+        
+        if screen_aspect > content_aspect:
+             raw_zoom = 1.0 / content_hh   # Fit Height
+        else:
+             raw_zoom = screen_aspect / content_hw   # Fit Width
+        
+        scale_y = raw_zoom
+        scale_x = raw_zoom / screen_aspect 
+        return scale_x, scale_y
+
+    # --- Edge Padding ---
+
+    def pad(self, padding):
+        """
+        Edge padding of the last render as a GPU pass (jump flooding): transparent
+        pixels within `padding` px take the color of the nearest opaque pixel,
+        the rest becomes opaque black. Same result as src.core.padding.apply_padding
+        up to ties between equidistant pixels.
+        Returns the FrameBuffer holding the straight-alpha result (valid until the
+        next render), or None if the pass is unavailable.
+        """
+        rm = ResourceManager()
+        seed_program = rm.get_shader("src/shaders/quad.vert", "src/shaders/padding_seed.frag")
+        jfa_program = rm.get_shader("src/shaders/quad.vert", "src/shaders/padding_jfa.frag")
+        fill_program = rm.get_shader("src/shaders/quad.vert", "src/shaders/padding_fill.frag")
+        if not (seed_program and jfa_program and fill_program and self.final_fbo):
+            return None
+
+        if self._pad_fbos is None:
+            self._pad_fbos = [FrameBuffer(self.width, self.height, depth=False, internal_format=GL_RG32F)
+                              for _ in range(2)]
+        seeds, scratch = self._pad_fbos
+        color = self.final_fbo
+        # Output goes to the per-layer scratch FBO, which is free between renders
+        out = self.fbo_layer if color is not self.fbo_layer else self.fbo_pong
+
+        depth_test = glIsEnabled(GL_DEPTH_TEST)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_BLEND)
+
+        seeds.bind()
+        glUseProgram(seed_program)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D, color.texture)
+        rm.set_uniform(seed_program, "uColor", 0)
+        self._draw_quad()
+
+        # Steps cover distances up to 2 * largest - 1 >= padding; the extra final step 1 fixes most JFA misses
+        step = 1 << max(0, int(padding).bit_length() - 1)
+        steps = []
+        while step >= 1:
+            steps.append(step)
+            step //= 2
+        steps.append(1)
+
+        glUseProgram(jfa_program)
+        rm.set_uniform(jfa_program, "uSeeds", 0)
+        for step in steps:
+            scratch.bind()
+            glBindTexture(GL_TEXTURE_2D, seeds.texture)
+            rm.set_uniform(jfa_program, "uStep", step)
+            self._draw_quad()
+            seeds, scratch = scratch, seeds
+
+        out.bind()
+        glUseProgram(fill_program)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D, color.texture)
+        rm.set_uniform(fill_program, "uColor", 0)
+        glActiveTexture(GL_TEXTURE1)
+        glBindTexture(GL_TEXTURE_2D, seeds.texture)
+        rm.set_uniform(fill_program, "uSeeds", 1)
+        rm.set_uniform(fill_program, "uPadding", float(padding))
+        self._draw_quad()
+        glActiveTexture(GL_TEXTURE0)
+        out.unbind()
+
+        if depth_test:
+            glEnable(GL_DEPTH_TEST)
+        return out
+
+    def map_pixels(self, fbo=None):
+        """
+        Zero-copy readback of fbo (default: the last render) through this compositor's
+        pixel pack buffer, see FrameBuffer.map_pixels. Use as a context manager.
+        """
+        return (fbo or self.final_fbo).map_pixels(self.readback)
+
+    def memory_bytes(self):
+        """
+        Approximate GPU memory held: 3 RGBA8 + depth-stencil FBOs, the RGBA8 snapshots,
+        padding and readback buffers.
+        """
+        pixels = self.width * self.height
+        pad_bytes = pixels * 8 * 2 if self._pad_fbos else 0
+        return pixels * 8 * 3 + pixels * 4 * len(self._snapshots) + pad_bytes + self.readback.size
+
+    def release(self):
+        """Free GPU resources (GL context must be current)."""
+        self._drop_snapshots()
+        self._delete_fbos()
+        self.readback.delete()
+        if self.quad_vao:
+            glDeleteVertexArrays(1, [self.quad_vao])
+            glDeleteBuffers(1, [self.quad_vbo])
+            self.quad_vao = self.quad_vbo = None
+        if self.frame_ubo:
+            glDeleteBuffers(1, [self.frame_ubo])
+            self.frame_ubo = None
 
     def get_texture_id(self):
-        return self.final_fbo.texture() if self.final_fbo else 0
+        return self.final_fbo.texture if self.final_fbo else 0
+
+    def _delete_fbos(self):
+        for fbo in (self.fbo_layer, self.fbo_ping, self.fbo_pong) + tuple(self._pad_fbos or ()):
+            if fbo:
+                fbo.delete()
+        self.fbo_layer = self.fbo_ping = self.fbo_pong = self.final_fbo = None
+        self._pad_fbos = None
 
     def _create_fbos(self):
-        def make_fbo(w, h):
-            fmt = QOpenGLFramebufferObjectFormat()
-            fmt.setAttachment(QOpenGLFramebufferObject.CombinedDepthStencil)
-            fbo = QOpenGLFramebufferObject(w, h, fmt)
-            return fbo
-
-        if self.fbo_layer: del self.fbo_layer
-        if self.fbo_ping: del self.fbo_ping
-        if self.fbo_pong: del self.fbo_pong
+        self._delete_fbos()
         
-        self.fbo_layer = make_fbo(self.width, self.height)
-        self.fbo_ping = make_fbo(self.width, self.height)
-        self.fbo_pong = make_fbo(self.width, self.height)
+        self.fbo_layer = FrameBuffer(self.width, self.height)
+        self.fbo_ping = FrameBuffer(self.width, self.height)
+        self.fbo_pong = FrameBuffer(self.width, self.height)
         self.final_fbo = self.fbo_ping
+        self.invalidate()
 
     def _init_blend_shader(self):
-        from src.core.resource_manager import ResourceManager
         self.blend_program = ResourceManager().get_shader("src/shaders/quad.vert", "src/shaders/blend.frag")
 
+    def _init_frame_ubo(self):
+        # FrameGlobals uniform block (std140, 48 bytes), see _upload_frame_globals
+        self.frame_ubo = glGenBuffers(1)
+        glBindBuffer(GL_UNIFORM_BUFFER, self.frame_ubo)
+        glBufferData(GL_UNIFORM_BUFFER, 48, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+
     def _init_quad_geometry(self):
         quad_vertices = np.array([
             -1.0,  1.0,  0.0, 1.0,
@@ -246,10 +634,10 @@ class Compositor:
         ], dtype=np.float32)
         
         self.quad_vao = glGenVertexArrays(1)
-        vbo = glGenBuffers(1)
+        self.quad_vbo = glGenBuffers(1)
         
         glBindVertexArray(self.quad_vao)
-        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glBindBuffer(GL_ARRAY_BUFFER, self.quad_vbo)
         glBufferData(GL_ARRAY_BUFFER, quad_vertices.nbytes, quad_vertices, GL_STATIC_DRAW)
         
         glEnableVertexAttribArray(0)
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from src.core.compositor import Compositor
+
+
+class CompositorPool:
+    """
+    Offscreen compositors keyed by resolution, reused across exports and
+    preview/thumbnail renders so repeated renders at the same size allocate
+    nothing on the GPU. Least recently used entries are released once the
+    pool exceeds its memory cap.
+
+    Compositors own FBOs and VAOs, so a pool belongs to one GL context
+    and must only be used while that context is current.
+    """
+    DEFAULT_MAX_MB = 1024
+
+    def __init__(self, max_mb=DEFAULT_MAX_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._compositors = OrderedDict()  # (width, height) -> Compositor
+
+    def acquire(self, width, height):
+        key = (width, height)
+        compositor = self._compositors.get(key)
+        if compositor is not None:
+            self._compositors.move_to_end(key)
+            return compositor
+
+        compositor = Compositor(width, height)
+        compositor.cache_budget_mb = 0 # One-off renders, prefix snapshots would never pay off
+        compositor.initialize()
+        self._compositors[key] = compositor
+        self._evict(keep=key)
+        return compositor
+
+    def _evict(self, keep):
+        # The requested entry always stays, even if it alone exceeds the cap
+        while self.memory_bytes() > self.max_bytes and len(self._compositors) > 1:
+            key = next(iter(self._compositors))
+            if key == keep:
+                break
+            self._compositors.pop(key).release()
+
+    def memory_bytes(self):
+        return sum(c.memory_bytes() for c in self._compositors.values())
+
+    def __len__(self):
+        return len(self._compositors)
+
+    def invalidate(self):
+        """
+        Force full renders: frame caches key layers by id(), which a new
+        layer stack can reuse once the previous one is freed.
+        """
+        for compositor in self._compositors.values():
+            compositor.invalidate()
+
+    def clear(self):
+        for compositor in self._compositors.values():
+            compositor.release()
+        self._compositors.clear()
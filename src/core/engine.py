@@ -1,4 +1,6 @@
+from contextlib import contextmanager
 from src.core.compositor import Compositor
+from src.core.compositor_pool import CompositorPool
 
 class Engine:
     # Expose Blend Modes (Facade)
@@ -8,6 +10,14 @@ class Engine:
         self.width = width
         self.height = height
         self.compositor = Compositor(width, height)
+        # Offscreen renders (exports, project previews), reused across calls
+        self.offscreen_pool = CompositorPool()
+        # render() at a fraction of the size (interactive preview), see set_render_scale
+        self.render_scale = 1.0
+        self._scaled_compositor = None
+        self._last_compositor = self.compositor
+        # Per-layer timing of every compositor's renders (FrameProfiler), None = off
+        self.profiler = None
         
         # Global State
         self.global_normal_id = None
@@ -18,6 +28,8 @@ class Engine:
         self.normal_scale = 1.0
         self.normal_offset = [0.0, 0.0]
         self.preview_mode_int = 0
+        # Export edge padding as a GPU pass (Compositor.pad) or with NumPy (src.core.padding)
+        self.gpu_padding = True
         
     def initialize(self):
         self.compositor.initialize()
@@ -41,6 +53,63 @@ class Engine:
     def set_preview_rotation(self, angle):
         self.preview_rotation = angle
 
+    def set_cache_budget(self, megabytes):
+        # Memory for incremental compositing snapshots (0 = always render the whole stack)
+        self.compositor.cache_budget_mb = megabytes
+
+    def set_fused_rendering(self, enabled):
+        # Single-pass generated shader instead of one pass per layer (falls back automatically)
+        self.compositor.fused = enabled
+
+    def set_analytic_geometry(self, enabled):
+        # Per-pixel analytic sphere on a full-screen quad instead of the tessellated mesh
+        self.compositor.analytic = enabled
+
+    def set_profiler(self, profiler):
+        """Time renders with a src.core.frame_profiler.FrameProfiler (None turns profiling off)"""
+        self.profiler = profiler
+        self.compositor.profiler = profiler
+
+    def set_render_scale(self, scale):
+        """
+        Internal resolution of render() relative to the engine size, e.g. 0.5 while a
+        slider is dragged. Reduced frames use their own compositor, so the full-size
+        one keeps its cached prefixes for the refinement frame.
+        """
+        self.render_scale = min(1.0, max(0.05, float(scale)))
+
+    def render_size(self):
+        """Size of the image render() produces at the current render scale"""
+        if self.render_scale >= 1.0:
+            return self.width, self.height
+        return (max(1, round(self.width * self.render_scale)),
+                max(1, round(self.height * self.render_scale)))
+
+    def _render_compositor(self):
+        if self.render_scale >= 1.0:
+            return self.compositor
+        width, height = self.render_size()
+        comp = self._scaled_compositor
+        if comp is None:
+            comp = self._scaled_compositor = Compositor(width, height)
+            comp.initialize()
+        elif (comp.width, comp.height) != (width, height):
+            comp.resize(width, height)
+        comp.fused = self.compositor.fused
+        comp.analytic = self.compositor.analytic
+        comp.hardware_blend = self.compositor.hardware_blend
+        comp.cache_budget_mb = self.compositor.cache_budget_mb
+        comp.profiler = self.profiler
+        return comp
+
+    def set_gpu_padding(self, enabled):
+        # The jump-flood pass beats NumPy on real GPUs, not on software rasterizers (llvmpipe)
+        self.gpu_padding = enabled
+
+    @property
+    def analytic_geometry(self):
+        return self.compositor.analytic
+
     def render(self, layer_stack):
         context = {
             'global_normal_id': self.global_normal_id,
@@ -50,16 +119,70 @@ class Engine:
             'normal_offset': self.normal_offset,
             'preview_mode_int': self.preview_mode_int
         }
-        self.compositor.render(layer_stack, context)
+        comp = self._render_compositor()
+        comp.render(layer_stack, context)
+        self._last_compositor = comp
         
     def get_texture_id(self):
-        return self.compositor.get_texture_id()
+        """Result of the last render() (render_size() pixels)"""
+        return self._last_compositor.get_texture_id()
 
-    def render_offscreen(self, width, height, layer_stack, preview_mode_override=None, force_no_normal=False):
-        """Render to image using temp engine instance to handle resolution change"""
-        # Create a temp Compositor with desired res
-        temp_comp = Compositor(width, height)
-        temp_comp.initialize()
+    def release(self):
+        """Free every compositor's GPU resources (GL context must be current)"""
+        self.offscreen_pool.clear()
+        self.compositor.release()
+        if self._scaled_compositor is not None:
+            self._scaled_compositor.release()
+            self._scaled_compositor = None
+        self._last_compositor = self.compositor
+
+    def render_offscreen(self, width, height, layer_stack, preview_mode_override=None, force_no_normal=False, padding=0):
+        """Render to image using a pooled compositor of the requested resolution"""
+        pixels = self.render_offscreen_pixels(width, height, layer_stack, preview_mode_override, force_no_normal, padding)
+        if pixels is None:
+            return None # Should not happen
+
+        from PySide6.QtGui import QImage
+        # Composited colors are premultiplied by coverage (same format QOpenGLFramebufferObject.toImage() used),
+        # padded results are straight alpha
+        fmt = QImage.Format.Format_RGBA8888 if padding > 0 else QImage.Format.Format_RGBA8888_Premultiplied
+        img = QImage(pixels.data, width, height, width * 4, fmt)
+        return img.copy() # Detach from the numpy buffer
+
+    def render_offscreen_pixels(self, width, height, layer_stack, preview_mode_override=None, force_no_normal=False, padding=0):
+        """
+        Same as render_offscreen, as an (height, width, 4) uint8 RGBA array (top row first).
+        padding > 0: edge padding pass (Compositor.pad), result in straight alpha.
+        """
+        with self.map_offscreen(width, height, layer_stack, preview_mode_override, force_no_normal, padding) as pixels:
+            return None if pixels is None else pixels.copy()
+
+    def save_offscreen(self, path, width, height, layer_stack, preview_mode_override=None, force_no_normal=False, padding=0,
+                       png_options=None):
+        """
+        Render and write an image file straight from the mapped readback buffer
+        (no intermediate frame copies). Returns False if nothing was rendered.
+        png_options: PNG encoder settings (see src.core.image_io.save_rgba).
+        """
+        from src.core.image_io import save_rgba
+        with self.map_offscreen(width, height, layer_stack, preview_mode_override, force_no_normal, padding) as pixels:
+            if pixels is None:
+                return False
+            save_rgba(path, pixels, premultiplied=padding <= 0, **(png_options or {}))
+        return True
+
+    @contextmanager
+    def map_offscreen(self, width, height, layer_stack, preview_mode_override=None, force_no_normal=False, padding=0):
+        """
+        render_offscreen_pixels without copying: yields a writable view of the mapped
+        pixel pack buffer (FrameBuffer.map_pixels), valid inside the with block only.
+        Yields None if nothing was rendered.
+        """
+        comp = self.offscreen_pool.acquire(width, height)
+        comp.fused = self.compositor.fused
+        comp.analytic = self.compositor.analytic
+        comp.hardware_blend = self.compositor.hardware_blend
+        comp.profiler = self.profiler
         
         # Copy global state
         use_normal = self.use_global_normal
@@ -77,17 +200,24 @@ class Engine:
             'preview_mode_int': mode
         }
             
-        # Render
-        temp_comp.render(layer_stack, ctx)
-        
-        # Get Image
-        if temp_comp.final_fbo:
-            img = temp_comp.final_fbo.toImage()
-        else:
-            img = None # Should not happen
+        # Render (skipped by the compositor if nothing changed since its last render)
+        comp.render(layer_stack, ctx)
         
-        # Cleanup
-        # Explicit deletion might help with FBO release
-        del temp_comp
-        
-        return img
+        if not comp.final_fbo:
+            yield None
+            return
+        source = comp.final_fbo
+        cpu_padding = False
+        if padding > 0:
+            padded = comp.pad(padding) if self.gpu_padding else None
+            if padded is not None:
+                source = padded
+            else:
+                cpu_padding = True
+
+        with comp.map_pixels(source) as pixels:
+            if cpu_padding:
+                # Same result on the CPU, in the mapped buffer
+                from src.core.padding import unpremultiply, apply_padding
+                apply_padding(unpremultiply(pixels, in_place=True), padding, in_place=True)
+            yield pixels
@@ -0,0 +1,293 @@
+"""
+Background exports for the editor.
+
+ExportQueue renders queued exports on a worker QThread with its own GL
+context, so the window stays responsive while they finish:
+
+  - The context shares textures and programs with the preview (HeadlessContext
+    with share_context): image layers and compiled shaders are not loaded again.
+    Meshes, FBOs and VAOs are per context; the export thread has its own Engine.
+  - Jobs render a snapshot of the layer stack taken when they are queued, so
+    editing can go on meanwhile.
+  - Only the passes hold ResourceManager.lock (program uniforms are shared
+    state): the snapshot's images are decoded before, CPU padding and encoding
+    run in a thread pool after. The preview skips frames while the lock is
+    taken (it shows the last one again) rather than waiting for it.
+  - At most `max_frames` rendered frames wait for encoding, which bounds memory
+    when exports are queued faster than they are written.
+
+Signals are emitted from the worker threads; receivers on the GUI thread get
+them queued. A job can be cancelled until its encoding starts.
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, QThread, QCoreApplication, Signal, Slot
+
+
+def _ms(start):
+    return round((time.perf_counter() - start) * 1000.0, 3)
+
+
+class ExportJob:
+    """
+    One queued export. `layers` is the stack snapshot (LayerSerializer.to_dict per layer).
+    status: queued -> rendering -> padding (CPU padding only) -> encoding -> done,
+    or failed / cancelled.
+    """
+    PROGRESS = {"queued": 0.0, "rendering": 0.1, "padding": 0.5, "encoding": 0.7, "done": 1.0}
+    FINAL = ("done", "failed", "cancelled")
+
+    def __init__(self, job_id, path, layers, resolution, padding, analytic=False, fused=False, png_options=None):
+        self.id = job_id
+        self.path = path
+        self.layers = layers
+        self.resolution = resolution
+        self.padding = padding
+        self.analytic = analytic
+        self.fused = fused
+        self.png_options = png_options or {}
+        self.status = "queued"
+        self.error = None
+        self.timings = {}
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status in self.FINAL
+
+    @property
+    def progress(self):
+        return self.PROGRESS.get(self.status, 1.0)
+
+
+class _RenderWorker(QObject):
+    """Lives on the export thread: owns the Engine of the export context."""
+    def __init__(self, queue):
+        super().__init__()
+        self.queue = queue
+        self.engine = None
+
+    def _make_current(self):
+        context = self.queue.context
+        if not context.make_current():
+            raise RuntimeError("Could not make the export context current")
+        if self.engine is None:
+            from src.core.engine import Engine
+            self.engine = Engine(64, 64)
+            self.engine.initialize()
+            # Padding: jump flooding on GPUs, NumPy in the encode pool on llvmpipe (faster there)
+            self.engine.set_gpu_padding(not context.software)
+
+    @Slot(object)
+    def render(self, job):
+        queue = self.queue
+        if job.finished: # Cancelled while queued
+            return
+        queue._frames.acquire()
+        handed_over = False
+        try:
+            if not queue._advance(job, "rendering"):
+                return
+            start = time.perf_counter()
+            pixels, padded = self._render(job)
+            job.timings["render_ms"] = _ms(start)
+            queue._pool.submit(queue._encode, job, pixels, padded)
+            handed_over = True
+        except Exception as e:
+            print(f"ExportQueue: Failed to render {job.path}: {e}")
+            queue._finish(job, "failed", str(e))
+        finally:
+            if not handed_over:
+                queue._frames.release()
+
+    def _render(self, job):
+        """Render the snapshot -> (frame copy, padded on the GPU)"""
+        from src.core.layer_registry import LayerRegistry
+        from src.core.layer_serializer import LayerSerializer
+        from src.core.layer_stack import LayerStack
+        from src.core.resource_manager import ResourceManager
+
+        stack = LayerStack()
+        for data in job.layers:
+            layer = LayerRegistry.create(data.get("type"))
+            if layer is None:
+                print(f"ExportQueue: Unknown layer type {data.get('type')}")
+                continue
+            LayerSerializer.from_dict(layer, data)
+            stack.add_layer(layer)
+
+        rm = ResourceManager()
+        with rm.lock:
+            # The first job sets up the Engine (shared programs)
+            self._make_current()
+        engine = self.engine
+        engine.set_analytic_geometry(job.analytic)
+        engine.set_fused_rendering(job.fused)
+        gpu_padding = job.padding if engine.gpu_padding else 0
+        try:
+            # Layers of the snapshot get the export context's meshes ("Standard" sphere).
+            # Not under the lock: images decode meanwhile (ResourceManager locks its caches).
+            for layer in stack:
+                layer.initialize()
+            with rm.lock:
+                with engine.map_offscreen(job.resolution, job.resolution, stack, preview_mode_override=0,
+                                          force_no_normal=True, padding=gpu_padding) as pixels:
+                    if pixels is None:
+                        raise RuntimeError("Nothing was rendered")
+                    # The readback buffer is reused by the next job
+                    frame = pixels.copy()
+        finally:
+            for layer in stack:
+                layer.release()
+        return frame, gpu_padding > 0
+
+    @Slot()
+    def release(self):
+        """Free the export context's objects and hand it back to the GUI thread"""
+        from src.core.resource_manager import ResourceManager
+        context = self.queue.context
+        if self.engine is not None and context.make_current():
+            with ResourceManager().lock:
+                self.engine.release()
+            self.engine = None
+        context.done_current()
+        context.move_to_thread(QCoreApplication.instance().thread())
+
+
+class ExportQueue(QObject):
+    """
+    Export jobs rendered in order on a worker thread, then padded/encoded in a thread pool.
+    context: HeadlessContext for the worker (not current anywhere afterwards); it is
+    released by shutdown().
+    """
+    # job id, status, fraction done
+    progress = Signal(int, str, float)
+    # job id, final status ("done", "failed", "cancelled")
+    finished = Signal(int, str)
+
+    _render_requested = Signal(object)
+    _release_requested = Signal()
+
+    def __init__(self, context, encode_threads=2, max_frames=2, parent=None):
+        super().__init__(parent)
+        self.context = context
+        self.jobs = {} # id -> ExportJob, in submission order
+        self._ids = itertools.count(1)
+        self._frames = threading.BoundedSemaphore(max_frames)
+        self._pool = ThreadPoolExecutor(max_workers=encode_threads, thread_name_prefix="export-encode")
+
+        self._thread = QThread()
+        self._worker = _RenderWorker(self)
+        self._worker.moveToThread(self._thread)
+        context.done_current()
+        context.move_to_thread(self._thread)
+        self._render_requested.connect(self._worker.render)
+        self._release_requested.connect(self._worker.release)
+        self._thread.start()
+
+    def submit(self, layer_stack, path, resolution, padding, analytic=False, fused=False, png_options=None):
+        """Queue an export of the stack as it is now -> ExportJob (png_options: see save_rgba)"""
+        from src.core.layer_serializer import LayerSerializer
+        layers = [LayerSerializer.to_dict(layer) for layer in layer_stack]
+        job = ExportJob(next(self._ids), path, layers, resolution, padding, analytic, fused, png_options)
+        self.jobs[job.id] = job
+        self.progress.emit(job.id, job.status, job.progress)
+        self._render_requested.emit(job)
+        return job
+
+    def pending(self):
+        """Jobs not finished yet, in submission order"""
+        return [job for job in self.jobs.values() if not job.finished]
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. Queued jobs stop right away, running ones at their next stage;
+        a job already encoding is written. Returns False if it could not be cancelled.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        with job._lock:
+            if job.finished or job.status == "encoding":
+                return False
+            job._cancelled = True
+            queued = job.status == "queued"
+        if queued:
+            self._finish(job, "cancelled")
+        return True
+
+    def cancel_all(self):
+        for job in self.pending():
+            self.cancel(job.id)
+
+    def wait(self, timeout=None):
+        """Process events until every job is finished. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            QCoreApplication.processEvents()
+            time.sleep(0.01)
+        QCoreApplication.processEvents() # Deliver the last signals
+        return True
+
+    def shutdown(self, cancel=False):
+        """Finish (or cancel) the pending jobs, stop the threads and release the context"""
+        if cancel:
+            self.cancel_all()
+        self.wait()
+        self._release_requested.emit()
+        self._thread.quit()
+        self._thread.wait()
+        self._pool.shutdown(wait=True)
+        self.context.release()
+
+    def _advance(self, job, status):
+        """Move a job to its next stage. False (and the job marked cancelled) if it was cancelled."""
+        with job._lock:
+            cancelled = job._cancelled
+            if not cancelled:
+                job.status = status
+        if cancelled:
+            self._finish(job, "cancelled")
+            return False
+        self.progress.emit(job.id, status, job.progress)
+        return True
+
+    def _finish(self, job, status, error=None):
+        with job._lock:
+            if job.finished:
+                return
+            job.status = status
+            job.error = error
+        job.layers = None
+        self.progress.emit(job.id, status, job.progress)
+        self.finished.emit(job.id, status)
+
+    def _encode(self, job, pixels, padded):
+        """Thread pool: CPU padding (unless done on the GPU) and file encoding"""
+        from src.core.image_io import save_rgba
+        try:
+            if job.padding > 0 and not padded:
+                if not self._advance(job, "padding"):
+                    return
+                from src.core.padding import unpremultiply, apply_padding
+                start = time.perf_counter()
+                apply_padding(unpremultiply(pixels, in_place=True), job.padding, in_place=True)
+                job.timings["padding_ms"] = _ms(start)
+            if not self._advance(job, "encoding"):
+                return
+            start = time.perf_counter()
+            save_rgba(job.path, pixels, premultiplied=job.padding <= 0, **job.png_options)
+            job.timings["write_ms"] = _ms(start)
+            print(f"Saved render to {job.path} ({job.resolution}x{job.resolution})")
+            self._finish(job, "done")
+        except Exception as e:
+            print(f"ExportQueue: Failed to write {job.path}: {e}")
+            self._finish(job, "failed", str(e))
+        finally:
+            self._frames.release()
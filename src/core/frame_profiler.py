@@ -0,0 +1,272 @@
+"""
+Per-layer GPU timing of Compositor.render (see Compositor.profiler).
+
+Each layer pass (draw + blend) is wrapped in a GL_TIME_ELAPSED query and the
+frame in two GL_TIMESTAMP queries. Results are read a frame or two later: at
+most QUERY_SETS frames wait for their queries, and a frame started while they
+are all in flight is timed on the CPU only, so reading results never stalls.
+poll() collects what the GPU has finished (the preview calls it every paint);
+finish() waits for everything (tests, the CLI).
+
+Frames the compositor skips because nothing changed are not recorded.
+
+Counters are incremented where the GL calls are made (FrameBuffer.bind,
+Mesh.draw, LayerInterface.upload_uniforms, the compositor passes) through
+count(), use_program() and bind_texture(). They only count while a frame is
+being recorded on the calling thread.
+"""
+import ctypes
+import json
+import threading
+import time
+from collections import deque
+
+from OpenGL.GL import (GL_QUERY_RESULT, GL_QUERY_RESULT_AVAILABLE, GL_TEXTURE0, GL_TEXTURE_2D, GL_TIME_ELAPSED,
+                       GL_TIMESTAMP, glActiveTexture, glBeginQuery, glBindTexture, glDeleteQueries, glEndQuery,
+                       glFinish, glGenQueries, glGetQueryObjectiv, glQueryCounter, glUseProgram)
+from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v
+
+COUNTERS = ("draw_calls", "program_binds", "fbo_binds", "texture_binds", "clears", "blits")
+# Counters summed into "state_changes"
+STATE_COUNTERS = ("program_binds", "fbo_binds", "texture_binds")
+
+# Counters of the frame recorded on this thread (FrameProfiler.begin_frame to end_frame)
+_recording = threading.local()
+
+
+def count(counter, n=1):
+    """Add n to a counter of the frame being recorded on this thread, if any"""
+    counters = getattr(_recording, "counters", None)
+    if counters is not None:
+        counters[counter] += n
+
+
+def use_program(program):
+    """glUseProgram, counted"""
+    glUseProgram(program)
+    count("program_binds")
+
+
+def bind_texture(unit, texture):
+    """Bind a 2D texture on a texture unit (left active), counted"""
+    glActiveTexture(GL_TEXTURE0 + unit)
+    glBindTexture(GL_TEXTURE_2D, texture)
+    count("texture_binds")
+
+
+def _ms(start):
+    return (time.perf_counter() - start) * 1000.0
+
+
+class FrameProfiler:
+    # Frames whose queries may be in flight at once (double buffering)
+    QUERY_SETS = 2
+    # Resolved frames kept for the histogram
+    HISTORY = 240
+    # Upper bin edges of the frame time histogram (ms), plus one overflow bin
+    HISTOGRAM_EDGES_MS = (2, 4, 8, 16, 33, 66, 133, 266, 533, 1066)
+
+    def __init__(self, history=HISTORY):
+        self.frames = deque(maxlen=history)  # Resolved frame records, oldest first
+        self.gpu_timing = True  # False: CPU times and counters only
+        self._pending = deque()  # (record, [(layer entry, query)], frame queries or None), in frame order
+        self._free_queries = {GL_TIMESTAMP: [], GL_TIME_ELAPSED: []}  # A query keeps its first target
+        self._all_queries = []
+        self._frame = None
+        self._frame_start = 0.0
+        self._frame_queries = None
+        self._layer_queries = None
+        self._layer = None
+        self._layer_start = 0.0
+
+    # --- Recording (called by Compositor) ---
+
+    def begin_frame(self, width, height):
+        self.poll()
+        self._frame = {
+            "width": width, "height": height, "path": None,
+            "cpu_ms": 0.0, "gpu_ms": None,
+            "counters": dict.fromkeys(COUNTERS, 0),
+            "layers": [],
+        }
+        _recording.counters = self._frame["counters"]
+        self._frame_start = time.perf_counter()
+        self._frame_queries = None
+        self._layer_queries = None
+        in_flight = sum(1 for _, _, frame_queries in self._pending if frame_queries)
+        if self.gpu_timing and in_flight < self.QUERY_SETS:
+            self._frame_queries = (self._query(GL_TIMESTAMP), self._query(GL_TIMESTAMP))
+            self._layer_queries = []
+            glQueryCounter(self._frame_queries[0], GL_TIMESTAMP)
+
+    def begin_layer(self, index, name, kind):
+        """Start timing one pass: index into the rendered stack (None for the fused pass)"""
+        self._layer = {"index": index, "name": name, "type": kind, "pass": None, "cpu_ms": 0.0, "gpu_ms": None}
+        if self._layer_queries is not None:
+            query = self._query(GL_TIME_ELAPSED)
+            self._layer_queries.append((self._layer, query))
+            glBeginQuery(GL_TIME_ELAPSED, query)
+        self._layer_start = time.perf_counter()
+
+    def end_layer(self, pass_name):
+        """pass_name: how the layer was drawn (direct, adjustment, blend, fused)"""
+        layer = self._layer
+        layer["cpu_ms"] = _ms(self._layer_start)
+        layer["pass"] = pass_name
+        if self._layer_queries is not None:
+            glEndQuery(GL_TIME_ELAPSED)
+        self._frame["layers"].append(layer)
+        self._layer = None
+
+    def cached_layer(self, index, name, kind):
+        """A layer taken from an incremental compositing snapshot (not drawn this frame)"""
+        self._frame["layers"].append({"index": index, "name": name, "type": kind, "pass": "cached",
+                                      "cpu_ms": 0.0, "gpu_ms": 0.0})
+
+    def end_frame(self, path):
+        """path: render path the compositor took (fused, multipass)"""
+        _recording.counters = None
+        record = self._frame
+        record["cpu_ms"] = _ms(self._frame_start)
+        record["path"] = path
+        counters = record["counters"]
+        counters["state_changes"] = sum(counters[name] for name in STATE_COUNTERS)
+        self._frame = None
+        if self._frame_queries is not None:
+            glQueryCounter(self._frame_queries[1], GL_TIMESTAMP)
+        self._pending.append((record, self._layer_queries or [], self._frame_queries))
+        self._frame_queries = self._layer_queries = None
+        self.poll()
+
+    # --- Results ---
+
+    def poll(self):
+        """Move frames whose queries are available to `frames` (never waits). Returns how many."""
+        resolved = 0
+        while self._pending:
+            record, layer_queries, frame_queries = self._pending[0]
+            # Queries finish in submission order: the closing timestamp is the last one
+            if frame_queries and not glGetQueryObjectiv(frame_queries[1], GL_QUERY_RESULT_AVAILABLE):
+                break
+            self._pending.popleft()
+            self._resolve(record, layer_queries, frame_queries)
+            resolved += 1
+        return resolved
+
+    def finish(self):
+        """Wait for the GPU and resolve every pending frame"""
+        if any(frame_queries for _, _, frame_queries in self._pending):
+            glFinish()
+            while self._pending:
+                self._resolve(*self._pending.popleft())
+
+    def _resolve(self, record, layer_queries, frame_queries):
+        if frame_queries is None:
+            self.frames.append(record)
+            return
+        start, end = (self._result(q) for q in frame_queries)
+        record["gpu_ms"] = (end - start) / 1e6
+        for layer, query in layer_queries:
+            layer["gpu_ms"] = self._result(query) / 1e6
+        self._free_queries[GL_TIMESTAMP].extend(frame_queries)
+        self._free_queries[GL_TIME_ELAPSED].extend(query for _, query in layer_queries)
+        self.frames.append(record)
+
+    @staticmethod
+    def _result(query):
+        # Raw entry point: the wrapped one has no output array for GLuint64
+        value = ctypes.c_uint64(0)
+        glGetQueryObjectui64v(query, GL_QUERY_RESULT, ctypes.byref(value))
+        return value.value
+
+    def _query(self, target):
+        free = self._free_queries[target]
+        if not free:
+            names = [int(q) for q in glGenQueries(16)]
+            self._all_queries.extend(names)
+            free.extend(names)
+        return free.pop()
+
+    @property
+    def pending(self):
+        """Frames waiting for their query results"""
+        return len(self._pending)
+
+    @property
+    def last_frame(self):
+        return self.frames[-1] if self.frames else None
+
+    def frame_times(self, key="gpu_ms"):
+        """Rolling frame times (ms) of the resolved frames; frames without GPU timing use cpu_ms"""
+        return [f[key] if f[key] is not None else f["cpu_ms"] for f in self.frames]
+
+    def histogram(self, key="gpu_ms"):
+        """Frame time distribution: bins [(upper edge ms or None, count)], count, p50, p95, max"""
+        times = sorted(self.frame_times(key))
+        counts = [0] * (len(self.HISTOGRAM_EDGES_MS) + 1)
+        for t in times:
+            for i, edge in enumerate(self.HISTOGRAM_EDGES_MS):
+                if t < edge:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+
+        def percentile(p):
+            return times[min(len(times) - 1, int(p * len(times)))] if times else None
+
+        return {
+            "bins": list(zip(list(self.HISTOGRAM_EDGES_MS) + [None], counts)),
+            "count": len(times),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": times[-1] if times else None,
+        }
+
+    def report(self):
+        """Text summary of the last resolved frame and the frame time histogram (preview overlay)"""
+        frame = self.last_frame
+        if frame is None:
+            return "Frame profile: no frames yet"
+
+        def fmt(ms):
+            return "-" if ms is None else f"{ms:.2f}"
+
+        hist = self.histogram()
+        counters = frame["counters"]
+        lines = [
+            f"Frame {frame['width']}x{frame['height']} {frame['path']}: "
+            f"GPU {fmt(frame['gpu_ms'])} ms, CPU {fmt(frame['cpu_ms'])} ms",
+            f"Last {hist['count']}: p50 {fmt(hist['p50'])} ms, p95 {fmt(hist['p95'])} ms, max {fmt(hist['max'])} ms",
+            f"Draws {counters['draw_calls']}, state changes {counters['state_changes']}, "
+            f"clears {counters['clears']}, blits {counters['blits']}",
+            f"{'layer':<24}{'pass':<12}{'GPU ms':>8}{'CPU ms':>8}",
+        ]
+        for layer in frame["layers"]:
+            lines.append(f"{layer['name'][:23]:<24}{layer['pass']:<12}{fmt(layer['gpu_ms']):>8}{fmt(layer['cpu_ms']):>8}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "gpu_timing": self.gpu_timing,
+            "histogram": {"cpu_ms": self.histogram("cpu_ms"), "gpu_ms": self.histogram("gpu_ms")},
+            "frames": list(self.frames),
+        }
+
+    def dump(self, path):
+        """Write to_dict() as JSON (pending frames are resolved first)"""
+        self.finish()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    def clear(self):
+        self.frames.clear()
+
+    def release(self):
+        """Delete the query objects (GL context must be current)"""
+        if self._all_queries:
+            glDeleteQueries(len(self._all_queries), self._all_queries)
+        self._all_queries = []
+        for free in self._free_queries.values():
+            free.clear()
+        self._pending.clear()
@@ -1,55 +1,154 @@
 from OpenGL.GL import *
+from OpenGL.raw.GL.VERSION.GL_1_0 import glReadPixels as _glReadPixelsRaw
+from contextlib import contextmanager
 import ctypes
+import numpy as np
+from src.core.frame_profiler import count
+
+class PixelPackBuffer:
+    """
+    Readback target for FrameBuffer.map_pixels, grown on demand and reused, so
+    repeated readbacks of the same size allocate nothing.
+    """
+    def __init__(self):
+        self.id = None
+        self.size = 0
+
+    def bind(self, nbytes):
+        if self.id is None:
+            self.id = int(glGenBuffers(1))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.id)
+        if self.size != nbytes:
+            glBufferData(GL_PIXEL_PACK_BUFFER, nbytes, None, GL_STREAM_READ)
+            self.size = nbytes
+
+    def delete(self):
+        if self.id:
+            glDeleteBuffers(1, [self.id])
+        self.id = None
+        self.size = 0
+
 
 class FrameBuffer:
-    def __init__(self, width, height):
+    """
+    Color texture (RGBA8 unless internal_format says otherwise) + optional depth/stencil renderbuffer.
+    Plain GL objects, so it works in whatever context is current (QOpenGLWidget,
+    Qt offscreen surface or EGL, see src.core.headless). GL objects are freed
+    by delete(), with the owning context current.
+    """
+    # internal format -> (format, type) for allocation
+    _FORMATS = {
+        GL_RGBA8: (GL_RGBA, GL_UNSIGNED_BYTE),
+        GL_RG32F: (GL_RG, GL_FLOAT),
+    }
+
+    def __init__(self, width, height, depth=True, internal_format=GL_RGBA8):
         self.width = width
         self.height = height
+        self.internal_format = internal_format
+        self.rbo = None
         try:
-            # glGenFramebuffers returns a list-like or scalar depending on impl. Force list then take first?
-            # Or usually scalar if n=1.
-            bufs = glGenFramebuffers(1)
-            self.fbo = int(bufs) if not isinstance(bufs, list) else int(bufs[0])
-            print(f"DEBUG: Created FBO ID: {self.fbo}")
-            
-            texs = glGenTextures(1)
-            self.texture = int(texs) if not isinstance(texs, list) else int(texs[0])
-            
-            rbos = glGenRenderbuffers(1)
-            self.rbo = int(rbos) if not isinstance(rbos, list) else int(rbos[0])
-            
+            self.fbo = int(glGenFramebuffers(1))
+            self.texture = int(glGenTextures(1))
+            if depth:
+                self.rbo = int(glGenRenderbuffers(1))
+
             self.resize(width, height)
         except Exception as e:
             print(f"FBO Init Error: {e}")
             raise e
-        
+
     def resize(self, width, height):
         self.width = width
         self.height = height
-        
-        print(f"DEBUG: Resizing FBO {self.fbo} to {width}x{height}")
+
         glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
-        
-        # Texture attachment
+
+        # Texture attachment (same defaults as QOpenGLFramebufferObject)
         glBindTexture(GL_TEXTURE_2D, self.texture)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        data_format, data_type = self._FORMATS[self.internal_format]
+        glTexImage2D(GL_TEXTURE_2D, 0, self.internal_format, width, height, 0, data_format, data_type, None)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glBindTexture(GL_TEXTURE_2D, 0)
         glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, self.texture, 0)
-        
+
         # RBO for Depth/Stencil
-        glBindRenderbuffer(GL_RENDERBUFFER, self.rbo)
-        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, width, height)
-        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_STENCIL_ATTACHMENT, GL_RENDERBUFFER, self.rbo)
-        
+        if self.rbo:
+            glBindRenderbuffer(GL_RENDERBUFFER, self.rbo)
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, width, height)
+            glBindRenderbuffer(GL_RENDERBUFFER, 0)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_STENCIL_ATTACHMENT, GL_RENDERBUFFER, self.rbo)
+
         if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
             print("ERROR::FRAMEBUFFER:: Framebuffer is not complete!")
-            
+
         glBindFramebuffer(GL_FRAMEBUFFER, 0)
-        
+
     def bind(self):
         glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
         glViewport(0, 0, self.width, self.height)
-        
+        count("fbo_binds")
+
     def unbind(self):
         glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        count("fbo_binds")
+
+    @contextmanager
+    def map_pixels(self, pack_buffer=None):
+        """
+        Color attachment as an (height, width, 4) uint8 RGBA view of a mapped
+        pixel pack buffer: no copy, top row first (the flip is a negative row
+        stride, view[::-1] is the contiguous GL memory). Writable, and only
+        valid inside the with block (context current).
+        pack_buffer: a PixelPackBuffer to reuse, otherwise a temporary one is used.
+        """
+        nbytes = self.width * self.height * 4
+        owned = pack_buffer is None
+        if owned:
+            pack_buffer = PixelPackBuffer()
+        pack_buffer.bind(nbytes)
+
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.fbo)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        _glReadPixelsRaw(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, 0)
+
+        address = glMapBufferRange(GL_PIXEL_PACK_BUFFER, 0, nbytes, GL_MAP_READ_BIT | GL_MAP_WRITE_BIT)
+        # Unbound while mapped: a bound pack buffer would redirect every other glReadPixels
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        if not address:
+            raise RuntimeError("FrameBuffer: glMapBufferRange failed")
+        try:
+            memory = (ctypes.c_ubyte * nbytes).from_address(int(address))
+            rows = np.frombuffer(memory, dtype=np.uint8).reshape(self.height, self.width, 4)
+            yield rows[::-1]
+        finally:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, pack_buffer.id)
+            glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+            if owned:
+                pack_buffer.delete()
+
+    def read_pixels(self, pack_buffer=None):
+        """Color attachment as an (height, width, 4) uint8 RGBA array, top row first"""
+        with self.map_pixels(pack_buffer) as pixels:
+            return pixels.copy()
+
+    def write_pixels(self, pixels):
+        """Upload an (height, width, 4) uint8 RGBA array, top row first (inverse of read_pixels)"""
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        data = np.ascontiguousarray(pixels[::-1], dtype=np.uint8)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, data)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def delete(self):
+        if self.fbo:
+            glDeleteFramebuffers(1, [self.fbo])
+            glDeleteTextures(1, [self.texture])
+            if self.rbo:
+                glDeleteRenderbuffers(1, [self.rbo])
+            self.fbo = self.texture = self.rbo = None
@@ -1,53 +1,171 @@
+import functools
 import numpy as np
-import math
+
+
+class Mesh:
+    """
+    GPU copy of one shape: VAO + VBO + EBO in the layer vertex layout
+    [Px, Py, Pz, Nx, Ny, Nz, U, V, Tx, Ty, Tz]. Shared by all layers drawing that shape.
+    """
+    def __init__(self, vertices, indices):
+        from OpenGL.GL import glGenVertexArrays, glGenBuffers, glBindVertexArray, glBindBuffer, glBufferData, glEnableVertexAttribArray, glVertexAttribPointer, GL_ARRAY_BUFFER, GL_ELEMENT_ARRAY_BUFFER, GL_STATIC_DRAW, GL_FLOAT, GL_FALSE
+        import ctypes
+
+        self.index_count = len(indices)
+
+        self.vao = glGenVertexArrays(1)
+        self.vbo = glGenBuffers(1)
+        self.ebo = glGenBuffers(1)
+
+        glBindVertexArray(self.vao)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+
+        # Stride: 11 floats * 4 bytes
+        stride = 11 * 4
+
+        # 0: Pos (3)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+
+        # 1: Norm (3)
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(3 * 4))
+
+        # 2: UV (2)
+        glEnableVertexAttribArray(2)
+        glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(6 * 4))
+
+        # 3: Tangent (3)
+        glEnableVertexAttribArray(3)
+        glVertexAttribPointer(3, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(8 * 4))
+
+        glBindVertexArray(0)
+
+    def draw(self):
+        from OpenGL.GL import glBindVertexArray, glDrawElements, GL_TRIANGLES, GL_UNSIGNED_INT
+        from src.core.frame_profiler import count
+        glBindVertexArray(self.vao)
+        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
+        glBindVertexArray(0)
+        count("draw_calls")
+
+    def release(self):
+        from OpenGL.GL import glDeleteVertexArrays, glDeleteBuffers
+        if self.vao:
+            glDeleteVertexArrays(1, [self.vao])
+            glDeleteBuffers(2, [self.vbo, self.ebo])
+            self.vao = self.vbo = self.ebo = None
+
 
 class GeometryEngine:
+    # Shape name -> generator. "Standard" is also the export shape.
+    SHAPES = {
+        "Standard": lambda: GeometryEngine.generate_sphere(),
+        "With Normal Map": lambda: GeometryEngine.generate_comparison_spheres(),
+    }
+
+    # (GL context key, shape) -> Mesh. VAOs are never shared between contexts.
+    _meshes = {}
+
+    @classmethod
+    def get_mesh(cls, shape="Standard"):
+        """Shared Mesh for a shape in the current GL context, uploaded on first use."""
+        if shape not in cls.SHAPES:
+            shape = "Standard"
+        key = (cls._context_key(), shape)
+        mesh = cls._meshes.get(key)
+        if mesh is None:
+            vertices, indices = cls.SHAPES[shape]()
+            mesh = cls._meshes[key] = Mesh(vertices, indices)
+        return mesh
+
+    @classmethod
+    def release_meshes(cls):
+        """Free the meshes of the current GL context (context must be current)."""
+        ctx_key = cls._context_key()
+        for key in [k for k in cls._meshes if k[0] == ctx_key]:
+            cls._meshes.pop(key).release()
+
+    @classmethod
+    def _context_key(cls):
+        from PySide6.QtGui import QOpenGLContext
+        ctx = QOpenGLContext.currentContext()
+        if ctx is None:
+            return None # Non-Qt context (e.g. EGL)
+        key = id(ctx)
+        if not any(k[0] == key for k in cls._meshes):
+            # Context teardown frees the GL objects, only forget them
+            ctx.aboutToBeDestroyed.connect(lambda k=key: cls._forget_context(k))
+        return key
+
+    @classmethod
+    def _forget_context(cls, ctx_key):
+        for key in [k for k in cls._meshes if k[0] == ctx_key]:
+            del cls._meshes[key]
+
     @staticmethod
     def generate_sphere(radius=1.0, stacks=30, sectors=30, offset_x=0.0):
         """
         Generate Sphere with Position, Normal, UV, and Tangent.
         Format: [Pos(3), Normal(3), UV(2), Tangent(3)]
         Total stride: 11 floats
+
+        Memoized per (radius, stacks, sectors, offset_x); the returned arrays
+        are shared and read-only, copy them before modifying.
         """
-        vertices = []
-        indices = []
-        
-        for i in range(stacks + 1):
-            lat = math.pi * i / stacks
-            y = math.cos(lat)
-            r_plane = math.sin(lat)
-            for j in range(sectors + 1):
-                lon = 2 * math.pi * j / sectors
-                x = r_plane * math.cos(lon)
-                z = r_plane * math.sin(lon)
-                
-                # Position
-                px, py, pz = x*radius + offset_x, y*radius, z*radius
-                
-                # Normal (Normalized local pos)
-                nx, ny, nz = x, y, z
-                
-                # UV
-                u = j / sectors
-                v = i / stacks
-                
-                # Tangent (Derivative of position with respect to U (longitude))
-                # T = (-sin(lon), 0, cos(lon)) -> approx
-                tx = -math.sin(lon)
-                ty = 0.0
-                tz = math.cos(lon)
-                
-                vertices.extend([px, py, pz, nx, ny, nz, u, v, tx, ty, tz])
-
-        for i in range(stacks):
-            for j in range(sectors):
-                first = (i * (sectors + 1)) + j
-                second = first + sectors + 1
-                indices.extend([first, second, first + 1, second, second + 1, first + 1])
-                
-        return np.array(vertices, dtype=np.float32), np.array(indices, dtype=np.uint32)
+        return GeometryEngine._sphere(float(radius), int(stacks), int(sectors), float(offset_x))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _sphere(radius, stacks, sectors, offset_x):
+        # Evaluated in float64 like the scalar math it replaces, then packed as float32
+        i = np.arange(stacks + 1, dtype=np.float64)
+        j = np.arange(sectors + 1, dtype=np.float64)
+        lat = np.pi * i / stacks
+        lon = 2 * np.pi * j / sectors
+
+        # Rows = stacks (latitude), columns = sectors (longitude)
+        y = np.broadcast_to(np.cos(lat)[:, None], (stacks + 1, sectors + 1))
+        r_plane = np.sin(lat)[:, None]
+        x = r_plane * np.cos(lon)[None, :]
+        z = r_plane * np.sin(lon)[None, :]
+
+        vertices = np.empty((stacks + 1, sectors + 1, 11), dtype=np.float32)
+        # Position
+        vertices[..., 0] = x * radius + offset_x
+        vertices[..., 1] = y * radius
+        vertices[..., 2] = z * radius
+        # Normal (Normalized local pos)
+        vertices[..., 3] = x
+        vertices[..., 4] = y
+        vertices[..., 5] = z
+        # UV
+        vertices[..., 6] = (j / sectors)[None, :]
+        vertices[..., 7] = (i / stacks)[:, None]
+        # Tangent (Derivative of position with respect to U (longitude))
+        vertices[..., 8] = -np.sin(lon)[None, :]
+        vertices[..., 9] = 0.0
+        vertices[..., 10] = np.cos(lon)[None, :]
+
+        # Two triangles per quad: first, second, first+1 / second, second+1, first+1
+        first = (np.arange(stacks, dtype=np.uint32)[:, None] * (sectors + 1)
+                 + np.arange(sectors, dtype=np.uint32)[None, :])
+        second = first + (sectors + 1)
+        indices = np.stack([first, second, first + 1, second, second + 1, first + 1], axis=-1)
+
+        vertices = vertices.reshape(-1)
+        indices = indices.reshape(-1)
+        vertices.flags.writeable = False
+        indices.flags.writeable = False
+        return vertices, indices
 
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def generate_comparison_spheres():
         """
         Left Sphere (-0.5) for Matcap Generator.
@@ -66,5 +184,7 @@ class GeometryEngine:
         
         merged_verts = np.concatenate([s1_verts, s2_verts])
         merged_inds = np.concatenate([s1_inds, s2_inds_offset])
+        merged_verts.flags.writeable = False
+        merged_inds.flags.writeable = False
         
         return merged_verts, merged_inds
@@ -0,0 +1,266 @@
+"""
+Offscreen rendering without a window, for build servers and scripts.
+
+HeadlessContext creates an OpenGL 3.3 core context on a QOffscreenSurface
+(QT_QPA_PLATFORM=offscreen) and falls back to EGL surfaceless (e.g. Mesa
+llvmpipe on machines without a display). HeadlessRenderer drives the Engine
+directly and returns NumPy arrays. Nothing here imports src.ui.
+
+    with HeadlessRenderer(512, 512) as renderer:
+        pixels = renderer.render(layer_stack)  # (512, 512, 4) uint8 RGBA
+
+PyOpenGL binds to GLX or EGL when it is first imported, and only an EGL-bound
+PyOpenGL can drive an EGL context. On Linux without a display this module
+selects EGL, so import it before anything that imports OpenGL (or set
+PYOPENGL_PLATFORM=egl).
+"""
+import os
+import sys
+import ctypes
+
+if sys.platform.startswith("linux") and "OpenGL" not in sys.modules \
+        and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+    os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+
+def _pyopengl_uses_egl():
+    from OpenGL import platform
+    return type(platform.PLATFORM).__name__ == "EGLPlatform"
+
+
+class HeadlessContext:
+    """
+    GL 3.3 core context that is not tied to a window.
+    backend: "auto", "qt" or "egl". The chosen one is in `self.backend`.
+    "auto" tries the backend matching PyOpenGL's platform first.
+    share_context: QOpenGLContext whose textures, buffers and programs this
+    context shares (e.g. the preview's, for background exports). Qt only.
+    """
+    BACKENDS = ("qt", "egl")
+    # GL_RENDERER substrings of CPU rasterizers
+    SOFTWARE_RENDERERS = ("llvmpipe", "softpipe", "swiftshader", "swrast")
+
+    def __init__(self, backend="auto", share_context=None):
+        self.backend = None
+        self.shared = share_context is not None
+        self._app = None
+        self._surface = None
+        self._context = None
+        self._egl_display = None
+        self._egl_context = None
+
+        if self.shared:
+            candidates = ("qt",)
+        elif backend == "auto":
+            candidates = tuple(reversed(self.BACKENDS)) if _pyopengl_uses_egl() else self.BACKENDS
+        else:
+            candidates = (backend,)
+        errors = []
+        for name in candidates:
+            try:
+                if name == "qt":
+                    self._create_qt(share_context)
+                else:
+                    getattr(self, f"_create_{name}")()
+                self.backend = name
+                break
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+        if self.backend is None:
+            raise RuntimeError("HeadlessContext: No OpenGL 3.3 context available (" + "; ".join(errors) + ")")
+
+    def _create_qt(self, share_context=None):
+        from PySide6.QtGui import QGuiApplication, QOffscreenSurface, QOpenGLContext, QSurfaceFormat
+
+        if QGuiApplication.instance() is None:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+            self._app = QGuiApplication(sys.argv[:1])
+
+        fmt = QSurfaceFormat()
+        fmt.setVersion(3, 3)
+        fmt.setProfile(QSurfaceFormat.CoreProfile)
+
+        surface = QOffscreenSurface()
+        surface.setFormat(fmt)
+        surface.create()
+        context = QOpenGLContext()
+        context.setFormat(fmt)
+        if share_context is not None:
+            context.setShareContext(share_context)
+        if not context.create():
+            raise RuntimeError("QOpenGLContext.create() failed")
+        if not context.makeCurrent(surface):
+            raise RuntimeError("makeCurrent failed")
+        got = context.format()
+        if (got.majorVersion(), got.minorVersion()) < (3, 3):
+            context.doneCurrent()
+            raise RuntimeError(f"got OpenGL {got.majorVersion()}.{got.minorVersion()}")
+        if share_context is not None and context.shareContext() is None:
+            context.doneCurrent()
+            raise RuntimeError("could not share resources with the given context")
+
+        self._surface = surface
+        self._context = context
+
+    def _create_egl(self):
+        if not _pyopengl_uses_egl():
+            raise RuntimeError("PyOpenGL is not bound to EGL (set PYOPENGL_PLATFORM=egl before importing OpenGL)")
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+        from OpenGL import EGL
+
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not display or not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("eglInitialize failed")
+        if not EGL.eglBindAPI(EGL.EGL_OPENGL_API):
+            raise RuntimeError("eglBindAPI(EGL_OPENGL_API) failed")
+
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        # The default surface type (window) has no configs on surfaceless displays
+        attribs = (EGL.EGLint * 5)(
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_NONE,
+        )
+        if not EGL.eglChooseConfig(display, attribs, ctypes.pointer(config), 1, ctypes.pointer(count)) or count.value < 1:
+            raise RuntimeError("no EGL config for desktop OpenGL")
+
+        context_attribs = (EGL.EGLint * 7)(
+            EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+            EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+            EGL.EGL_NONE,
+        )
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, context_attribs)
+        if not context:
+            raise RuntimeError("eglCreateContext failed")
+
+        self._egl_display = display
+        self._egl_context = context
+        if not self.make_current():
+            raise RuntimeError("eglMakeCurrent failed (surfaceless contexts not supported?)")
+
+    @property
+    def renderer_name(self):
+        """GL_RENDERER of the context (needs it current)"""
+        from OpenGL.GL import glGetString, GL_RENDERER
+        name = glGetString(GL_RENDERER)
+        return name.decode() if isinstance(name, bytes) else str(name)
+
+    @property
+    def software(self):
+        """True on CPU rasterizers, where some GPU passes are slower than NumPy"""
+        name = self.renderer_name.lower()
+        return any(s in name for s in self.SOFTWARE_RENDERERS)
+
+    def make_current(self):
+        if self._context is not None:
+            return self._context.makeCurrent(self._surface)
+        from OpenGL import EGL
+        return bool(EGL.eglMakeCurrent(self._egl_display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, self._egl_context))
+
+    def done_current(self):
+        if self._context is not None:
+            self._context.doneCurrent()
+        elif self._egl_context is not None:
+            from OpenGL import EGL
+            EGL.eglMakeCurrent(self._egl_display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+
+    def move_to_thread(self, thread):
+        """
+        Hand the context to another QThread (not current anywhere). Qt contexts can only
+        be made current on the thread they belong to; EGL contexts need no handover.
+        """
+        if self._context is not None:
+            self._context.moveToThread(thread)
+
+    def release(self):
+        """
+        Destroy the context. The process-wide GL caches (ResourceManager,
+        FusedShaderCache, GeometryEngine) only hold objects of this context
+        while it exists, so they are emptied first. A shared context leaves
+        them alone: their programs and textures belong to the share group.
+        """
+        if self.backend is None:
+            return
+        from src.core.geometry import GeometryEngine
+        from src.core.resource_manager import ResourceManager
+        from src.core.shader_builder import FusedShaderCache
+
+        if self.make_current():
+            if not self.shared:
+                FusedShaderCache().clear()
+                ResourceManager().clear()
+            GeometryEngine.release_meshes()
+        self.done_current()
+        if self._context is not None:
+            self._context = None
+            self._surface.destroy()
+            self._surface = None
+        elif self._egl_context is not None:
+            from OpenGL import EGL
+            EGL.eglDestroyContext(self._egl_display, self._egl_context)
+            self._egl_context = None
+        self.backend = None
+
+
+class HeadlessRenderer:
+    """
+    Engine on a HeadlessContext. Layers are initialized on first render,
+    results come back as (height, width, 4) uint8 RGBA arrays, top row first.
+
+    Layers rendered here hold GL objects of its context: after release()
+    they must be initialized again before use in another context.
+    """
+    def __init__(self, width=512, height=512, backend="auto"):
+        self.width = width
+        self.height = height
+        self.context = HeadlessContext(backend)
+
+        from src.core.engine import Engine
+        self.engine = Engine(width, height)
+        self.engine.initialize()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def initialize_layers(self, layer_stack):
+        """Initialize layers that have no GL resources yet (context is made current)"""
+        self.context.make_current()
+        for layer in layer_stack:
+            if getattr(layer, 'shader_program', None) is None:
+                layer.initialize()
+
+    def render(self, layer_stack, width=None, height=None, preview_mode=0, use_normal_map=False, padding=0):
+        """
+        Render the stack offscreen. preview_mode: 0 = Standard (export view), 1 = Comparison.
+        The normal map (Engine.set_global_normal_map) is only applied with use_normal_map.
+        padding > 0 applies export edge padding (straight alpha result, see Compositor.pad).
+        """
+        self.initialize_layers(layer_stack)
+        return self.engine.render_offscreen_pixels(
+            width or self.width, height or self.height, layer_stack,
+            preview_mode_override=preview_mode, force_no_normal=not use_normal_map, padding=padding
+        )
+
+    def map_pixels(self, layer_stack, width=None, height=None, preview_mode=0, use_normal_map=False, padding=0):
+        """
+        Same as render, as a context manager yielding a view of the mapped readback
+        buffer instead of a copy (Engine.map_offscreen): valid inside the with block only.
+        """
+        self.initialize_layers(layer_stack)
+        return self.engine.map_offscreen(
+            width or self.width, height or self.height, layer_stack,
+            preview_mode_override=preview_mode, force_no_normal=not use_normal_map, padding=padding
+        )
+
+    def release(self):
+        if self.context.backend is None:
+            return
+        self.context.make_current()
+        self.engine.release()
+        self.context.release()
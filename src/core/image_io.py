@@ -0,0 +1,48 @@
+"""
+Writing rendered (height, width, 4) uint8 RGBA arrays to image files.
+
+Works on views of mapped readback memory (FrameBuffer.map_pixels): the
+vertical flip is handed to the encoder instead of being copied. PNG files are
+written by src.core.png_writer (row bands deflated in parallel), other
+formats by Pillow.
+"""
+import os
+
+import numpy as np
+from PIL import Image
+
+# Extensions written without an alpha channel
+OPAQUE_EXTENSIONS = {".jpg", ".jpeg", ".bmp"}
+
+
+def save_rgba(path, pixels, premultiplied=False, **png_options):
+    """
+    Save pixels (top row first, may be a flipped view). Premultiplied colors are
+    unpremultiplied in place (so pixels must be writable) for formats with alpha;
+    formats without alpha drop it, which for premultiplied colors is compositing
+    over black (the same as QImage.save).
+    png_options: passed to write_png for .png files (level, png_filter, strategy, threads).
+    """
+    height, width = pixels.shape[:2]
+    extension = os.path.splitext(path)[1].lower()
+    opaque = extension in OPAQUE_EXTENSIONS
+    if premultiplied and not opaque:
+        from src.core.padding import unpremultiply
+        unpremultiply(pixels, in_place=True)
+
+    if extension == ".png":
+        from src.core.png_writer import write_png
+        write_png(path, pixels, **png_options)
+        return
+
+    # Bottom-up memory of a flipped view is contiguous: decode it with a negative row step
+    if pixels.strides[0] < 0 and pixels[::-1].flags.c_contiguous:
+        buffer, row_step = pixels[::-1], -1
+    else:
+        buffer, row_step = np.ascontiguousarray(pixels), 1
+
+    if opaque:
+        image = Image.frombuffer("RGB", (width, height), buffer, "raw", "RGBX", 0, row_step)
+    else:
+        image = Image.frombuffer("RGBA", (width, height), buffer, "raw", "RGBA", 0, row_step)
+    image.save(path)
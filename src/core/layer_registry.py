@@ -1,10 +1,15 @@
+import importlib
+
+
 class LayerRegistry:
     """
     Central registry for available layer types.
     Implements a Singleton pattern to manage the registration and creation of layers.
+    Types can be registered by module (register_lazy): the module is imported
+    the first time the class is needed, not at startup.
     """
     _instance = None
-    _layers = {}
+    _layers = {} # type name -> layer class, or module path until resolved
 
     def __new__(cls):
         if cls._instance is None:
@@ -18,10 +23,29 @@ class LayerRegistry:
         cls._layers[type_name] = layer_cls
         # logging.info(f"Registered Layer: {type_name}")
 
+    @classmethod
+    def register_lazy(cls, type_name, module_path):
+        """Register a layer class by name, imported from module_path on first use."""
+        if not isinstance(cls._layers.get(type_name), type):
+            cls._layers[type_name] = module_path
+
     @classmethod
     def get_class(cls, type_name):
         """Get layer class by type name."""
-        return cls._layers.get(type_name)
+        entry = cls._layers.get(type_name)
+        if isinstance(entry, str):
+            try:
+                entry = getattr(importlib.import_module(entry), type_name)
+            except (ImportError, AttributeError) as e:
+                print(f"LayerRegistry: Failed to load {type_name} from {entry}: {e}")
+                return None
+            cls._layers[type_name] = entry
+        return entry
+
+    @classmethod
+    def is_loaded(cls, type_name):
+        """The class has been imported (register, or a register_lazy type used once)."""
+        return isinstance(cls._layers.get(type_name), type)
 
     @classmethod
     def create(cls, type_name):
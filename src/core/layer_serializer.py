@@ -9,7 +9,7 @@ class LayerSerializer:
         # Attributes to exclude from 'params' because they are handled in top-level fields
         # or are runtime/internal properties.
         excluded = [
-            "shader_program", "VAO", "VBO", "EBO", 
+            "shader_program", "VAO", "VBO", "EBO", "mesh",
             "index_count", "name", "enabled", "blend_mode", 
             "texture_id", "_texture_loaded_path", "preview_mode",
             "opacity"
@@ -53,3 +53,9 @@ class LayerSerializer:
                 else:
                     # logging.warning(f"Unknown parameter '{key}' for layer '{layer.name}'")
                     pass
+
+            # Legacy: noise saved before the procedural types keeps its white-noise texture look
+            if data.get("type") == "NoiseLayer" and "noise_type" not in data["params"]:
+                layer.noise_type = "Baked"
+
+        layer.mark_dirty()
@@ -4,10 +4,12 @@ class LayerStack:
         
     def add_layer(self, layer):
         self._layers.append(layer)
+        layer.mark_dirty()
         return layer
         
     def insert_layer(self, index, layer):
         self._layers.insert(index, layer)
+        layer.mark_dirty()
         return layer
         
     def remove_layer(self, layer):
@@ -18,10 +20,16 @@ class LayerStack:
     def move_layer_up(self, index):
         if 0 <= index < len(self._layers) - 1:
             self._layers[index], self._layers[index+1] = self._layers[index+1], self._layers[index]
+            self._mark_moved(index, index+1)
             
     def move_layer_down(self, index):
         if 0 < index < len(self._layers):
             self._layers[index], self._layers[index-1] = self._layers[index-1], self._layers[index]
+            self._mark_moved(index-1, index)
+
+    def _mark_moved(self, *indices):
+        for i in indices:
+            self._layers[i].mark_dirty()
 
     def get_layers(self):
         return self._layers
@@ -0,0 +1,116 @@
+"""
+Export post-processing on (height, width, 4) uint8 RGBA arrays:
+edge padding (color dilation past the sphere silhouette) and alpha conversion.
+
+Padding copies every transparent pixel within `padding` px (Euclidean) of the
+silhouette from its nearest opaque pixel, found with a separable distance
+transform: one column pass (nearest opaque row, via running max/min) and one
+row pass over the pixels in reach. The cost is a fixed number of full-image
+passes plus O(padding) work on the padded band, independent of the number of
+dilation steps. The GPU equivalent is Compositor.pad (jump flooding).
+"""
+import numpy as np
+
+# Larger than any image coordinate, small enough to square in int64
+_FAR = 1 << 20
+
+
+def _unpremultiply_table():
+    # [alpha, value] -> round(value * 255 / alpha), saturated
+    alpha = np.maximum(np.arange(256, dtype=np.uint32), 1)[:, None]
+    value = np.arange(256, dtype=np.uint32)[None, :]
+    return np.minimum((value * 255 + alpha // 2) // alpha, 255).astype(np.uint8)
+
+
+_UNPREMULTIPLY = _unpremultiply_table()
+
+
+def unpremultiply(pixels, in_place=False):
+    """
+    Premultiplied RGBA (as composited by the Engine) -> straight alpha, like QImage
+    format conversion. Only partially transparent pixels change (the sphere rim),
+    so in place this touches a small fraction of the image.
+    """
+    out = pixels if in_place else pixels.copy()
+    alpha = out[:, :, 3]
+    ys, xs = np.nonzero((alpha > 0) & (alpha < 255))
+    out[ys, xs, :3] = _UNPREMULTIPLY[alpha[ys, xs, None], out[ys, xs, :3]]
+    return out
+
+
+def nearest_valid(valid, max_distance):
+    """
+    Nearest valid pixel of every invalid pixel within max_distance (Euclidean).
+    valid: (height, width) bool. Returns (ys, xs, src_ys, src_xs) index arrays:
+    pixel (ys[i], xs[i]) is closest to valid pixel (src_ys[i], src_xs[i]).
+    """
+    height, width = valid.shape
+    reach = int(max_distance)
+    rows = np.arange(height, dtype=np.int32)[:, None]
+
+    # Column pass: nearest valid row at or above / at or below every pixel.
+    # Two full-size int32 buffers, reused in place (exports can be 4096^2 and larger).
+    nearest_row = np.where(valid, rows, -_FAR).astype(np.int32)
+    np.maximum.accumulate(nearest_row, axis=0, out=nearest_row)
+    col_dist = np.where(valid, rows, _FAR).astype(np.int32)
+    np.minimum.accumulate(col_dist[::-1], axis=0, out=col_dist[::-1])
+    use_below = (col_dist - rows) < (rows - nearest_row)
+    np.copyto(nearest_row, col_dist, where=use_below)
+    del use_below
+    # Vertical distance, capped: anything beyond reach is never selected
+    np.subtract(rows, nearest_row, out=col_dist)
+    np.abs(col_dist, out=col_dist)
+    np.minimum(col_dist, reach + 1, out=col_dist)
+
+    # Holes with a column hit within +-reach columns (the only ones that can be in reach),
+    # in row blocks to keep the temporaries small
+    cols = np.arange(width)
+    hi = np.minimum(cols + reach + 1, width)
+    lo = np.maximum(cols - reach, 0)
+    band_ys, band_xs = [], []
+    for y0 in range(0, height, 256):
+        block = col_dist[y0:y0 + 256] <= reach
+        window = np.zeros((block.shape[0], width + 1), dtype=np.int32)
+        np.cumsum(block, axis=1, out=window[:, 1:])
+        candidates = ~valid[y0:y0 + 256] & (window[:, hi] > window[:, lo])
+        by, bx = np.nonzero(candidates)
+        band_ys.append(by + y0)
+        band_xs.append(bx)
+    ys = np.concatenate(band_ys) if band_ys else np.zeros(0, dtype=np.intp)
+    xs = np.concatenate(band_xs) if band_xs else np.zeros(0, dtype=np.intp)
+
+    # Row pass over the band: best column within the window, nearest offsets first (stable ties)
+    best = np.full(len(ys), _FAR, dtype=np.int64)
+    best_x = xs.copy()
+    for dx in sorted(range(-reach, reach + 1), key=abs):
+        x = xs + dx
+        inside = (x >= 0) & (x < width)
+        x = np.clip(x, 0, width - 1)
+        dist = col_dist[ys, x].astype(np.int64) ** 2 + dx * dx
+        better = inside & (dist < best)
+        best[better] = dist[better]
+        best_x[better] = x[better]
+
+    reached = best <= max_distance * max_distance
+    ys, xs, src_xs = ys[reached], xs[reached], best_x[reached]
+    return ys, xs, nearest_row[ys, src_xs], src_xs
+
+
+def apply_padding(pixels, padding, in_place=False):
+    """
+    Edge extension for straight-alpha RGBA: transparent pixels within `padding`
+    px of the silhouette take the color (and alpha) of the nearest pixel with
+    alpha > 0, so texture filtering at the silhouette does not pull in the
+    background. The area beyond the padding is filled with opaque black.
+    Returns a new array, or `pixels` itself with in_place.
+    """
+    out = pixels if in_place else pixels.copy()
+    if padding > 0:
+        # Sources are opaque pixels, which are never written: safe in place
+        ys, xs, src_ys, src_xs = nearest_valid(out[:, :, 3] > 0, padding)
+        out[ys, xs] = out[src_ys, src_xs]
+
+    # Fill remaining transparent area (outside the padding) with Black
+    final_mask = out[:, :, 3] == 0
+    out[final_mask] = [0, 0, 0, 255]
+    return out
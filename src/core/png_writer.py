@@ -0,0 +1,184 @@
+"""
+PNG encoder for large exports that deflates row bands in parallel.
+
+The image is cut into bands of rows. Each band is filtered (NumPy) and
+deflated on its own (zlib releases the GIL) in a thread pool. The bands are
+raw deflate streams: every band but the last ends with a sync flush, so it
+stops on a byte boundary. Written one after another behind a zlib header,
+they form one valid zlib stream. The Adler-32 checksum of the whole image
+is combined from the per-band checksums. Bands do not see the previous
+band's data (no back-references across the boundary), which costs well under
+1% of file size at the default band size.
+
+    write_png("out.png", pixels, level=6, png_filter="adaptive")
+"""
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# PNG filter types (per row); "adaptive" picks the best one per row (minimum sum of absolute differences)
+FILTERS = {"none": 0, "sub": 1, "up": 2, "average": 3, "paeth": 4, "adaptive": None}
+# zlib strategies
+STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "rle": zlib.Z_RLE,
+    "huffman": zlib.Z_HUFFMAN_ONLY,
+}
+DEFAULT_LEVEL = 6
+DEFAULT_FILTER = "adaptive"
+DEFAULT_STRATEGY = "default"
+
+# Filtered bytes per band: large enough that the deflate window resets at band
+# boundaries do not matter, small enough to spread over the threads
+BAND_BYTES = 1 << 20
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_ADLER_BASE = 65521
+
+
+def _chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(data, zlib.crc32(tag)))
+
+
+def _zlib_header(level):
+    # CMF: deflate, 32K window. FLG: compression level hint, check bits
+    flevel = 0 if level < 2 else 1 if level < 6 else 2 if level == 6 else 3
+    cmf, flg = 0x78, flevel << 6
+    flg += 31 - ((cmf << 8) + flg) % 31
+    return bytes((cmf, flg))
+
+
+def adler32_combine(adler1, adler2, length2):
+    """Adler-32 of A + B from adler32(A), adler32(B) and len(B) (zlib's adler32_combine)"""
+    rem = length2 % _ADLER_BASE
+    sum1 = adler1 & 0xFFFF
+    sum2 = (rem * sum1) % _ADLER_BASE
+    sum1 = (sum1 + (adler2 & 0xFFFF) + _ADLER_BASE - 1) % _ADLER_BASE
+    sum2 = (sum2 + ((adler1 >> 16) & 0xFFFF) + ((adler2 >> 16) & 0xFFFF) + _ADLER_BASE - rem) % _ADLER_BASE
+    return sum1 | (sum2 << 16)
+
+
+def _filtered(rows, prev, bpp, filter_type):
+    """PNG filter of (rows, row bytes) uint8 given the row above the first one -> filtered bytes"""
+    if filter_type == 0:
+        return rows
+    # Neighbours as views of one zero-padded copy: left, up and upper left of every byte
+    count, row_bytes = rows.shape
+    padded = np.zeros((count + 1, row_bytes + bpp), dtype=np.uint8)
+    padded[0, bpp:] = prev
+    padded[1:, bpp:] = rows
+    left, up, up_left = padded[1:, :-bpp], padded[:-1, bpp:], padded[:-1, :-bpp]
+    if filter_type == 1:
+        return rows - left
+    if filter_type == 2:
+        return rows - up
+    if filter_type == 3:
+        return rows - ((left.astype(np.uint16) + up) >> 1).astype(np.uint8)
+
+    # Paeth: the neighbour closest to left + up - upper left.
+    # With da = left - upper left, db = up - upper left: pa = |db|, pb = |da|, pc = |da + db|
+    wide = padded.astype(np.int16)
+    da = wide[1:, :-bpp] - wide[:-1, :-bpp]
+    db = wide[:-1, bpp:] - wide[:-1, :-bpp]
+    del wide
+    pc = da + db
+    np.abs(pc, out=pc)
+    pb = np.abs(da, out=da)
+    pa = np.abs(db, out=db)
+    predictor = np.where(pb <= pc, up, up_left)
+    np.copyto(predictor, left, where=(pa <= pb) & (pa <= pc))
+    return rows - predictor
+
+
+def _filter_band(pixels, y0, y1, filter_type):
+    """Rows y0..y1 of (height, width, channels) pixels -> filtered scanlines (type byte + data)"""
+    height, width, bpp = pixels.shape
+    rows = pixels[y0:y1].reshape(y1 - y0, width * bpp)
+    prev = pixels[y0 - 1].reshape(-1) if y0 > 0 else np.zeros(width * bpp, dtype=np.uint8)
+
+    out = np.empty((y1 - y0, width * bpp + 1), dtype=np.uint8)
+    if filter_type is not None:
+        out[:, 0] = filter_type
+        out[:, 1:] = _filtered(rows, prev, bpp, filter_type)
+        return out
+
+    # Adaptive: per row, the filter with the smallest sum of |filtered byte as int8|
+    best_cost = None
+    for candidate in (0, 1, 2, 3, 4):
+        data = _filtered(rows, prev, bpp, candidate)
+        cost = np.abs(data.view(np.int8).astype(np.int32)).sum(axis=1)
+        if best_cost is None:
+            best_cost = cost
+            out[:, 0] = candidate
+            out[:, 1:] = data
+            continue
+        better = cost < best_cost
+        best_cost = np.where(better, cost, best_cost)
+        out[better, 0] = candidate
+        out[better, 1:] = data[better]
+    return out
+
+
+def _encode_band(pixels, y0, y1, filter_type, level, strategy, last):
+    """-> (raw deflate data, adler32 of the filtered bytes, their length)"""
+    data = _filter_band(pixels, y0, y1, filter_type)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15, 9, strategy)
+    deflated = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return deflated, zlib.adler32(data), data.nbytes
+
+
+def write_png(path, pixels, level=DEFAULT_LEVEL, png_filter=DEFAULT_FILTER, strategy=DEFAULT_STRATEGY,
+              threads=None, band_rows=None):
+    """
+    Write (height, width, 3 or 4) uint8 RGB(A), top row first (any row stride,
+    e.g. a flipped view of mapped memory), as an 8-bit PNG.
+    level: zlib level 0-9. png_filter: key of FILTERS. strategy: key of STRATEGIES.
+    threads: deflate threads (default: CPU count). band_rows: rows per band (default: ~BAND_BYTES).
+    """
+    if png_filter not in FILTERS:
+        raise ValueError(f"Unknown PNG filter {png_filter!r} (one of {', '.join(FILTERS)})")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown zlib strategy {strategy!r} (one of {', '.join(STRATEGIES)})")
+    height, width, channels = pixels.shape
+    if pixels.dtype != np.uint8 or channels not in (3, 4):
+        raise ValueError("write_png expects (height, width, 3 or 4) uint8 pixels")
+    if pixels.strides[1:] != (channels, 1):
+        pixels = np.ascontiguousarray(pixels)
+
+    row_bytes = width * channels + 1
+    band_rows = band_rows or max(1, BAND_BYTES // row_bytes)
+    bands = [(y0, min(y0 + band_rows, height)) for y0 in range(0, height, band_rows)]
+    filter_type = FILTERS[png_filter]
+    zlib_strategy = STRATEGIES[strategy]
+    threads = max(1, threads or os.cpu_count() or 1)
+
+    def encode(band):
+        y0, y1 = band
+        return _encode_band(pixels, y0, y1, filter_type, level, zlib_strategy, y1 == height)
+
+    color_type = 6 if channels == 4 else 2
+    with open(path, "wb") as f:
+        f.write(_PNG_SIGNATURE)
+        f.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)))
+
+        adler = 1
+        f.write(_chunk(b"IDAT", _zlib_header(level)))
+        if threads == 1 or len(bands) == 1:
+            results = map(encode, bands)
+            pool = None
+        else:
+            pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="png-deflate")
+            results = pool.map(encode, bands) # In order; written as they complete
+        try:
+            for deflated, band_adler, length in results:
+                adler = adler32_combine(adler, band_adler, length)
+                f.write(_chunk(b"IDAT", deflated))
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        f.write(_chunk(b"IDAT", struct.pack(">I", adler)))
+        f.write(_chunk(b"IEND", b""))
@@ -0,0 +1,150 @@
+"""
+On-disk cache of linked GL programs (glGetProgramBinary / glProgramBinary).
+
+Entries are keyed by the GLSL sources plus the driver (vendor, renderer,
+version), so a driver update never loads a stale binary. A binary the driver
+rejects is deleted and the program compiled from source again. Least recently
+used files are removed when the cache grows over its size cap.
+"""
+import hashlib
+import os
+import struct
+
+import numpy as np
+from OpenGL.GL import (
+    glGetString, glGetIntegerv, glGetProgramiv, glGetProgramBinary, glProgramBinary,
+    glCreateProgram, glDeleteProgram, GLsizei, GLenum,
+    GL_VENDOR, GL_RENDERER, GL_VERSION, GL_NUM_PROGRAM_BINARY_FORMATS,
+    GL_PROGRAM_BINARY_LENGTH, GL_LINK_STATUS,
+)
+
+_HEADER = struct.Struct("<4sI") # magic, binary format
+
+
+class ProgramCache:
+    MAGIC = b"MCPB"
+    DEFAULT_MAX_MB = 64
+
+    def __init__(self, directory=None, max_mb=DEFAULT_MAX_MB):
+        self.directory = directory # Default: shader_cache next to config.json
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = True
+        self._supported = None
+        self.hits = 0
+        self.misses = 0
+
+    def _dir(self):
+        if self.directory is None:
+            from src.core.settings import Settings
+            self.directory = str(Settings().base_dir / "shader_cache")
+        return self.directory
+
+    def supported(self):
+        """The driver can save programs (GL context current)"""
+        if self._supported is None:
+            try:
+                self._supported = bool(glProgramBinary) and glGetIntegerv(GL_NUM_PROGRAM_BINARY_FORMATS) > 0
+            except Exception:
+                self._supported = False
+        return self._supported
+
+    @staticmethod
+    def key(vs_source, fs_source):
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (glGetString(GL_VENDOR), glGetString(GL_RENDERER), glGetString(GL_VERSION)):
+            digest.update(part or b"")
+            digest.update(b"\0")
+        for source in (vs_source, fs_source):
+            digest.update(source.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self._dir(), key + ".bin")
+
+    def load(self, key):
+        """Linked program from the cache, or None (GL context current)"""
+        if not self.enabled or not self.supported():
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        program = None
+        try:
+            magic, binary_format = _HEADER.unpack_from(data)
+            if magic != self.MAGIC:
+                raise ValueError("not a program binary")
+            binary = np.frombuffer(data, dtype=np.uint8, offset=_HEADER.size)
+            program = glCreateProgram()
+            glProgramBinary(program, binary_format, binary, binary.size)
+            if not glGetProgramiv(program, GL_LINK_STATUS):
+                raise ValueError("rejected by the driver")
+        except Exception as e:
+            print(f"ProgramCache: Dropping {os.path.basename(path)}: {e}")
+            if program:
+                glDeleteProgram(program)
+            self._remove(path)
+            self.misses += 1
+            return None
+        os.utime(path) # Recently used
+        self.hits += 1
+        return program
+
+    def store(self, key, program):
+        """Save a linked program (GL context current). Failures only cost the next compile."""
+        if not self.enabled or not self.supported():
+            return
+        try:
+            length = glGetProgramiv(program, GL_PROGRAM_BINARY_LENGTH)
+            if length <= 0:
+                return
+            binary = np.empty(length, dtype=np.uint8)
+            written = GLsizei()
+            binary_format = GLenum()
+            glGetProgramBinary(program, length, written, binary_format, binary)
+
+            os.makedirs(self._dir(), exist_ok=True)
+            path = self._path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(self.MAGIC, binary_format.value))
+                f.write(binary[:written.value].tobytes())
+            os.replace(tmp, path)
+            self._prune(keep=path)
+        except Exception as e:
+            print(f"ProgramCache: Failed to store program: {e}")
+
+    def _prune(self, keep):
+        # The entry just stored stays, even if it alone exceeds the cap
+        entries = []
+        with os.scandir(self._dir()) as it:
+            for entry in it:
+                if entry.name.endswith(".bin") and entry.path != keep:
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Delete every cached binary"""
+        directory = self._dir()
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.endswith(".bin"):
+                    self._remove(os.path.join(directory, name))
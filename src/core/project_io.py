@@ -2,6 +2,7 @@ import json
 import logging
 from src.core.layer_registry import LayerRegistry
 from src.core.layer_serializer import LayerSerializer
+from src.core.asset_index import AssetIndex
 
 class ProjectIO:
     APP_VERSION = "3.0"
@@ -12,7 +13,6 @@ class ProjectIO:
         Save project as a directory bundle.
         """
         import os
-        import shutil
         import json
         from pathlib import Path
         
@@ -43,10 +43,9 @@ class ProjectIO:
             if "params" in layer_data and "image_path" in layer_data["params"]:
                 src_path = layer_data["params"]["image_path"]
                 if src_path and os.path.exists(src_path):
+                    filename = os.path.basename(src_path)
                     try:
-                        filename = os.path.basename(src_path)
-                        dst_path = assets_dir / filename
-                        shutil.copy2(src_path, dst_path)
+                        filename = ProjectIO._store_asset(src_path, assets_dir)
                         layer_data["params"]["image_path"] = f"./assets/{filename}"
                     except Exception as e:
                         errors.append(f"Failed to copy {filename}: {e}")
@@ -66,9 +65,30 @@ class ProjectIO:
         except Exception as e:
             return False, [f"Failed to write JSON: {e}"]
             
+        AssetIndex().save()
         print(f"Project saved to {target_json}")
         return True, errors
 
+    @staticmethod
+    def _store_asset(src_path, assets_dir):
+        """
+        Copy an image into assets/ under its content hash -> file name.
+        Files already in this bundle are kept as they are, and identical images
+        (also from other paths) are stored and copied once.
+        """
+        import os
+        import shutil
+        from pathlib import Path
+
+        src = Path(src_path).resolve()
+        if src.parent == Path(assets_dir).resolve():
+            return src.name
+        filename = AssetIndex().hash_file(str(src)) + src.suffix.lower()
+        dst_path = Path(assets_dir) / filename
+        if not dst_path.exists() or dst_path.stat().st_size != src.stat().st_size:
+            shutil.copy2(src, dst_path)
+        return filename
+
     @staticmethod
     def load_project(file_path, layer_stack):
         import json
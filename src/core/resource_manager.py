@@ -1,11 +1,48 @@
 from OpenGL.GL import *
 from OpenGL.GL import shaders
-from PIL import Image
+import io
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from src.core.utils import get_resource_path
+from src.core.texture_cache import TextureCache, texture_bytes
+from src.core.asset_index import AssetIndex
+from src.core.program_cache import ProgramCache
+
+class ProgramInfo:
+    """Active uniforms of a linked program, introspected once, plus the last value set per uniform."""
+    def __init__(self, program):
+        self.uniforms = {}  # name -> (location, GL type)
+        self.values = {}    # location -> last value set
+        for i in range(glGetProgramiv(program, GL_ACTIVE_UNIFORMS)):
+            name, _size, gl_type = glGetActiveUniform(program, i)
+            name = name.decode() if isinstance(name, bytes) else name
+            if name.endswith("[0]"):
+                name = name[:-3]
+            location = glGetUniformLocation(program, name)
+            if location >= 0: # Uniform block members have no location
+                self.uniforms[name] = (location, int(gl_type))
+
 
 class ResourceManager:
     _instance = None
+    # Background image decoding (see async_textures)
+    DECODE_THREADS = 4
+
+    # Uniform block binding points shared by all programs
+    FRAME_GLOBALS_BLOCK = "FrameGlobals"
+    FRAME_GLOBALS_BINDING = 0
+
+    _SETTERS = {
+        GL_FLOAT: lambda loc, v: glUniform1f(loc, v),
+        GL_FLOAT_VEC2: lambda loc, v: glUniform2f(loc, *v),
+        GL_FLOAT_VEC3: lambda loc, v: glUniform3f(loc, *v),
+        GL_FLOAT_VEC4: lambda loc, v: glUniform4f(loc, *v),
+        GL_INT: lambda loc, v: glUniform1i(loc, v),
+        GL_BOOL: lambda loc, v: glUniform1i(loc, v),
+        GL_SAMPLER_2D: lambda loc, v: glUniform1i(loc, v),
+    }
     
     def __new__(cls):
         if cls._instance is None:
@@ -16,49 +53,258 @@ class ResourceManager:
     def _init(self):
         # Cache dictionaries
         self._shaders = {}  # key: (vert_path, frag_path), value: program_id
-        self._textures = {} # key: path, value: texture_id
+        self.texture_cache = TextureCache() # path -> content hash -> texture; GPU memory budget and owner references
+        self._programs = {} # key: program_id, value: ProgramInfo
+        self.program_cache = ProgramCache() # Linked programs saved across runs
+        # Held while using the cached objects from a GL context: a context sharing them
+        # (background exports) renders on another thread, and program uniforms are shared state
+        self.lock = threading.RLock()
+        # Background decoding: full path -> Future of (size, RGBA bytes) or None (failed)
+        self._pending = {}
+        self._failed = set()
+        self._decode_pool = None
+        self._decode_listeners = []
+        self._local = threading.local()
         
     def get_shader(self, vert_path, frag_path):
         """Get or compile a shader program."""
-        # Resolve paths for frozen environment
-        v_path = get_resource_path(vert_path)
-        f_path = get_resource_path(frag_path)
+        with self.lock:
+            # Resolve paths for frozen environment
+            v_path = get_resource_path(vert_path)
+            f_path = get_resource_path(frag_path)
         
-        key = (v_path, f_path)
-        if key in self._shaders:
-            return self._shaders[key]
+            key = (v_path, f_path)
+            if key in self._shaders:
+                return self._shaders[key]
             
-        # Compile new shader
-        program = self._compile_shader(v_path, f_path)
-        if program:
-            self._shaders[key] = program
+            # Compile new shader
+            program = self._compile_shader(v_path, f_path)
+            if program:
+                self._shaders[key] = program
             
-        return program
+            return program
+
+    def get_shader_from_source(self, vert_source, frag_source, label="<generated>"):
+        """Get or compile a shader program from in-memory GLSL (e.g. generated shaders)."""
+        with self.lock:
+            key = ("source", vert_source, frag_source)
+            if key in self._shaders:
+                return self._shaders[key]
+
+            program = self._compile_source(vert_source, frag_source, label)
+            if program:
+                self._shaders[key] = program
+
+            return program
+
+    def release_shader(self, program):
+        """Delete a program and drop every cache entry pointing at it."""
+        with self.lock:
+            for key in [k for k, v in self._shaders.items() if v == program]:
+                del self._shaders[key]
+            self._programs.pop(program, None)
+            glDeleteProgram(program)
+
+    def program_info(self, program):
+        """Introspected uniforms of a program (computed on first use for programs linked elsewhere)."""
+        info = self._programs.get(program)
+        if info is None:
+            info = self._programs[program] = ProgramInfo(program)
+        return info
+
+    def set_uniform(self, program, name, value):
+        """
+        Set a uniform of the currently bound program by name, typed from introspection.
+        Inactive uniforms and values equal to the last one set are skipped.
+        """
+        info = self.program_info(program)
+        entry = info.uniforms.get(name)
+        if entry is None:
+            return
+        loc, gl_type = entry
+        if gl_type in (GL_FLOAT_VEC2, GL_FLOAT_VEC3, GL_FLOAT_VEC4):
+            value = tuple(float(v) for v in value)
+        elif gl_type == GL_FLOAT:
+            value = float(value)
+        else:
+            value = int(value)
+        if info.values.get(loc) == value:
+            return
+        setter = self._SETTERS.get(gl_type)
+        if setter is None:
+            print(f"ResourceManager: Unsupported uniform type {gl_type} for {name}")
+            return
+        setter(loc, value)
+        info.values[loc] = value
         
     def get_texture(self, path):
-        """Get or load a texture."""
-        if not path:
-            return None
+        """
+        Get or load a texture. Inside async_textures() an image that is not loaded yet
+        is decoded on a thread pool instead, and None returned until upload_pending()
+        has uploaded it (is_loading tells the two None cases apart). Outside, a decode
+        already running for the image is waited for.
+        Textures are shared by content: another path to an identical image (known to
+        the AssetIndex) gets the same texture without decoding.
+        """
+        with self.lock:
+            if not path:
+                return None
             
-        # Check if path is absolute (external file) or relative (internal resource)
-        # If absolute, use as is. If relative, resolve via utils.
-        full_path = path
-        if not os.path.isabs(path):
-             full_path = get_resource_path(path)
+            full_path = self._full_path(path)
              
-        if not os.path.exists(full_path):
-            print(f"ResourceManager: Texture not found: {full_path}")
-            return None
-            
-        if full_path in self._textures:
-            return self._textures[full_path]
+            if not os.path.exists(full_path):
+                print(f"ResourceManager: Texture not found: {full_path}")
+                return None
             
-        # Load new texture
-        tex_id = self._load_texture_from_file(full_path)
-        if tex_id:
-            self._textures[full_path] = tex_id
+            tex_id = self._cached_texture(full_path)
+            if tex_id is not None:
+                return tex_id
+            if full_path in self._failed:
+                return None
+
+            if getattr(self._local, "async_textures", False):
+                self._request_decode(full_path)
+                return None
             
-        return tex_id
+            # Load new texture (joining a background decode of the same file)
+            future = self._pending.pop(full_path, None)
+
+        # Decoded without the lock: other contexts keep using the caches meanwhile
+        decoded = future.result() if future is not None else self._decode_image(full_path)
+        if decoded is None:
+            return None
+        with self.lock:
+            return self._cache_texture(full_path, decoded)
+
+    def acquire_texture(self, path):
+        """
+        get_texture() for an owner that keeps using the texture (e.g. a layer showing the image):
+        it is not evicted until release_texture_ref(). Also counts while the image still loads.
+        """
+        if path:
+            with self.lock:
+                self.texture_cache.acquire(self._full_path(path))
+        return self.get_texture(path)
+
+    def release_texture_ref(self, path):
+        """Owner done with a texture from acquire_texture(); it may be evicted now (GL context active)"""
+        with self.lock:
+            if path:
+                self.texture_cache.release(self._full_path(path))
+
+    def acquire_generated_texture(self, key, create):
+        """
+        acquire_texture() for a texture computed rather than loaded (e.g. a baked noise
+        pattern). `key` names its content; create() -> (texture id, bytes) only runs when
+        nothing is cached under it. Release with release_generated_texture(key).
+        """
+        with self.lock:
+            self.texture_cache.acquire(key)
+            tex_id = self.texture_cache.get(key)
+            if tex_id is None:
+                tex_id, nbytes = create()
+                if tex_id:
+                    self.texture_cache.add(key, tex_id, nbytes)
+            return tex_id
+
+    def texture_key(self, path):
+        """Content key of a loaded texture (see get_texture), e.g. to name textures derived from it"""
+        with self.lock:
+            full_path = self._full_path(path)
+            return self.texture_cache.key(full_path) or full_path
+
+    def release_generated_texture(self, key):
+        """Owner done with a texture from acquire_generated_texture() (GL context active)"""
+        with self.lock:
+            self.texture_cache.release(key)
+
+    def set_texture_budget(self, megabytes):
+        """GPU memory kept for textures no owner uses any more (GL context active)"""
+        with self.lock:
+            self.texture_cache.set_budget(megabytes)
+
+    def texture_stats(self):
+        """Texture cache occupancy (see TextureCache.stats)"""
+        with self.lock:
+            return self.texture_cache.stats()
+
+    @contextmanager
+    def async_textures(self):
+        """get_texture calls on this thread within the block do not wait for image decoding"""
+        previous = getattr(self._local, "async_textures", False)
+        self._local.async_textures = True
+        try:
+            yield
+        finally:
+            self._local.async_textures = previous
+
+    def prefetch_textures(self, paths):
+        """Start decoding images in parallel (no GL needed), e.g. all images of a project being loaded"""
+        with self.lock:
+            for path in paths:
+                if not path:
+                    continue
+                full_path = self._full_path(path)
+                if full_path in self._failed or not os.path.exists(full_path):
+                    continue
+                if self._cached_texture(full_path) is None:
+                    self._request_decode(full_path)
+
+    def is_loading(self, path):
+        """True while the image is decoded in the background or waits for upload_pending()"""
+        return bool(path) and self._full_path(path) in self._pending
+
+    def upload_pending(self):
+        """Upload the images whose background decoding finished (GL context current) -> their paths"""
+        with self.lock:
+            done = [p for p, future in self._pending.items() if future.done()]
+            for full_path in done:
+                decoded = self._pending.pop(full_path).result()
+                if decoded is None:
+                    self._failed.add(full_path)
+                    continue
+                self._cache_texture(full_path, decoded)
+            return done
+
+    def add_decode_listener(self, callback):
+        """callback(full path) is called from a decode thread when an image is ready for upload_pending()"""
+        self._decode_listeners.append(callback)
+
+    def remove_decode_listener(self, callback):
+        if callback in self._decode_listeners:
+            self._decode_listeners.remove(callback)
+
+    def _request_decode(self, full_path):
+        # Coalesced: one decode per file, however many layers ask for it
+        if full_path in self._pending:
+            return
+        if self._decode_pool is None:
+            self._decode_pool = ThreadPoolExecutor(max_workers=self.DECODE_THREADS, thread_name_prefix="texture-decode")
+        future = self._decode_pool.submit(self._decode_image, full_path)
+        self._pending[full_path] = future
+        future.add_done_callback(lambda f, p=full_path: self._notify_decoded(p))
+
+    def _notify_decoded(self, full_path):
+        for callback in list(self._decode_listeners):
+            try:
+                callback(full_path)
+            except Exception as e:
+                print(f"ResourceManager: Decode listener failed: {e}")
+
+    def _cached_texture(self, full_path):
+        """Cached texture of the file's current content, or None (the file is not indexed, or changed)"""
+        if full_path in self._pending:
+            return None
+        key = AssetIndex().lookup(full_path)
+        if key is None:
+            self.texture_cache.unlink(full_path)
+            return None
+        return self.texture_cache.link(full_path, key)
+
+    @staticmethod
+    def _full_path(path):
+        # Absolute paths are external files, relative ones internal resources
+        return path if os.path.isabs(path) else get_resource_path(path)
         
     def _compile_shader(self, vert_path, frag_path):
         try:
@@ -66,25 +312,82 @@ class ResourceManager:
                 vs_source = f.read()
             with open(frag_path, 'r', encoding='utf-8') as f:
                 fs_source = f.read()
-                
-            vertex_shader = shaders.compileShader(vs_source, GL_VERTEX_SHADER)
-            fragment_shader = shaders.compileShader(fs_source, GL_FRAGMENT_SHADER)
-            program = shaders.compileProgram(vertex_shader, fragment_shader)
-            return program
-        except Exception as e:
-            print(f"ResourceManager: Shader Compile Error ({vert_path}, {frag_path}): {e}")
+        except OSError as e:
+            print(f"ResourceManager: Failed to read shader ({vert_path}, {frag_path}): {e}")
             return None
+        return self._compile_source(vs_source, fs_source, f"{vert_path}, {frag_path}")
 
-    def _load_texture_from_file(self, path):
+    def _compile_source(self, vs_source, fs_source, label):
+        # Saved binary of the same sources and driver, else compile (and save)
+        key = self.program_cache.key(vs_source, fs_source)
+        program = self.program_cache.load(key)
+        if program is None:
+            try:
+                vertex_shader = shaders.compileShader(vs_source, GL_VERTEX_SHADER)
+                fragment_shader = shaders.compileShader(fs_source, GL_FRAGMENT_SHADER)
+                program = self._link_program(vertex_shader, fragment_shader)
+            except Exception as e:
+                print(f"ResourceManager: Shader Compile Error ({label}): {e}")
+                return None
+            self.program_cache.store(key, program)
+
+        # Introspect once at link time and attach the shared uniform blocks
+        self._programs[program] = ProgramInfo(program)
+        block = glGetUniformBlockIndex(program, self.FRAME_GLOBALS_BLOCK)
+        if block != GL_INVALID_INDEX:
+            glUniformBlockBinding(program, block, self.FRAME_GLOBALS_BINDING)
+        return program
+
+    def _link_program(self, vertex_shader, fragment_shader):
+        program = glCreateProgram()
+        glAttachShader(program, vertex_shader)
+        glAttachShader(program, fragment_shader)
+        if self.program_cache.supported():
+            glProgramParameteri(program, GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL_TRUE)
+        glLinkProgram(program)
+        linked = glGetProgramiv(program, GL_LINK_STATUS)
+        log = glGetProgramInfoLog(program)
+        for shader in (vertex_shader, fragment_shader):
+            glDetachShader(program, shader)
+            glDeleteShader(shader)
+        if not linked:
+            glDeleteProgram(program)
+            raise RuntimeError(f"Link failed: {log.decode(errors='replace') if isinstance(log, bytes) else log}")
+        return program
+
+    @staticmethod
+    def _decode_image(path):
+        """File -> (content hash, (w, h), RGBA bytes, bottom row first), or None. No GL: runs on the decode threads."""
         try:
-            img = Image.open(path)
+            from PIL import Image
+            # Read once for both the hash (unless indexed) and the decoder
+            with open(path, "rb") as f:
+                data = f.read()
+            key = AssetIndex().hash_file(path, data)
+            img = Image.open(io.BytesIO(data))
             # Ensure correct format
             img = img.convert("RGBA")
             # Flip for OpenGL
             img = img.transpose(Image.FLIP_TOP_BOTTOM)
-            img_data = img.tobytes()
-            w, h = img.size
-            
+            return key, img.size, img.tobytes()
+        except Exception as e:
+            print(f"ResourceManager: Failed to load texture {path}: {e}")
+            return None
+
+    def _cache_texture(self, full_path, decoded):
+        key, (w, h), img_data = decoded
+        # Identical content already uploaded for another path
+        tex_id = self.texture_cache.link(full_path, key)
+        if tex_id is not None:
+            return tex_id
+        tex_id = self._upload_texture(full_path, ((w, h), img_data))
+        if tex_id:
+            self.texture_cache.add(full_path, tex_id, texture_bytes(w, h), key=key)
+        return tex_id
+
+    def _upload_texture(self, path, decoded):
+        (w, h), img_data = decoded
+        try:
             tex_id = glGenTextures(1)
             glBindTexture(GL_TEXTURE_2D, tex_id)
             
@@ -103,19 +406,35 @@ class ResourceManager:
             print(f"ResourceManager: Failed to load texture {path}: {e}")
             return None
             
+    def release_texture(self, path):
+        """Delete a cached texture now (path as passed to get_texture). Layers still holding its id must reload it."""
+        with self.lock:
+            full_path = self._full_path(path)
+            self._failed.discard(full_path)
+            self._pending.pop(full_path, None)
+            self.texture_cache.remove(full_path)
+
     def reload_texture(self, path):
         """Force reload a texture (e.g. if file changed on disk)."""
-        if path in self._textures:
-            glDeleteTextures([self._textures[path]])
-            del self._textures[path]
-        return self.get_texture(path)
+        with self.lock:
+            full_path = self._full_path(path)
+            self._failed.discard(full_path)
+            self._pending.pop(full_path, None)
+            # References stay: the owners get the new id from get_texture
+            self.texture_cache.remove(full_path)
+            self.texture_cache.unlink(full_path)
+            AssetIndex().forget(full_path)
+            return self.get_texture(path)
 
     def clear(self):
         """Clear all resources (e.g. on shutdown)."""
-        for prog in self._shaders.values():
-            glDeleteProgram(prog)
-        self._shaders.clear()
+        with self.lock:
+            for prog in self._shaders.values():
+                glDeleteProgram(prog)
+            self._shaders.clear()
+            self._programs.clear()
         
-        for tex in self._textures.values():
-            glDeleteTextures([tex])
-        self._textures.clear()
+            self.texture_cache.clear()
+            # Decodes still running are dropped when they finish
+            self._pending.clear()
+            self._failed.clear()
@@ -18,18 +18,27 @@ class Settings:
         self.output_dir = self.base_dir / "output"
         self.projects_dir = self.base_dir / "projects"
         self.config_file = self.base_dir / "config.json"
-        
-        self._ensure_dirs()
+        self._dirs_created = False # Created on first use (not at startup)
         
         # Default Settings
         self.export_resolution = 2048
         self.export_padding = 4
         self.language = "ja" # Default Japanese
+        self.prefix_cache_budget_mb = 256 # Incremental compositing snapshots
+        self.texture_cache_budget_mb = 1024 # Image textures no layer uses any more
+        self.analytic_geometry = False # Analytic sphere instead of the tessellated mesh
+        self.interactive_render_scale = 0.5 # Preview resolution while a slider is dragged
+        self.interactive_frame_budget_ms = 33 # Lower it further when dragging frames take longer
+        self.png_compression = 6 # zlib level 0-9
+        self.png_filter = "adaptive" # src.core.png_writer.FILTERS
         
         # Load from file
         self.load()
         
     def _ensure_dirs(self):
+        if self._dirs_created:
+            return
+        self._dirs_created = True
         try:
             self.output_dir.mkdir(parents=True, exist_ok=True)
             self.projects_dir.mkdir(parents=True, exist_ok=True)
@@ -37,11 +46,17 @@ class Settings:
             print(f"Failed to create directories: {e}")
             
     def get_output_dir(self):
+        self._ensure_dirs()
         return str(self.output_dir)
         
     def get_projects_dir(self):
+        self._ensure_dirs()
         return str(self.projects_dir)
 
+    def get_png_options(self):
+        """Export PNG encoder settings (src.core.image_io.save_rgba)"""
+        return {"level": self.png_compression, "png_filter": self.png_filter}
+
     def load(self):
         if not self.config_file.exists():
             return
@@ -52,6 +67,13 @@ class Settings:
                 self.export_resolution = data.get("export_resolution", 2048)
                 self.export_padding = data.get("export_padding", 4)
                 self.language = data.get("language", "ja")
+                self.prefix_cache_budget_mb = data.get("prefix_cache_budget_mb", 256)
+                self.texture_cache_budget_mb = data.get("texture_cache_budget_mb", 1024)
+                self.analytic_geometry = data.get("analytic_geometry", False)
+                self.interactive_render_scale = data.get("interactive_render_scale", 0.5)
+                self.interactive_frame_budget_ms = data.get("interactive_frame_budget_ms", 33)
+                self.png_compression = data.get("png_compression", 6)
+                self.png_filter = data.get("png_filter", "adaptive")
                 # print(f"Settings loaded: {data}")
         except Exception as e:
             print(f"Failed to load settings: {e}")
@@ -60,8 +82,16 @@ class Settings:
         data = {
             "export_resolution": self.export_resolution,
             "export_padding": self.export_padding,
-            "language": self.language
+            "language": self.language,
+            "prefix_cache_budget_mb": self.prefix_cache_budget_mb,
+            "texture_cache_budget_mb": self.texture_cache_budget_mb,
+            "analytic_geometry": self.analytic_geometry,
+            "interactive_render_scale": self.interactive_render_scale,
+            "interactive_frame_budget_ms": self.interactive_frame_budget_ms,
+            "png_compression": self.png_compression,
+            "png_filter": self.png_filter
         }
+        self._ensure_dirs()
         try:
             with open(self.config_file, 'w') as f:
                 json.dump(data, f, indent=4)
@@ -0,0 +1,455 @@
+import re
+from collections import OrderedDict
+from OpenGL.GL import glGetIntegerv, GL_MAX_TEXTURE_IMAGE_UNITS
+from src.core.utils import get_resource_path
+
+_COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+_DECL_RE = re.compile(
+    r"^(?:layout\s*\([^)]*\)\s*)?(uniform|in|out)\s+"
+    r"(?:(?:highp|mediump|lowp|flat|smooth)\s+)*(\w+)\s+(.+)$", re.S
+)
+_FUNC_NAME_RE = re.compile(r"(\w+)\s*\($")
+
+
+def rename_identifiers(text, mapping):
+    """Rename whole-word identifiers (member accesses like `.x` are left alone)."""
+    if not mapping:
+        return text
+    pattern = re.compile(r"(?<![\w.])(" + "|".join(re.escape(k) for k in mapping) + r")(?!\w)")
+    return pattern.sub(lambda m: mapping[m.group(1)], text)
+
+
+def replace_sampler_fetch(text, sampler, expr):
+    """Replace `texture(sampler, TexCoords)` with an expression (e.g. a function argument)."""
+    pattern = re.compile(r"texture\s*\(\s*" + re.escape(sampler) + r"\s*,\s*TexCoords\s*\)")
+    return pattern.sub(expr, text)
+
+
+class GLSLModule:
+    """
+    Top-level view of a GLSL source file: #defines, uniform/in/out declarations,
+    uniform blocks, helper functions and the body of main(). Used to splice existing shaders
+    into generated programs without maintaining a second copy of their code.
+    """
+    def __init__(self, source):
+        self.defines = []               # '#define ...' lines
+        self.uniforms = OrderedDict()   # name -> type
+        self.inputs = OrderedDict()     # name -> type
+        self.blocks = OrderedDict()     # uniform block name -> declaration
+        self.functions = []             # [(name, source)] excluding main
+        self.main_body = ""
+        self._parse(_COMMENT_RE.sub("", source))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(get_resource_path(path), 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    def _parse(self, src):
+        i, n = 0, len(src)
+        while i < n:
+            if src[i].isspace():
+                i += 1
+                continue
+
+            if src[i] == '#':
+                end = src.find('\n', i)
+                end = n if end < 0 else end
+                line = src[i:end].strip()
+                if line.startswith('#define'):
+                    self.defines.append(line)
+                i = end
+                continue
+
+            # Statement: runs until ';' or a '{' block at depth 0
+            j = i
+            while j < n and src[j] not in ';{':
+                j += 1
+            header = src[i:j].strip()
+
+            if j < n and src[j] == '{':
+                depth, k = 0, j
+                while k < n:
+                    if src[k] == '{':
+                        depth += 1
+                    elif src[k] == '}':
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    k += 1
+                body = src[j + 1:k]
+                i = k + 1
+
+                # `uniform Block { ... };` style declarations end with ';'
+                rest = src[i:].lstrip()
+                if rest.startswith(';'):
+                    i = n - len(rest) + 1
+                    block_name = header.split()[-1]
+                    self.blocks[block_name] = f"{header} {{{body}}};"
+                    continue
+
+                name_match = _FUNC_NAME_RE.search(header[:header.find('(') + 1])
+                if not name_match:
+                    raise ValueError(f"Unsupported GLSL construct: {header!r}")
+                name = name_match.group(1)
+                if name == 'main':
+                    self.main_body = body
+                else:
+                    self.functions.append((name, f"{header}\n{{{body}}}"))
+                continue
+
+            self._parse_declaration(header)
+            i = j + 1
+
+    def _parse_declaration(self, statement):
+        m = _DECL_RE.match(statement)
+        if not m:
+            return
+        qualifier, type_name, names = m.groups()
+        for name in names.split(','):
+            name = name.strip()
+            if qualifier == 'uniform':
+                self.uniforms[name] = type_name
+            elif qualifier == 'in':
+                self.inputs[name] = type_name
+
+    def as_function(self, signature, renames=None, fetches=None):
+        """
+        Turn main() into a function returning what it wrote to FragColor.
+        `fetches` maps sampler names to expressions replacing `texture(sampler, TexCoords)`.
+        """
+        body = self.main_body
+        for sampler, expr in (fetches or {}).items():
+            body = replace_sampler_fetch(body, sampler, expr)
+        body = rename_identifiers(body, dict(renames or {}, FragColor="layerOut"))
+        body = re.sub(r"\breturn\s*;", "return layerOut;", body)
+        return f"{signature}\n{{\n    vec4 layerOut = vec4(0.0);{body}\n    return layerOut;\n}}"
+
+
+class AnalyticSphere:
+    """
+    Geometry-free variant of a layer shader for the analytic render mode: the
+    layer is drawn as a full-screen quad (layer_analytic.vert) and the inputs
+    layer_base.vert would interpolate over the sphere mesh become globals,
+    computed per pixel by sphereSurface() (analytic_sphere.frag) at the top of
+    main(). The returned `coverage` scales the layer alpha at the silhouette.
+    """
+    VERTEX_SHADER = "src/shaders/layer_analytic.vert"
+    SURFACE_SHADER = "src/shaders/analytic_sphere.frag"
+    # Inputs of the layer shaders, in sphereSurface() argument order
+    VARYINGS = (("FragPos", "vec3"), ("Normal", "vec3"), ("TexCoords", "vec2"), ("TBN", "mat3"))
+    PROLOGUE = (
+        "    float coverage = sphereSurface(FragPos, Normal, TexCoords, TBN);\n"
+        "    if (coverage <= 0.0) discard;\n"
+    )
+
+    def __init__(self):
+        self.module = GLSLModule.from_file(self.SURFACE_SHADER)
+
+    def check_inputs(self, mod, path):
+        known = dict(self.VARYINGS)
+        for name, type_name in mod.inputs.items():
+            if known.get(name) != type_name:
+                raise ValueError(f"{path}: input {type_name} {name} has no analytic equivalent")
+
+    def declarations(self):
+        """Replaces the layer `in` declarations"""
+        lines = [f"in {t} {n};" for n, t in self.module.inputs.items()]
+        lines += [f"{t} {n};" for n, t in self.VARYINGS]
+        return lines
+
+    def functions(self):
+        return [src for _, src in self.module.functions]
+
+
+class FusedProgram:
+    """A generated single-pass program plus the naming/texture-unit layout of its layers."""
+    def __init__(self, program, suffixes, texture_units):
+        self.program = program
+        self.suffixes = suffixes            # per layer: uniform name suffix
+        self.texture_units = texture_units  # per layer: {sampler name: unit}
+
+
+class FusedShaderBuilder:
+    """
+    Generates one fragment shader evaluating a whole layer stack.
+
+    Every layer's main() becomes `vec4 layerN(vec4 dst)`, its uniforms and helper
+    functions get an `_LN` suffix, and the results are folded with the
+    `applyBlend` chain of blend.frag. Outputs are clamped after each step to
+    mirror the 8-bit intermediate FBOs of the multi-pass path.
+    """
+    VERTEX_SHADER = "src/shaders/layer_base.vert"
+    BLEND_SHADER = "src/shaders/blend.frag"
+
+    # Uniforms set once per frame by the Compositor and shared by every layer
+    # (the other per-frame globals live in the FrameGlobals uniform block)
+    SHARED_UNIFORMS = ("normalMap",)
+    # normalMap is bound to unit 5 by the Compositor
+    FIRST_LAYER_UNIT = 6
+
+    def __init__(self):
+        self._modules = {}
+        self._analytic = None
+
+    def _module(self, path):
+        if path not in self._modules:
+            self._modules[path] = GLSLModule.from_file(path)
+        return self._modules[path]
+
+    def _analytic_sphere(self):
+        if self._analytic is None:
+            self._analytic = AnalyticSphere()
+        return self._analytic
+
+    def build(self, entries, max_units, analytic=False):
+        """
+        entries: [(fragment_shader_path, blend_mode_id, input_sampler)]
+        input_sampler is set for layers that filter the accumulated image
+        (Adjustment) instead of drawing on top of it.
+        analytic: generate the full-screen quad variant (see AnalyticSphere).
+        Returns (fragment_source, suffixes, texture_units) or raises ValueError.
+        """
+        blend = self._module(self.BLEND_SHADER)
+        sphere = self._analytic_sphere() if analytic else None
+
+        defines = list(blend.defines)
+        inputs = OrderedDict()
+        blocks = OrderedDict()
+        shared = OrderedDict()
+        decls, funcs, calls = [], [], []
+        suffixes, units = [], []
+        next_unit = self.FIRST_LAYER_UNIT
+
+        for idx, (path, mode_id, input_sampler) in enumerate(entries):
+            mod = self._module(path)
+            suffix = f"_L{idx}"
+            suffixes.append(suffix)
+
+            if sphere:
+                sphere.check_inputs(mod, path)
+            for d in mod.defines:
+                if d not in defines:
+                    defines.append(d)
+            for name, type_name in mod.inputs.items():
+                inputs.setdefault(name, type_name)
+            for name, decl in mod.blocks.items():
+                blocks.setdefault(name, decl)
+
+            renames = {}
+            layer_units = {}
+            for name, type_name in mod.uniforms.items():
+                if name in self.SHARED_UNIFORMS:
+                    shared.setdefault(name, type_name)
+                    continue
+                if name == input_sampler:
+                    continue
+                renames[name] = name + suffix
+                decls.append(f"uniform {type_name} {name}{suffix};")
+                if type_name.startswith("sampler"):
+                    layer_units[name] = next_unit
+                    next_unit += 1
+            units.append(layer_units)
+
+            for fname, _ in mod.functions:
+                renames[fname] = fname + suffix
+            for _, fsrc in mod.functions:
+                funcs.append(rename_identifiers(fsrc, renames))
+
+            fetches = None
+            if input_sampler:
+                # Only same-pixel reads of the accumulator can be fused
+                leftover = replace_sampler_fetch(mod.main_body, input_sampler, "dst")
+                used = re.compile(r"\b" + re.escape(input_sampler) + r"\b")
+                if used.search(leftover) or any(used.search(f) for _, f in mod.functions):
+                    raise ValueError(f"{path}: {input_sampler} is sampled outside TexCoords")
+                fetches = {input_sampler: "dst"}
+            funcs.append(mod.as_function(f"vec4 layer{idx}(vec4 dst)", renames, fetches))
+
+            if input_sampler:
+                calls.append(f"    acc = clamp(layer{idx}(acc), 0.0, 1.0);")
+            else:
+                opacity = "coverage" if sphere else "1.0"
+                calls.append(f"    acc = compositeLayer(clamp(layer{idx}(acc), 0.0, 1.0), acc, {int(mode_id)}, {opacity});")
+
+        if next_unit > max_units:
+            raise ValueError(f"Fused stack needs {next_unit} texture units, only {max_units} available")
+
+        composite = blend.as_function(
+            "vec4 compositeLayer(vec4 src, vec4 dst, int uMode, float uOpacity)",
+            fetches={"uSrc": "src", "uDst": "dst"}
+        )
+
+        if sphere:
+            for name, decl in sphere.module.blocks.items():
+                blocks.setdefault(name, decl)
+
+        lines = ["#version 330 core", "out vec4 FragColor;"]
+        lines += sphere.declarations() if sphere else [f"in {t} {n};" for n, t in inputs.items()]
+        lines += defines
+        lines += list(blocks.values())
+        lines += [f"uniform {t} {n};" for n, t in shared.items()]
+        lines += decls
+        lines += [src for _, src in blend.functions]
+        lines.append(composite)
+        lines += sphere.functions() if sphere else []
+        lines += funcs
+        lines.append("void main()\n{")
+        if sphere:
+            lines.append(sphere.PROLOGUE.rstrip("\n"))
+        lines.append("    vec4 acc = vec4(0.0);")
+        lines += calls
+        lines.append("    FragColor = acc;\n}")
+        return "\n".join(lines) + "\n", suffixes, units
+
+
+class DirectBlendBuilder:
+    """
+    Variant of a layer shader that draws straight into the accumulator with
+    fixed-function blending (see LayerInterface.setup_blend_func).
+    main() becomes `vec4 layerColor()` and its output is clamped like the
+    8-bit layer FBO of the multi-pass path, then premultiplied.
+
+    With `premultiply=False` the output is only clamped, which together with
+    `analytic=True` gives the multi-pass layer program of the analytic mode.
+    """
+    def __init__(self):
+        self._modules = {}
+        self._analytic = None
+
+    def build(self, path, analytic=False, premultiply=True):
+        if path not in self._modules:
+            self._modules[path] = GLSLModule.from_file(path)
+        mod = self._modules[path]
+
+        sphere = None
+        if analytic:
+            if self._analytic is None:
+                self._analytic = AnalyticSphere()
+            sphere = self._analytic
+            sphere.check_inputs(mod, path)
+
+        blocks = OrderedDict(mod.blocks)
+        if sphere:
+            for name, decl in sphere.module.blocks.items():
+                blocks.setdefault(name, decl)
+
+        lines = ["#version 330 core", "out vec4 FragColor;"]
+        lines += sphere.declarations() if sphere else [f"in {t} {n};" for n, t in mod.inputs.items()]
+        lines += mod.defines
+        lines += list(blocks.values())
+        lines += [f"uniform {t} {n};" for n, t in mod.uniforms.items()]
+        lines += sphere.functions() if sphere else []
+        lines += [src for _, src in mod.functions]
+        lines.append(mod.as_function("vec4 layerColor()"))
+
+        main = ["void main()\n{\n"]
+        if sphere:
+            main.append(sphere.PROLOGUE)
+        main.append("    vec4 c = clamp(layerColor(), 0.0, 1.0);\n")
+        if sphere:
+            main.append("    c.a *= coverage;\n")
+        if premultiply:
+            main.append("    FragColor = vec4(c.rgb * c.a, c.a);\n}")
+        else:
+            main.append("    FragColor = c;\n}")
+        lines.append("".join(main))
+        return "\n".join(lines) + "\n"
+
+
+class FusedShaderCache:
+    """
+    Singleton cache of fused programs keyed by stack *structure*
+    (layer shader, order, blend mode). Parameter edits only change uniforms.
+    """
+    _instance = None
+    MAX_PROGRAMS = 16
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(FusedShaderCache, cls).__new__(cls)
+            cls._instance._init()
+        return cls._instance
+
+    def _init(self):
+        self._builder = FusedShaderBuilder()
+        self._programs = OrderedDict()  # key -> FusedProgram or None (failed build)
+        self._direct_builder = DirectBlendBuilder()
+        self._direct = {}               # (fragment shader path, analytic, premultiply) -> program or None
+        self._max_units = None
+
+    @staticmethod
+    def structure_key(entries):
+        return tuple(entries)
+
+    def get(self, entries, analytic=False):
+        """Return a FusedProgram for the given entries, or None if the stack cannot be fused."""
+        key = (self.structure_key(entries), analytic)
+        if key in self._programs:
+            self._programs.move_to_end(key)
+            return self._programs[key]
+
+        fused = self._build(entries, analytic)
+        self._programs[key] = fused
+        while len(self._programs) > self.MAX_PROGRAMS:
+            _, old = self._programs.popitem(last=False)
+            if old:
+                from src.core.resource_manager import ResourceManager
+                ResourceManager().release_shader(old.program)
+        return fused
+
+    @staticmethod
+    def _vertex_source(analytic):
+        path = AnalyticSphere.VERTEX_SHADER if analytic else FusedShaderBuilder.VERTEX_SHADER
+        with open(get_resource_path(path), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def _build(self, entries, analytic):
+        from src.core.resource_manager import ResourceManager
+        if self._max_units is None:
+            self._max_units = int(glGetIntegerv(GL_MAX_TEXTURE_IMAGE_UNITS))
+        try:
+            frag, suffixes, units = self._builder.build(entries, self._max_units, analytic)
+            vert = self._vertex_source(analytic)
+        except (OSError, ValueError) as e:
+            print(f"FusedShaderCache: Falling back to multi-pass: {e}")
+            return None
+
+        program = ResourceManager().get_shader_from_source(vert, frag, label=f"fused x{len(entries)}")
+        if not program:
+            return None
+        return FusedProgram(program, suffixes, units)
+
+    def get_direct(self, fragment_shader, analytic=False):
+        """Program drawing `fragment_shader` with hardware-blend encoding (see DirectBlendBuilder), or None."""
+        return self._variant(fragment_shader, analytic, True)
+
+    def get_analytic(self, fragment_shader):
+        """Multi-pass program drawing `fragment_shader` on the full-screen quad (see AnalyticSphere), or None."""
+        return self._variant(fragment_shader, True, False)
+
+    def _variant(self, fragment_shader, analytic, premultiply):
+        from src.core.resource_manager import ResourceManager
+        key = (fragment_shader, analytic, premultiply)
+        if key not in self._direct:
+            program = None
+            kind = "direct" if premultiply else "analytic"
+            try:
+                frag = self._direct_builder.build(fragment_shader, analytic, premultiply)
+                vert = self._vertex_source(analytic)
+                program = ResourceManager().get_shader_from_source(vert, frag, label=f"{kind} {fragment_shader}")
+            except (OSError, ValueError) as e:
+                print(f"FusedShaderCache: No {kind} variant for {fragment_shader}: {e}")
+            self._direct[key] = program
+        return self._direct[key]
+
+    def clear(self):
+        from src.core.resource_manager import ResourceManager
+        for fused in self._programs.values():
+            if fused:
+                ResourceManager().release_shader(fused.program)
+        self._programs.clear()
+        for program in self._direct.values():
+            if program:
+                ResourceManager().release_shader(program)
+        self._direct.clear()
@@ -0,0 +1,69 @@
+"""
+Startup breakdown for `python -m src.main --profile-startup`.
+
+Phases are timed with phase() / mark(). The import hook times every first
+import of a module done with an import statement (cumulative: a module's time
+includes the modules it imports itself).
+"""
+import builtins
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = [] # (name, ms)
+        self.marks = [] # (name, ms since start)
+        self.imports = {} # module -> (cumulative ms, nesting depth)
+        self._original_import = None
+        self._depth = 0
+
+    def _ms(self, start):
+        return (time.perf_counter() - start) * 1000.0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, self._ms(start)))
+
+    def mark(self, name):
+        self.marks.append((name, self._ms(self.start)))
+
+    def install_import_hook(self):
+        if self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            start = time.perf_counter()
+            self._depth += 1
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._depth -= 1
+                self.imports.setdefault(name, (self._ms(start), self._depth))
+
+        builtins.__import__ = timed_import
+
+    def remove_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def report(self, top=15):
+        lines = ["Startup profile", f"{'phase':<32}{'ms':>10}"]
+        lines += [f"{name:<32}{ms:>10.1f}" for name, ms in self.phases]
+        lines.append("")
+        lines += [f"{name + ':':<32}{ms:>10.1f} ms" for name, ms in self.marks]
+        if self.imports:
+            lines += ["", f"Slowest imports (cumulative, top {top})", f"{'module':<40}{'depth':>6}{'ms':>10}"]
+            slowest = sorted(self.imports.items(), key=lambda item: -item[1][0])[:top]
+            lines += [f"{name:<40}{depth:>6}{ms:>10.1f}" for name, (ms, depth) in slowest]
+        return "\n".join(lines)
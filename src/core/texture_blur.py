@@ -0,0 +1,110 @@
+"""
+Gaussian blur of a texture into a new texture, so a blurred layer samples it
+once per fragment instead of running a kernel (ImageLayer).
+
+The two separable passes run at the mip level of the source where the blur is
+at most MAX_LEVEL_SIGMA texels wide: a few dozen taps per texel at any blur
+radius, and the result is only as large as its detail needs. Container
+objects (FBO, VAO) are temporary, so the texture can be made in any context
+of the share group.
+"""
+import math
+
+from OpenGL.GL import *
+
+from src.core.resource_manager import ResourceManager
+from src.core.texture_cache import texture_bytes
+
+MAX_LEVEL_SIGMA = 4.0
+
+
+def _new_texture(width, height):
+    texture_id = int(glGenTextures(1))
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    return texture_id
+
+
+def blur_level(width, height, sigma_uv):
+    """Mip level the blur runs at: the finest one where sigma is at most MAX_LEVEL_SIGMA texels"""
+    level = 0
+    while (width > 1 or height > 1) and sigma_uv * max(width, height) > MAX_LEVEL_SIGMA:
+        width, height = max(1, width // 2), max(1, height // 2)
+        level += 1
+    return level
+
+
+def blur_texture(source_id, sigma_uv):
+    """
+    Blurred copy of a mipmapped texture (GL context active). sigma_uv is the
+    Gaussian sigma in texture coordinates, the same on both axes.
+    Returns (texture id, bytes); the caller owns the texture.
+    """
+    rm = ResourceManager()
+    program = rm.get_shader("src/shaders/gaussian_blur.vert", "src/shaders/gaussian_blur.frag")
+    if not program:
+        return None, 0
+
+    glActiveTexture(GL_TEXTURE0)
+    previous_texture = glGetIntegerv(GL_TEXTURE_BINDING_2D)
+    glBindTexture(GL_TEXTURE_2D, source_id)
+    level = blur_level(glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_WIDTH),
+                       glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_HEIGHT), sigma_uv)
+    width = int(glGetTexLevelParameteriv(GL_TEXTURE_2D, level, GL_TEXTURE_WIDTH))
+    height = int(glGetTexLevelParameteriv(GL_TEXTURE_2D, level, GL_TEXTURE_HEIGHT))
+
+    # Drawn in the middle of a frame (Compositor -> layer.prepare): put the state back afterwards
+    previous_fbo = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+    previous_viewport = glGetIntegerv(GL_VIEWPORT)
+    previous_program = glGetIntegerv(GL_CURRENT_PROGRAM)
+    previous_vao = glGetIntegerv(GL_VERTEX_ARRAY_BINDING)
+    blend, depth_test = glIsEnabled(GL_BLEND), glIsEnabled(GL_DEPTH_TEST)
+
+    scratch = _new_texture(width, height)
+    result = _new_texture(width, height)
+    fbo = glGenFramebuffers(1)
+    vao = glGenVertexArrays(1)
+    try:
+        glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+        glViewport(0, 0, width, height)
+        glDisable(GL_BLEND)
+        glDisable(GL_DEPTH_TEST)
+        glUseProgram(program)
+        glBindVertexArray(vao)
+        rm.set_uniform(program, "uSource", 0)
+
+        passes = (
+            (scratch, source_id, level, (1.0 / width, 0.0), sigma_uv * width),
+            (result, scratch, 0, (0.0, 1.0 / height), sigma_uv * height),
+        )
+        for target, source, lod, direction, sigma in passes:
+            glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, target, 0)
+            glBindTexture(GL_TEXTURE_2D, source)
+            sigma = max(sigma, 1e-3)
+            rm.set_uniform(program, "uLevel", float(lod))
+            rm.set_uniform(program, "uDirection", direction)
+            rm.set_uniform(program, "uSigma", float(sigma))
+            rm.set_uniform(program, "uRadius", int(math.ceil(3.0 * sigma)))
+            glDrawArrays(GL_TRIANGLES, 0, 3)
+
+        glBindTexture(GL_TEXTURE_2D, result)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+        glGenerateMipmap(GL_TEXTURE_2D)
+    finally:
+        glBindFramebuffer(GL_FRAMEBUFFER, previous_fbo)
+        glDeleteFramebuffers(1, [fbo])
+        glBindVertexArray(previous_vao)
+        glDeleteVertexArrays(1, [vao])
+        glDeleteTextures([scratch])
+        glViewport(*previous_viewport)
+        glUseProgram(previous_program)
+        glBindTexture(GL_TEXTURE_2D, previous_texture)
+        if blend:
+            glEnable(GL_BLEND)
+        if depth_test:
+            glEnable(GL_DEPTH_TEST)
+    return result, texture_bytes(width, height)
@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from OpenGL.GL import glDeleteTextures
+
+
+def texture_bytes(width, height, bytes_per_pixel=4, mipmaps=True):
+    """GPU memory of a texture, including its mip chain down to 1x1"""
+    total = width * height * bytes_per_pixel
+    while mipmaps and (width > 1 or height > 1):
+        width, height = max(1, width // 2), max(1, height // 2)
+        total += width * height * bytes_per_pixel
+    return total
+
+
+class TextureEntry:
+    def __init__(self, texture_id, nbytes):
+        self.texture_id = texture_id
+        self.nbytes = nbytes
+
+
+class TextureCache:
+    """
+    Image textures with the GPU memory they take, looked up by file path.
+    Entries are stored under a key, the content hash of the image
+    (ResourceManager): paths with identical content share one texture.
+
+    Owners (image layers, the preview's normal map) hold references with
+    acquire()/release(). Referenced textures always stay; unreferenced ones
+    are kept for reuse (undoing an image swap, re-adding a layer) until the
+    cache exceeds its budget, then deleted least recently used first.
+
+    Deleting textures needs a GL context of the share group to be current:
+    add(), release(), set_budget() and clear() may evict. ResourceManager
+    calls it under its lock.
+    """
+    DEFAULT_BUDGET_MB = 1024
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries = OrderedDict() # key -> TextureEntry, least recently used first
+        self._keys = {} # path -> key
+        self._refs = {} # path -> owner count (also for textures still loading)
+        self.evictions = 0
+
+    def get(self, path):
+        """Texture id, or None if not cached. Marks it as recently used."""
+        key = self._keys.get(path)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry.texture_id
+
+    def link(self, path, key):
+        """Point a path at a key -> the texture id if one is cached under it"""
+        self._keys[path] = key
+        return self.get(path)
+
+    def key(self, path):
+        """Key a path is cached under (its content hash), or None"""
+        return self._keys.get(path)
+
+    def unlink(self, path):
+        """Forget which key a path has (its file changed); references are kept"""
+        self._keys.pop(path, None)
+
+    def add(self, path, texture_id, nbytes, key=None):
+        """Cache a texture for a path under `key` (default: the path itself)"""
+        key = path if key is None else key
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            glDeleteTextures([entry.texture_id])
+        self._keys[path] = key
+        self._entries[key] = TextureEntry(texture_id, nbytes)
+        self._evict()
+
+    def remove(self, path):
+        """Delete a path's texture now, referenced or not, also for other paths sharing it (references are kept)"""
+        entry = self._entries.pop(self._keys.get(path), None)
+        if entry is not None:
+            glDeleteTextures([entry.texture_id])
+
+    def acquire(self, path):
+        self._refs[path] = self._refs.get(path, 0) + 1
+
+    def release(self, path):
+        count = self._refs.get(path, 0) - 1
+        if count > 0:
+            self._refs[path] = count
+        else:
+            self._refs.pop(path, None)
+            self._evict()
+
+    def ref_count(self, path):
+        return self._refs.get(path, 0)
+
+    def set_budget(self, megabytes):
+        self.budget_bytes = int(megabytes * 1024 * 1024)
+        self._evict()
+
+    def _evict(self):
+        excess = self.memory_bytes() - self.budget_bytes
+        if excess <= 0:
+            return
+        referenced = self._referenced_keys()
+        for key in [k for k in self._entries if k not in referenced]:
+            entry = self._entries.pop(key)
+            glDeleteTextures([entry.texture_id])
+            excess -= entry.nbytes
+            self.evictions += 1
+            if excess <= 0:
+                break
+
+    def _referenced_keys(self):
+        return {self._keys[path] for path in self._refs if path in self._keys}
+
+    def memory_bytes(self):
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def stats(self):
+        """Occupancy: {"textures", "referenced", "bytes", "referenced_bytes", "budget_bytes", "evictions"}"""
+        keys = self._referenced_keys()
+        referenced = [e for k, e in self._entries.items() if k in keys]
+        return {
+            "textures": len(self._entries),
+            "referenced": len(referenced),
+            "bytes": self.memory_bytes(),
+            "referenced_bytes": sum(e.nbytes for e in referenced),
+            "budget_bytes": self.budget_bytes,
+            "evictions": self.evictions,
+        }
+
+    def __contains__(self, path):
+        return self._keys.get(path) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Delete every texture (references are kept)"""
+        for entry in self._entries.values():
+            glDeleteTextures([entry.texture_id])
+        self._entries.clear()
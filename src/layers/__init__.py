@@ -1,18 +1,12 @@
 from src.core.layer_registry import LayerRegistry
-from src.layers.base_layer import BaseLayer
-from src.layers.spot_light_layer import SpotLightLayer
-from src.layers.fresnel_layer import FresnelLayer
-from src.layers.noise_layer import NoiseLayer
-from src.layers.image_layer import ImageLayer
-from src.layers.adjustment_layer import AdjustmentLayer
 
 # Explicitly register layers here.
-# In a more advanced setup, this could be done via decorators or auto-discovery,
-# but explicit registration is safe and clear for now.
+# Registered by module: a layer module (and what it imports, e.g. PIL for
+# images) is only loaded when the type is first used, which keeps startup short.
 
-LayerRegistry.register(BaseLayer)
-LayerRegistry.register(SpotLightLayer)
-LayerRegistry.register(FresnelLayer)
-LayerRegistry.register(NoiseLayer)
-LayerRegistry.register(ImageLayer)
-LayerRegistry.register(AdjustmentLayer)
+LayerRegistry.register_lazy("BaseLayer", "src.layers.base_layer")
+LayerRegistry.register_lazy("SpotLightLayer", "src.layers.spot_light_layer")
+LayerRegistry.register_lazy("FresnelLayer", "src.layers.fresnel_layer")
+LayerRegistry.register_lazy("NoiseLayer", "src.layers.noise_layer")
+LayerRegistry.register_lazy("ImageLayer", "src.layers.image_layer")
+LayerRegistry.register_lazy("AdjustmentLayer", "src.layers.adjustment_layer")
@@ -1,9 +1,12 @@
 from src.layers.interface import LayerInterface
 from src.core.resource_manager import ResourceManager
-from OpenGL.GL import glUniform1f, glUniform1i, glGetUniformLocation
 import os
 
 class AdjustmentLayer(LayerInterface):
+    vertex_shader = "src/shaders/quad.vert"
+    fragment_shader = "src/shaders/layer_adjustment.frag"
+    input_sampler = "uTexture"
+
     def __init__(self):
         super().__init__()
         self.name = "Color Adjustment"
@@ -27,10 +30,7 @@ class AdjustmentLayer(LayerInterface):
         # vs = os.path.join(base_dir, "shaders", "quad.vert") # Shared quad vert
         # fs = os.path.join(base_dir, "shaders", "layer_adjustment.frag")
         
-        self.shader_program = ResourceManager().get_shader(
-            "src/shaders/quad.vert", 
-            "src/shaders/layer_adjustment.frag"
-        )
+        self.shader_program = ResourceManager().get_shader(self.vertex_shader, self.fragment_shader)
 
     def render(self):
         # Called by Engine.
@@ -38,13 +38,18 @@ class AdjustmentLayer(LayerInterface):
         if not self.shader_program:
             return
             
-        glUniform1f(glGetUniformLocation(self.shader_program, "uHue"), self.hue)
-        glUniform1f(glGetUniformLocation(self.shader_program, "uSaturation"), self.saturation)
-        glUniform1f(glGetUniformLocation(self.shader_program, "uBrightness"), self.brightness)
-        glUniform1f(glGetUniformLocation(self.shader_program, "uContrast"), self.contrast)
+        self.upload_uniforms(self.shader_program)
         
         # Engine handles texture binding (uTexture)
-        glUniform1i(glGetUniformLocation(self.shader_program, "uTexture"), 0)
+        ResourceManager().set_uniform(self.shader_program, "uTexture", 0)
+
+    def get_uniforms(self):
+        return {
+            "uHue": float(self.hue),
+            "uSaturation": float(self.saturation),
+            "uBrightness": float(self.brightness),
+            "uContrast": float(self.contrast),
+        }
 
     def to_dict(self):
         data = super().to_dict()
@@ -3,17 +3,16 @@ from OpenGL.GL import shaders
 import numpy as np
 import math
 from src.layers.interface import LayerInterface
+from src.core.frame_profiler import use_program
 
 class BaseLayer(LayerInterface):
+    fragment_shader = "src/shaders/layer_base.frag"
+
     def __init__(self):
         super().__init__()
         self.name = "Base Layer"
         self.base_color = [1.0, 0.0, 0.0] # Red default
         self.shader_program = None
-        self.VAO = None
-        self.VBO = None
-        self.EBO = None
-        self.index_count = 0
         
         # Properties
         self.preview_mode = "Standard" # "Standard", "With Normal Map"
@@ -33,7 +32,7 @@ class BaseLayer(LayerInterface):
     def initialize(self):
         # 1. Compile Shaders via ResourceManager
         from src.core.resource_manager import ResourceManager
-        self.shader_program = ResourceManager().get_shader("src/shaders/layer_base.vert", "src/shaders/layer_base.frag")
+        self.shader_program = ResourceManager().get_shader(self.vertex_shader, self.fragment_shader)
         
         if not self.shader_program:
             print("Failed to load BaseLayer shaders")
@@ -48,15 +47,13 @@ class BaseLayer(LayerInterface):
         if not self.shader_program or not self.enabled:
             return
 
-        glUseProgram(self.shader_program)
+        use_program(self.shader_program)
+        self.upload_uniforms(self.shader_program)
 
-        # Update Uniforms
-        loc = glGetUniformLocation(self.shader_program, "baseColor")
-        glUniform3f(loc, *self.base_color)
+        self.mesh.draw()
 
-        glBindVertexArray(self.VAO)
-        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+    def get_uniforms(self):
+        return {"baseColor": tuple(self.base_color)}
 
     def set_color(self, r, g, b):
         self.base_color = [r, g, b]
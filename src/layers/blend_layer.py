@@ -2,6 +2,7 @@ from OpenGL.GL import *
 from OpenGL.GL import shaders
 import numpy as np
 from src.layers.interface import LayerInterface
+from src.core.frame_profiler import count, use_program
 
 class BlendLayer(LayerInterface):
     def __init__(self):
@@ -66,10 +67,11 @@ class BlendLayer(LayerInterface):
         if not self.shader_program:
             return
             
-        glUseProgram(self.shader_program)
+        use_program(self.shader_program)
         glUniform4f(glGetUniformLocation(self.shader_program, "color"), *self.color)
         glUniform1f(glGetUniformLocation(self.shader_program, "scale"), 1.0)
         
         glBindVertexArray(self.VAO)
         glDrawArrays(GL_TRIANGLES, 0, 3)
+        count("draw_calls")
         glBindVertexArray(0)
@@ -2,15 +2,16 @@ from OpenGL.GL import *
 from OpenGL.GL import shaders
 import numpy as np
 from src.layers.interface import LayerInterface
+from src.core.frame_profiler import use_program
 
 class FresnelLayer(LayerInterface):
+    fragment_shader = "src/shaders/layer_fresnel.frag"
+
     def __init__(self):
         super().__init__()
         self.name = "Fresnel / Rim"
         self.blend_mode = "Add"
         self.shader_program = None
-        self.VAO = None
-        self.index_count = 0
         
         # Params
         self.color = [0.0, 1.0, 1.0] # Default Cyan to see effect clearly
@@ -24,7 +25,7 @@ class FresnelLayer(LayerInterface):
     def initialize(self):
         # Reuse base geometry logic (Sphere)
         from src.core.resource_manager import ResourceManager
-        self.shader_program = ResourceManager().get_shader("src/shaders/layer_base.vert", "src/shaders/layer_fresnel.frag")
+        self.shader_program = ResourceManager().get_shader(self.vertex_shader, self.fragment_shader)
 
 
         # Generate Geometry
@@ -42,6 +43,16 @@ class FresnelLayer(LayerInterface):
         glEnable(GL_CULL_FACE)
         glCullFace(GL_BACK)
         
+        use_program(self.shader_program)
+        self.upload_uniforms(self.shader_program)
+
+        self.mesh.draw()
+        
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glDepthFunc(GL_LESS)
+        glDepthMask(GL_TRUE)
+
+    def get_uniforms(self):
         # Calculate uniforms for Multiply mode if needed
         u_color = self.color
         u_intensity = self.intensity
@@ -53,19 +64,12 @@ class FresnelLayer(LayerInterface):
                  if self.intensity > 0:
                      u_color = [c / self.intensity for c in self.color]
 
-        glUseProgram(self.shader_program)
-        glUniform3f(glGetUniformLocation(self.shader_program, "color"), *u_color)
-        glUniform1f(glGetUniformLocation(self.shader_program, "intensity"), u_intensity)
-        glUniform1f(glGetUniformLocation(self.shader_program, "power"), self.power)
-        glUniform1f(glGetUniformLocation(self.shader_program, "bias"), self.bias)
-
-        glBindVertexArray(self.VAO)
-        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-        
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glDepthFunc(GL_LESS)
-        glDepthMask(GL_TRUE)
+        return {
+            "color": tuple(u_color),
+            "intensity": float(u_intensity),
+            "power": float(self.power),
+            "bias": float(self.bias),
+        }
 
 
 
@@ -1,10 +1,14 @@
 from OpenGL.GL import *
 from OpenGL.GL import shaders
 import numpy as np
-from PIL import Image
 from src.layers.interface import LayerInterface
+from src.core.frame_profiler import use_program
 
 class ImageLayer(LayerInterface):
+    fragment_shader = "src/shaders/layer_image.frag"
+    BLUR_STEPS = 64 # Blur values get one blurred texture per 1/64 step
+    BLUR_SIGMA = 0.01 # Gaussian sigma in UV units at blur 1.0
+
     def __init__(self):
         super().__init__()
         self.name = "Image Layer"
@@ -12,8 +16,6 @@ class ImageLayer(LayerInterface):
         self.opacity = 1.0 # Add explicit opacity (handled by base/blend func usually, but good to have)
         
         self.shader_program = None
-        self.VAO = None
-        self.index_count = 0
         self.texture_id = None
         
         # Params
@@ -28,12 +30,16 @@ class ImageLayer(LayerInterface):
         
         # Internal state
         self._texture_loaded_path = None # To track reloading necessity
+        self._texture_pending = False # Decoding in the background (ResourceManager.async_textures)
+        self._texture_ref_path = None # Image this layer holds a texture cache reference to
+        self._blur_key = None # Blurred copy of the image this layer holds (texture cache key)
+        self._blurred_id = None
         
     def initialize(self):
         # Vertex Shader
         # Vertex Shader (Load shared base shader with TBN support)
         from src.core.resource_manager import ResourceManager
-        self.shader_program = ResourceManager().get_shader("src/shaders/layer_base.vert", "src/shaders/layer_image.frag")
+        self.shader_program = ResourceManager().get_shader(self.vertex_shader, self.fragment_shader)
 
 
         # Geometry
@@ -48,6 +54,7 @@ class ImageLayer(LayerInterface):
             return
             
         try:
+            from PIL import Image
             # Get Aspect Ratio (Read only header)
             with Image.open(path) as img:
                 w, h = img.size
@@ -55,60 +62,114 @@ class ImageLayer(LayerInterface):
 
             # Get Texture ID from Manager
             from src.core.resource_manager import ResourceManager
-            self.texture_id = ResourceManager().get_texture(path)
+            rm = ResourceManager()
+            self.texture_id = rm.acquire_texture(path)
+            # Drop the previous image only now: reloading the same one must not evict it
+            if self._texture_ref_path:
+                rm.release_texture_ref(self._texture_ref_path)
+            self._texture_ref_path = path
+            self._texture_pending = self.texture_id is None and rm.is_loading(path)
             
             self.image_path = path
             self._texture_loaded_path = path
-            print(f"Texture loaded: {path}")
+            if not self._texture_pending:
+                print(f"Texture loaded: {path}")
             
         except Exception as e:
             print(f"Failed to load texture {path}: {e}")
 
-    def render(self):
-        if not self.shader_program or not self.enabled:
-            return
+    def release(self):
+        # The textures stay cached for reuse until the cache budget needs the memory
+        self._release_blur()
+        if self._texture_ref_path:
+            from src.core.resource_manager import ResourceManager
+            ResourceManager().release_texture_ref(self._texture_ref_path)
+        self._texture_ref_path = None
+        self._texture_loaded_path = None
+        self._texture_pending = False
+        self.texture_id = None
 
+    def prepare(self):
         # Check if we need to load/reload texture BEFORE checking texture_id
         if self.image_path and self.image_path != self._texture_loaded_path:
             self.load_texture(self.image_path)
-        
+        elif self._texture_pending:
+            # Skipped (not rendered) until the decoded image has been uploaded
+            from src.core.resource_manager import ResourceManager
+            rm = ResourceManager()
+            self.texture_id = rm.get_texture(self.image_path)
+            self._texture_pending = self.texture_id is None and rm.is_loading(self.image_path)
+        self._prepare_blur()
+        return bool(self.texture_id)
+
+    def _prepare_blur(self):
+        # Blurred once per image and quantised blur value, then sampled with a single tap
+        blur = round(self.blur * self.BLUR_STEPS) / self.BLUR_STEPS
+        if blur <= 0.0 or not self.texture_id:
+            self._release_blur()
+            return
+        from src.core.resource_manager import ResourceManager
+        rm = ResourceManager()
+        key = f"generated:blur/{rm.texture_key(self.image_path)}/{blur:g}"
+        if key == self._blur_key:
+            return
+        from src.core.texture_blur import blur_texture
+        source = self.texture_id
+        blurred_id = rm.acquire_generated_texture(key, lambda: blur_texture(source, blur * self.BLUR_SIGMA))
+        self._release_blur()
+        self._blur_key = key
+        self._blurred_id = blurred_id
+
+    def _release_blur(self):
+        if self._blur_key:
+            from src.core.resource_manager import ResourceManager
+            ResourceManager().release_generated_texture(self._blur_key)
+        self._blur_key = None
+        self._blurred_id = None
+
+    def render(self):
+        if not self.shader_program or not self.enabled:
+            return
+
         # Now check if texture exists
-        if not self.texture_id:
+        if not self.prepare():
             return
 
         self.setup_blend_func() 
         glDepthFunc(GL_LEQUAL)
         glDepthMask(GL_FALSE)
         
-        glUseProgram(self.shader_program)
-        
-        glActiveTexture(GL_TEXTURE0)
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        glUniform1i(glGetUniformLocation(self.shader_program, "imageTexture"), 0)
+        use_program(self.shader_program)
+        self.upload_uniforms(self.shader_program)
+
+        self.mesh.draw()
         
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glDepthFunc(GL_LESS)
+        glDepthMask(GL_TRUE)
+
+    def get_uniforms(self):
         if self.mapping_mode == "UV":
             mode_int = 0
         else:  # Planar
             mode_int = 1
-            
-        glUniform1i(glGetUniformLocation(self.shader_program, "mappingMode"), mode_int)
-        
-        glUniform1f(glGetUniformLocation(self.shader_program, "scale"), self.scale)
-        glUniform1f(glGetUniformLocation(self.shader_program, "rotation"), self.rotation)
-        glUniform2f(glGetUniformLocation(self.shader_program, "offset"), *self.offset)
-        glUniform1f(glGetUniformLocation(self.shader_program, "opacity"), self.opacity)
-        glUniform1f(glGetUniformLocation(self.shader_program, "blur"), self.blur)
-        
-        # Pass Aspect Ratio
-        glUniform1f(glGetUniformLocation(self.shader_program, "aspectRatio"), self.aspect_ratio)
 
-        glBindVertexArray(self.VAO)
-        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-        
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glDepthFunc(GL_LESS)
-        glDepthMask(GL_TRUE)
+        return {
+            "mappingMode": mode_int,
+            "scale": float(self.scale),
+            "rotation": float(self.rotation),
+            "offset": tuple(self.offset),
+            "opacity": float(self.opacity),
+            # Pass Aspect Ratio
+            "aspectRatio": float(self.aspect_ratio),
+        }
+
+    def get_textures(self):
+        return {"imageTexture": self._blurred_id or self.texture_id}
+
+    def get_texture_keys(self):
+        from src.core.resource_manager import ResourceManager
+        return {"imageTexture": self._blur_key or ResourceManager().texture_key(self.image_path)}
 
 
 
@@ -1,17 +1,81 @@
 class LayerInterface:
+    # Shader sources (relative to the project root). Also used by the fused render path.
+    vertex_shader = "src/shaders/layer_base.vert"
+    fragment_shader = None
+    # Sampler reading the accumulated image, for layers that filter the stack (e.g. Adjustment)
+    input_sampler = None
+
     def __init__(self):
         self.name = "Layer"
         self.enabled = True
         self.opacity = 1.0
         self.blend_mode = "Normal" # "Normal", "Add", "Multiply", "Screen"
+        # Bumped by mark_dirty(); forces the Compositor to redraw the layer
+        self._version = 0
+        # Shared geometry (None for screen-space layers)
+        self.mesh = None
 
     def initialize(self):
         """Called once when GL context is ready"""
         pass
+
+    def release(self):
+        """Free GL objects owned by this layer (GL context active). Shared caches are left alone."""
+        pass
+
+    def prepare(self):
+        """
+        Called before drawing (GL context active) to sync GPU resources with parameters.
+        Returns False if the layer has nothing to draw this frame.
+        """
+        return True
         
     def render(self):
         """Called every frame"""
         pass
+
+    def get_uniforms(self):
+        """Shader uniform values for the current parameters: {name: value}"""
+        return {}
+
+    def get_textures(self):
+        """Textures sampled by the layer shader: {sampler name: texture id}"""
+        return {}
+
+    def get_texture_keys(self):
+        """
+        What the textures of get_textures() show: {sampler name: key}. Compared by the
+        Compositor to reuse cached renders; GL texture ids are reused once deleted, so
+        layers sampling shared (ResourceManager) textures return their content keys.
+        """
+        return self.get_textures()
+
+    def upload_uniforms(self, program, suffix="", texture_units=None):
+        """
+        Set this layer's uniforms and bind its textures on `program`.
+        suffix/texture_units allow targeting a fused program, where every
+        layer's uniforms are renamed (e.g. "intensity_L3").
+        """
+        from src.core.frame_profiler import bind_texture
+        from src.core.resource_manager import ResourceManager
+        rm = ResourceManager()
+
+        for name, value in self.get_uniforms().items():
+            rm.set_uniform(program, name + suffix, value)
+
+        for unit, (name, tex_id) in enumerate(self.get_textures().items()):
+            if texture_units is not None:
+                unit = texture_units.get(name, unit)
+            bind_texture(unit, tex_id)
+            rm.set_uniform(program, name + suffix, unit)
+        
+    def mark_dirty(self):
+        """Redraw the layer on the next render even if its uniforms and textures look unchanged"""
+        self._version += 1
+
+    @property
+    def version(self):
+        return self._version
         
     def set_parameter(self, name, value):
         """Update a parameter"""
@@ -20,85 +84,51 @@ class LayerInterface:
     def _setup_geometry(self):
         """Default geometry setup (Sphere)"""
         from src.core.geometry import GeometryEngine
-        verts, inds = GeometryEngine.generate_sphere()
-        self.update_geometry(verts, inds)
+        self.set_mesh(GeometryEngine.get_mesh("Standard"))
 
-    def update_geometry(self, vertices, indices):
-        """Update the VAO/VBO with new geometry data"""
-        from OpenGL.GL import glGenVertexArrays, glGenBuffers, glBindVertexArray, glBindBuffer, glBufferData, glEnableVertexAttribArray, glVertexAttribPointer, GL_ARRAY_BUFFER, GL_ELEMENT_ARRAY_BUFFER, GL_STATIC_DRAW, GL_FLOAT, GL_FALSE, GL_UNSIGNED_INT
-        import numpy as np
-        import ctypes
-        
-        self.index_count = len(indices)
-        # print(f"Update Geometry: Count={self.index_count}")
-        
-        # Cleanup old if exists
-        # (Skipping delete for brevity/safety, usually fine for this tool scope, but ideally delete old buffers)
-        
-        self.VAO = glGenVertexArrays(1)
-        vbo = glGenBuffers(1)
-        ebo = glGenBuffers(1)
-        
-        glBindVertexArray(self.VAO)
-        
-        glBindBuffer(GL_ARRAY_BUFFER, vbo)
-        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
-        
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
-        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
-        
-        # Stride: 11 floats * 4 bytes
-        # [Px, Py, Pz, Nx, Ny, Nz, U, V, Tx, Ty, Tz]
-        stride = 11 * 4
-        
-        # 0: Pos (3)
-        glEnableVertexAttribArray(0)
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
-        
-        # 1: Norm (3)
-        glEnableVertexAttribArray(1)
-        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(3 * 4))
-        
-        # 2: UV (2)
-        glEnableVertexAttribArray(2)
-        glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(6 * 4))
-        
-        # 3: Tangent (3)
-        glEnableVertexAttribArray(3)
-        glVertexAttribPointer(3, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(8 * 4))
-        
-        glBindVertexArray(0)
+    def set_mesh(self, mesh):
+        """Draw with a shared Mesh (see GeometryEngine.get_mesh); the mesh is owned by the cache"""
+        self.mesh = mesh
 
     # Serialization is now handled by src.core.layer_serializer.LayerSerializer
     # to_dict and from_dict have been removed to adhere to SRP.
 
 
     def setup_blend_func(self):
-        from OpenGL.GL import glBlendFunc, GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_DST_COLOR, GL_ZERO, GL_ONE_MINUS_SRC_COLOR, GL_ONE_MINUS_SRC_ALPHA
+        """
+        Configure fixed-function blending for a layer drawn straight onto the
+        accumulated image. Returns True if the result matches blend.frag
+        (out = mix(b, Blend(b, f), a)) exactly, False if the mode needs the
+        shader composite pass.
+        """
+        from OpenGL.GL import glBlendFuncSeparate, GL_ONE, GL_DST_COLOR, GL_ONE_MINUS_SRC_COLOR, GL_ONE_MINUS_SRC_ALPHA
         
         # Assumption: Shaders output Pre-multiplied Alpha
-        # RGB = Color * Alpha * Intensity
-        # A = Alpha (Coverage)
+        # RGB = Color * Alpha
+        # A = Alpha (Coverage), composited as a + dstA * (1 - a) in every mode
         
         if self.blend_mode == "Normal":
             # Normal: Src + Dst*(1-A)
-            glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
-            
-        elif self.blend_mode == "Add":
-            # Add: Src + Dst
-            glBlendFunc(GL_ONE, GL_ONE)
+            glBlendFuncSeparate(GL_ONE, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+            return True
             
         elif self.blend_mode == "Multiply":
-            # Multiply: Dst * (SrcRGB + 1 - A)
-            # Derivation: Dst * SrcRGB + Dst * (1 - A)
-            # = (Dst * SrcRGB) + (Dst * (1 - SrcAlpha))
-            # Requires SrcRGB to be effectively the "tint" factor weighted by alpha
-            glBlendFunc(GL_DST_COLOR, GL_ONE_MINUS_SRC_ALPHA) 
+            # Multiply: mix(Dst, Dst * F, A) = Dst * (F * A) + Dst * (1 - A)
+            glBlendFuncSeparate(GL_DST_COLOR, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+            return True
             
         elif self.blend_mode == "Screen":
-            # Screen: Src + Dst * (1 - Src)
-            glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_COLOR)
+            # Screen: mix(Dst, 1 - (1 - Dst)(1 - F), A) = Src + Dst * (1 - Src)
+            glBlendFuncSeparate(GL_ONE, GL_ONE_MINUS_SRC_COLOR, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+            return True
+            
+        elif self.blend_mode == "Add":
+            # Add: Src + Dst. Not exact: blend.frag saturates inside the mix,
+            # Dst + A * min(F, 1 - Dst), while hardware clamps Dst + A * F.
+            glBlendFuncSeparate(GL_ONE, GL_ONE, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+            return False
             
         else:
             # Fallback (Treat as Normal / Pre-multiplied)
-            glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+            glBlendFuncSeparate(GL_ONE, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+            return False
@@ -2,73 +2,118 @@ from OpenGL.GL import *
 from OpenGL.GL import shaders
 import numpy as np
 from src.layers.interface import LayerInterface
+from src.core.frame_profiler import use_program
 
 class NoiseLayer(LayerInterface):
+    fragment_shader = "src/shaders/layer_noise.frag"
+    # Evaluated in layer_noise.frag; "Baked" samples a white-noise texture computed on the CPU
+    NOISE_TYPES = ["Value", "Simplex", "fBm", "Worley", "Baked"]
+    BAKED_SIZE = 256
+
     def __init__(self):
         super().__init__()
         self.name = "Noise"
         self.blend_mode = "Multiply" # Default to Multiply (supported)
         self.shader_program = None
-        self.VAO = None
-        self.index_count = 0
         self.texture_id = None
         
         # Params
+        self.noise_type = "fBm"
         self.scale = 1.0
         self.intensity = 1.0
         self.seed = 0
+        self.octaves = 4 # fBm only
         self.color = [0.0, 0.0, 0.0] # Default Black for Multiply
 
+        # Internal state
+        self._baked_key = None # Texture cache key of the baked texture this layer holds
+
     def initialize(self):
         # Vertex Shader
         from src.core.resource_manager import ResourceManager
-        self.shader_program = ResourceManager().get_shader("src/shaders/layer_base.vert", "src/shaders/layer_noise.frag")
+        self.shader_program = ResourceManager().get_shader(self.vertex_shader, self.fragment_shader)
 
 
         self._setup_geometry()
-        self._generate_noise_texture()
+
+    def release(self):
+        # Baked textures stay cached (per seed) until the cache budget needs the memory
+        self._release_baked()
+
+    def prepare(self):
+        # Only the baked type has a texture; changing the seed of the others is a uniform update
+        if self.noise_type == "Baked":
+            key = f"generated:noise/{self.seed}/{self.BAKED_SIZE}/white"
+            if key != self._baked_key:
+                from src.core.resource_manager import ResourceManager
+                texture_id = ResourceManager().acquire_generated_texture(key, self._bake_noise_texture)
+                self._release_baked()
+                self._baked_key = key
+                self.texture_id = texture_id
+        elif self._baked_key:
+            self._release_baked()
+        return True
 
     def render(self):
         if not self.shader_program or not self.enabled:
             return
 
+        self.prepare()
         self.setup_blend_func()
         glDepthFunc(GL_LEQUAL)
         glDepthMask(GL_FALSE)
         
-        glUseProgram(self.shader_program)
-        
-        glActiveTexture(GL_TEXTURE0)
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
-        glUniform1i(glGetUniformLocation(self.shader_program, "noiseTexture"), 0)
-        
-        glUniform1f(glGetUniformLocation(self.shader_program, "scale"), self.scale)
-        glUniform1f(glGetUniformLocation(self.shader_program, "intensity"), self.intensity)
-        glUniform3f(glGetUniformLocation(self.shader_program, "color"), *self.color)
+        use_program(self.shader_program)
+        self.upload_uniforms(self.shader_program)
 
-        glBindVertexArray(self.VAO)
-        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
+        self.mesh.draw()
         
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
         glDepthFunc(GL_LESS)
         glDepthMask(GL_TRUE)
         
+    def get_uniforms(self):
+        try:
+            type_int = self.NOISE_TYPES.index(self.noise_type)
+        except ValueError:
+            type_int = 0
+        return {
+            "noiseType": type_int,
+            "seed": int(self.seed),
+            "octaves": int(self.octaves),
+            "scale": float(self.scale),
+            "intensity": float(self.intensity),
+            "color": tuple(self.color),
+        }
+
+    def get_textures(self):
+        # Unit 0 when nothing is baked: the sampler is declared but not read
+        return {"noiseTexture": self.texture_id or 0}
+
+    def get_texture_keys(self):
+        return {"noiseTexture": self._baked_key}
+        
     def regenerate(self):
-        self._generate_noise_texture()
+        """Parameters changed: the baked texture (if any) follows the seed on the next prepare()"""
+        self.mark_dirty()
+
+    def _release_baked(self):
+        if self._baked_key:
+            from src.core.resource_manager import ResourceManager
+            ResourceManager().release_generated_texture(self._baked_key)
+        self._baked_key = None
+        self.texture_id = None
 
-    def _generate_noise_texture(self):
-        # Generate simple white noise for now
-        width, height = 256, 256
+    def _bake_noise_texture(self):
+        """White noise for the current seed -> (texture id, bytes); cached by ResourceManager"""
+        from src.core.texture_cache import texture_bytes
+        width = height = self.BAKED_SIZE
         rng = np.random.default_rng(self.seed)
         noise_data = rng.random((height, width), dtype=np.float32)
         noise_data = (noise_data * 255).astype(np.uint8)
-        
-        if self.texture_id:
-            glDeleteTextures([self.texture_id])
             
-        self.texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
         # GL_LUMINANCE is deprecated in core, use GL_RED
         glTexImage2D(GL_TEXTURE_2D, 0, GL_RED, width, height, 0, GL_RED, GL_UNSIGNED_BYTE, noise_data)
         glGenerateMipmap(GL_TEXTURE_2D)
@@ -77,7 +122,5 @@ class NoiseLayer(LayerInterface):
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-
-
-
-
+        glBindTexture(GL_TEXTURE_2D, 0)
+        return texture_id, texture_bytes(width, height, bytes_per_pixel=1)
@@ -2,15 +2,16 @@ from OpenGL.GL import *
 from OpenGL.GL import shaders
 import numpy as np
 from src.layers.interface import LayerInterface
+from src.core.frame_profiler import use_program
 
 class SpotLightLayer(LayerInterface):
+    fragment_shader = "src/shaders/layer_spot.frag"
+
     def __init__(self):
         super().__init__()
         self.name = "Spot Light"
         self.blend_mode = "Add"
         self.shader_program = None
-        self.VAO = None
-        self.index_count = 0
         
         # Params
         self.direction = [0.0, 0.0, 1.0] 
@@ -26,7 +27,7 @@ class SpotLightLayer(LayerInterface):
 
     def initialize(self):
         from src.core.resource_manager import ResourceManager
-        self.shader_program = ResourceManager().get_shader("src/shaders/layer_base.vert", "src/shaders/layer_spot.frag")
+        self.shader_program = ResourceManager().get_shader(self.vertex_shader, self.fragment_shader)
 
 
         # Generate Geometry
@@ -40,6 +41,16 @@ class SpotLightLayer(LayerInterface):
         glDepthFunc(GL_LEQUAL)
         glDepthMask(GL_FALSE)
         
+        use_program(self.shader_program)
+        self.upload_uniforms(self.shader_program)
+
+        self.mesh.draw()
+        
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glDepthFunc(GL_LESS)
+        glDepthMask(GL_TRUE)
+
+    def get_uniforms(self):
         # Determine uniforms based on blend mode
         u_color = self.color
         u_intensity = self.intensity
@@ -52,26 +63,17 @@ class SpotLightLayer(LayerInterface):
             else:
                 if self.intensity > 0:
                     u_color = [c / self.intensity for c in self.color]
-        
-        glUseProgram(self.shader_program)
-        glUniform3f(glGetUniformLocation(self.shader_program, "lightDir"), *self.direction)
-        glUniform3f(glGetUniformLocation(self.shader_program, "lightColor"), *u_color)
-        glUniform1f(glGetUniformLocation(self.shader_program, "intensity"), u_intensity)
-        glUniform1f(glGetUniformLocation(self.shader_program, "range"), self.range)
-        glUniform1f(glGetUniformLocation(self.shader_program, "blur"), self.blur)
-        
-        # New Params
-        glUniform1f(glGetUniformLocation(self.shader_program, "scaleX"), self.scale_x)
-        glUniform1f(glGetUniformLocation(self.shader_program, "scaleY"), self.scale_y)
-        glUniform1f(glGetUniformLocation(self.shader_program, "rotation"), self.rotation)
 
-        glBindVertexArray(self.VAO)
-        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
-        glBindVertexArray(0)
-        
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        glDepthFunc(GL_LESS)
-        glDepthMask(GL_TRUE)
+        return {
+            "lightDir": tuple(self.direction),
+            "lightColor": tuple(u_color),
+            "intensity": float(u_intensity),
+            "range": float(self.range),
+            "blur": float(self.blur),
+            "scaleX": float(self.scale_x),
+            "scaleY": float(self.scale_y),
+            "rotation": float(self.rotation),
+        }
 
 
 
@@ -1,11 +1,12 @@
 import sys
 import os
-from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QSurfaceFormat, QIcon
-from src.ui.main_window import MainWindow
-from src.ui.theme import apply_app_theme
-from src.core.utils import get_resource_path
-import src.layers # Register layers
+from contextlib import nullcontext
+
+# Heavy modules (Qt widgets, the main window and what it pulls in) are imported
+# in main(), so --profile-startup can time them.
+
+# --profile-startup: wait at most this long for the first frame before reporting
+FIRST_FRAME_TIMEOUT_MS = 10000
 
 
 # Global Exception Hook to capture silent crashes in Noconsole mode
@@ -39,8 +40,22 @@ def setup_exception_hook():
 
 def main():
     setup_exception_hook() # Enable logging
+    profiler = None
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        from src.core.startup_profiler import StartupProfiler
+        profiler = StartupProfiler()
+        profiler.install_import_hook()
+    phase = profiler.phase if profiler else (lambda name: nullcontext())
+
     try:
         print("Initializing Application...")
+        with phase("import Qt"):
+            from PySide6.QtWidgets import QApplication
+            from PySide6.QtGui import QSurfaceFormat, QIcon
+            from PySide6.QtCore import QTimer
+            from src.core.utils import get_resource_path
+
         # High DPI scaling
         os.environ["QT_API"] = "pyside6"
         os.environ["QT_FONT_DPI"] = "96" 
@@ -51,7 +66,8 @@ def main():
         fmt.setProfile(QSurfaceFormat.CoreProfile)
         QSurfaceFormat.setDefaultFormat(fmt)
 
-        app = QApplication(sys.argv)
+        with phase("QApplication"):
+            app = QApplication(sys.argv)
         
         # Set Icon
         icon_path = get_resource_path("res/icon/icon.ico")
@@ -61,13 +77,43 @@ def main():
             print(f"Warning: Icon not found at {icon_path}")
 
         print("QApplication created.")
-        
-        # Apply Theme
-        apply_app_theme(app)
+
+        with phase("import main window"):
+            from src.ui.main_window import MainWindow
+            from src.ui.theme import apply_app_theme
+        with phase("register layers"):
+            import src.layers # Register layers (classes are imported on first use)
         
         # Create Main Window
-        window = MainWindow()
-        window.show()
+        with phase("create main window"):
+            window = MainWindow()
+        with phase("show window"):
+            window.show()
+            app.processEvents()
+        if profiler:
+            profiler.mark("time to window")
+        
+        # Apply Theme once the window is up (qt_material loads and restyles every widget)
+        def apply_theme():
+            with phase("theme (deferred)"):
+                apply_app_theme(app)
+        QTimer.singleShot(0, apply_theme)
+
+        if profiler:
+            def report(first_frame=True):
+                if first_frame:
+                    profiler.mark("time to first frame")
+                else:
+                    print("No first frame (no GL context for the preview, or timed out)")
+                profiler.remove_import_hook()
+                print(profiler.report())
+                app.quit()
+            # After the deferred theme (queued first)
+            window.preview.first_frame.connect(lambda: QTimer.singleShot(0, report))
+            if window.preview.isValid():
+                QTimer.singleShot(FIRST_FRAME_TIMEOUT_MS, lambda: report(False))
+            else:
+                QTimer.singleShot(0, lambda: report(False))
         
         print("Window shown. Entering event loop.")
         sys.exit(app.exec())
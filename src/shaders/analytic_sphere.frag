@@ -0,0 +1,61 @@
+#version 330 core
+// Analytic sphere surface, spliced into layer shaders by AnalyticSphere (shader_builder.py).
+// Reconstructs exactly what layer_base.vert interpolates over the GeometryEngine
+// UV sphere: position, normal, UV and TBN, for the visible (z < 0) hemisphere.
+in vec2 ClipPos;
+
+// Per-frame globals shared by all layer shaders (std140, binding 0, uploaded once per frame by the Compositor)
+layout(std140) uniform FrameGlobals {
+    vec3 uScale;          // Aspect Ratio Scaling
+    float normalStrength;
+    vec2 normalOffset;
+    float normalScale;
+    int previewMode;      // 0=Standard, 1=Comparison
+    bool useNormalMap;
+};
+
+// Returns the fraction of the pixel covered by the sphere silhouette (0 = outside)
+float sphereSurface(out vec3 fragPos, out vec3 normal, out vec2 texCoords, out mat3 tbn)
+{
+    float pi = 3.14159265359;
+
+    // Undo the aspect scaling of layer_base.vert: clip space -> object space
+    vec2 p = ClipPos / uScale.xy;
+
+    // GeometryEngine layout: unit sphere at the origin, or two r=0.45 spheres at x=-0.5 / +0.5
+    float centerX = 0.0;
+    float radius = 1.0;
+    if (previewMode == 1) {
+        centerX = p.x < 0.0 ? -0.5 : 0.5;
+        radius = 0.45;
+    }
+
+    vec2 d = (p - vec2(centerX, 0.0)) / radius;
+    float dist = length(d);
+
+    // Pixels are square in object space, so one screen step in x is the pixel size
+    float pixel = max(abs(dFdx(p.x)) / radius, 1e-6);
+    float coverage = clamp(0.5 - (dist - 1.0) / pixel, 0.0, 1.0);
+
+    // Rim pixels whose center lies outside take the silhouette point
+    if (dist > 1.0) {
+        d /= dist;
+    }
+    vec3 n = vec3(d, -sqrt(max(0.0, 1.0 - dot(d, d))));
+
+    // Mesh parametrisation: n = (sin(lat)cos(lon), cos(lat), sin(lat)sin(lon)), uv = (lon / 2pi, lat / pi)
+    float lat = acos(clamp(n.y, -1.0, 1.0));
+    float lon = atan(n.z, n.x);
+    if (lon <= 0.0) {
+        lon += 2.0 * pi; // Front hemisphere spans lon in [pi, 2pi]
+    }
+
+    fragPos = vec3(centerX + n.x * radius, n.y * radius, n.z * radius);
+    normal = n;
+    texCoords = vec2(lon / (2.0 * pi), lat / pi);
+
+    // Tangent along +u, already orthogonal to the normal
+    vec3 t = vec3(-sin(lon), 0.0, cos(lon));
+    tbn = mat3(t, cross(n, t), n);
+    return coverage;
+}
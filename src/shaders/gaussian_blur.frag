@@ -0,0 +1,24 @@
+#version 330 core
+// One axis of a separable Gaussian blur (src.core.texture_blur).
+// uSource is read at mip level uLevel, whose size matches the target.
+out vec4 FragColor;
+in vec2 TexCoords;
+
+uniform sampler2D uSource;
+uniform float uLevel;
+uniform vec2 uDirection; // One target texel along the blur axis (UV)
+uniform float uSigma;    // Target texels
+uniform int uRadius;     // Taps on each side of the center
+
+void main()
+{
+    vec4 sum = textureLod(uSource, TexCoords, uLevel);
+    float total = 1.0;
+    for (int i = 1; i <= uRadius; ++i) {
+        float weight = exp(-0.5 * float(i * i) / (uSigma * uSigma));
+        vec2 offset = uDirection * float(i);
+        sum += (textureLod(uSource, TexCoords + offset, uLevel) + textureLod(uSource, TexCoords - offset, uLevel)) * weight;
+        total += 2.0 * weight;
+    }
+    FragColor = sum / total;
+}
@@ -0,0 +1,10 @@
+#version 330 core
+// Full-screen triangle from gl_VertexID: no vertex buffers, any VAO can be bound
+out vec2 TexCoords;
+
+void main()
+{
+    vec2 pos = vec2((gl_VertexID << 1) & 2, gl_VertexID & 2);
+    TexCoords = pos;
+    gl_Position = vec4(pos * 2.0 - 1.0, 0.0, 1.0);
+}
@@ -0,0 +1,12 @@
+#version 330 core
+// Analytic geometry mode: layers are drawn as the Compositor's full-screen quad
+// and the sphere is reconstructed per pixel (see analytic_sphere.frag).
+layout (location = 0) in vec2 aPos;
+
+out vec2 ClipPos;
+
+void main()
+{
+    ClipPos = aPos;
+    gl_Position = vec4(aPos, 0.0, 1.0);
+}
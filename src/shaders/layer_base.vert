@@ -10,7 +10,16 @@ out mat3 TBN;
 out vec3 Normal; // Fallback
 
 uniform float previewRotation;
-uniform vec3 uScale; // Aspect Ratio Scaling
+
+// Per-frame globals shared by all layer shaders (std140, binding 0, uploaded once per frame by the Compositor)
+layout(std140) uniform FrameGlobals {
+    vec3 uScale;          // Aspect Ratio Scaling
+    float normalStrength;
+    vec2 normalOffset;
+    float normalScale;
+    int previewMode;      // 0=Standard, 1=Comparison
+    bool useNormalMap;
+};
 
 void main()
 {
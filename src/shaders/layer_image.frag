@@ -12,15 +12,18 @@ uniform float rotation;
 uniform vec2 offset;
 uniform float opacity;
 uniform float aspectRatio; // Image Aspect Ratio (w/h)
-uniform float blur;
 
-uniform int previewMode; // 0=Standard, 1=Comparison
-
-uniform bool useNormalMap;
 uniform sampler2D normalMap;
-uniform float normalStrength;
-uniform float normalScale;
-uniform vec2 normalOffset;
+
+// Per-frame globals shared by all layer shaders (std140, binding 0, uploaded once per frame by the Compositor)
+layout(std140) uniform FrameGlobals {
+    vec3 uScale;          // Aspect Ratio Scaling
+    float normalStrength;
+    vec2 normalOffset;
+    float normalScale;
+    int previewMode;      // 0=Standard, 1=Comparison
+    bool useNormalMap;
+};
 
 #define PI 3.14159265359
 
@@ -168,31 +171,8 @@ void main()
     // 4. Sample & Output
     // ---------------------------------------------------------
     
-    vec4 texColor = vec4(0.0);
-    
-    // Simple Blur Implementation
-    if (blur <= 0.001) {
-        texColor = texture(imageTexture, uv);
-    } else {
-        // 5x5 Kernel for smoother blur (25 taps)
-        // Or 3x3 (9 taps) is faster but blocky for large blur.
-        // Let's try 5x5 with step 1.0
-        
-        float totalWeight = 0.0;
-        float radius = blur * 0.02; // Max radius ~2% of texture size
-        
-        for (float x = -2.0; x <= 2.0; x += 1.0) {
-            for (float y = -2.0; y <= 2.0; y += 1.0) {
-                vec2 offset = vec2(x, y) * radius * 0.5; // *0.5 to keep range similar
-                float dist = length(vec2(x, y));
-                float weight = exp(-(dist * dist) / 2.0); // Gaussian-like weight
-                
-                texColor += texture(imageTexture, uv + offset) * weight;
-                totalWeight += weight;
-            }
-        }
-        texColor /= totalWeight;
-    }
+    // Blur is pre-filtered: ImageLayer binds a blurred copy of the image (src.core.texture_blur)
+    vec4 texColor = texture(imageTexture, uv);
     
     // Check Bounds for Planar? (Clamp to border?)
     // GL_REPEAT is set in load_texture, so it repeats.
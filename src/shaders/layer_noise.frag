@@ -8,20 +8,30 @@ in mat3 TBN;
 in vec3 FragPos; 
 
 // --- Uniforms ---
+uniform int noiseType;    // 0=Value, 1=Simplex, 2=fBm, 3=Worley, 4=Baked (noiseTexture)
+uniform int seed;
+uniform int octaves;      // fBm only
 uniform sampler2D noiseTexture;
 uniform float scale;
 uniform float intensity;
 uniform vec3 color;
 
 // Normal Map Uniforms
-uniform bool useNormalMap;
 uniform sampler2D normalMap;
-uniform float normalStrength;
-uniform float normalScale;
-uniform vec2 normalOffset;
 
-// Preview State
-uniform int previewMode; // 0=Standard, 1=Comparison
+// Per-frame globals shared by all layer shaders (std140, binding 0, uploaded once per frame by the Compositor)
+layout(std140) uniform FrameGlobals {
+    vec3 uScale;          // Aspect Ratio Scaling
+    float normalStrength;
+    vec2 normalOffset;
+    float normalScale;
+    int previewMode;      // 0=Standard, 1=Comparison
+    bool useNormalMap;
+};
+
+// Cells per unit of object space at scale 1 (about the grain of the baked 256px texture)
+#define NOISE_FREQUENCY 40.0
+#define NOISE_MAX_OCTAVES 8
 
 // --- Functions ---
 vec3 getMappedNormal() {
@@ -35,9 +45,98 @@ vec3 getMappedNormal() {
     return vec3(0.0, 0.0, 1.0);
 }
 
+// Integer hash (pcg3d): same pattern on every GPU, no sin() precision issues
+uvec3 pcg3d(uvec3 v) {
+    v = v * 1664525u + 1013904223u;
+    v.x += v.y * v.z; v.y += v.z * v.x; v.z += v.x * v.y;
+    v ^= v >> 16u;
+    v.x += v.y * v.z; v.y += v.z * v.x; v.z += v.x * v.y;
+    return v;
+}
+
+// Three random values in [0, 1] for a lattice cell
+vec3 hash3(vec3 cell) {
+    uvec3 s = uvec3(uint(seed)) * uvec3(0x9E3779B9u, 0x85EBCA6Bu, 0xC2B2AE35u);
+    return vec3(pcg3d(uvec3(ivec3(cell)) ^ s)) * (1.0 / 4294967295.0);
+}
+
+float valueNoise(vec3 p) {
+    vec3 i = floor(p);
+    vec3 f = fract(p);
+    f = f * f * (3.0 - 2.0 * f);
+    float v000 = hash3(i).x;
+    float v100 = hash3(i + vec3(1.0, 0.0, 0.0)).x;
+    float v010 = hash3(i + vec3(0.0, 1.0, 0.0)).x;
+    float v110 = hash3(i + vec3(1.0, 1.0, 0.0)).x;
+    float v001 = hash3(i + vec3(0.0, 0.0, 1.0)).x;
+    float v101 = hash3(i + vec3(1.0, 0.0, 1.0)).x;
+    float v011 = hash3(i + vec3(0.0, 1.0, 1.0)).x;
+    float v111 = hash3(i + vec3(1.0, 1.0, 1.0)).x;
+    return mix(mix(mix(v000, v100, f.x), mix(v010, v110, f.x), f.y),
+               mix(mix(v001, v101, f.x), mix(v011, v111, f.x), f.y), f.z);
+}
+
+vec3 simplexGradient(vec3 cell) {
+    return normalize(hash3(cell) * 2.0 - 1.0 + 1e-4);
+}
+
+// 3D simplex noise in [0, 1]
+float simplexNoise(vec3 p) {
+    // Skew to the simplex lattice (F3 = 1/3, G3 = 1/6)
+    vec3 s = floor(p + dot(p, vec3(1.0 / 3.0)));
+    vec3 x0 = p - s + dot(s, vec3(1.0 / 6.0));
+
+    vec3 e = step(vec3(0.0), x0 - x0.yzx);
+    vec3 i1 = e * (1.0 - e.zxy);
+    vec3 i2 = 1.0 - e.zxy * (1.0 - e);
+
+    vec3 x1 = x0 - i1 + 1.0 / 6.0;
+    vec3 x2 = x0 - i2 + 2.0 / 6.0;
+    vec3 x3 = x0 - 1.0 + 3.0 / 6.0;
+
+    vec4 w = max(0.6 - vec4(dot(x0, x0), dot(x1, x1), dot(x2, x2), dot(x3, x3)), 0.0);
+    vec4 d = vec4(dot(simplexGradient(s), x0), dot(simplexGradient(s + i1), x1),
+                  dot(simplexGradient(s + i2), x2), dot(simplexGradient(s + 1.0), x3));
+    w *= w;
+    w *= w;
+    return clamp(dot(d * w, vec4(52.0)) * 0.5 + 0.5, 0.0, 1.0);
+}
+
+float fbmNoise(vec3 p) {
+    float sum = 0.0;
+    float amplitude = 0.5;
+    float total = 0.0;
+    for (int i = 0; i < NOISE_MAX_OCTAVES; i++) {
+        if (i >= octaves) break;
+        sum += simplexNoise(p) * amplitude;
+        total += amplitude;
+        p = p * 2.0 + vec3(17.0, 31.0, 47.0); // Offset: octaves do not line up at the origin
+        amplitude *= 0.5;
+    }
+    return total > 0.0 ? sum / total : 0.0;
+}
+
+// Distance to the nearest feature point (F1), 0 at the points
+float worleyNoise(vec3 p) {
+    vec3 i = floor(p);
+    vec3 f = fract(p);
+    float nearest = 1.0;
+    for (int z = -1; z <= 1; z++) {
+        for (int y = -1; y <= 1; y++) {
+            for (int x = -1; x <= 1; x++) {
+                vec3 offset = vec3(float(x), float(y), float(z));
+                vec3 r = offset + hash3(i + offset) - f;
+                nearest = min(nearest, dot(r, r));
+            }
+        }
+    }
+    return sqrt(nearest);
+}
+
 void main()
 {
     vec2 uv = TexCoords;
+    vec3 p = FragPos;
     
     // Apply Normal Map Distortion ONLY if:
     // 1. We have a specific Normal Map
@@ -46,12 +145,25 @@ void main()
     if (useNormalMap && previewMode == 1 && FragPos.x > 0.0) {
         vec3 mappedNormal = getMappedNormal();
         uv -= mappedNormal.xy * 0.1; 
+        // Same shift in object space (0.1 UV ~ 0.6 units around a unit sphere)
+        p -= TBN * vec3(mappedNormal.xy * 0.6, 0.0);
     }
 
-    uv = uv * scale;
+    // Procedural types are evaluated on the 3D surface position: no UV seam or pole pinching
+    p *= scale * NOISE_FREQUENCY;
     
-    vec4 texColor = texture(noiseTexture, uv);
-    float noiseVal = texColor.r; 
+    float noiseVal;
+    if (noiseType == 0) {
+        noiseVal = valueNoise(p);
+    } else if (noiseType == 1) {
+        noiseVal = simplexNoise(p);
+    } else if (noiseType == 2) {
+        noiseVal = fbmNoise(p);
+    } else if (noiseType == 3) {
+        noiseVal = worleyNoise(p);
+    } else {
+        noiseVal = texture(noiseTexture, uv * scale).r;
+    }
     
     vec3 target = color;
     vec3 white = vec3(1.0);
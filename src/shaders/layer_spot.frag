@@ -16,11 +16,17 @@ uniform float scaleX;
 uniform float scaleY;
 uniform float rotation;
 
-uniform bool useNormalMap;
 uniform sampler2D normalMap;
-uniform float normalStrength;
-uniform float normalScale;
-uniform vec2 normalOffset;
+
+// Per-frame globals shared by all layer shaders (std140, binding 0, uploaded once per frame by the Compositor)
+layout(std140) uniform FrameGlobals {
+    vec3 uScale;          // Aspect Ratio Scaling
+    float normalStrength;
+    vec2 normalOffset;
+    float normalScale;
+    int previewMode;      // 0=Standard, 1=Comparison
+    bool useNormalMap;
+};
 
 vec3 getNormal() {
     if (useNormalMap && FragPos.x > 0.0) {
@@ -0,0 +1,21 @@
+#version 330 core
+// Edge padding, last pass: copy the nearest opaque pixel within uPadding px,
+// opaque black beyond. Output is straight alpha (the input is premultiplied).
+out vec4 FragColor;
+
+uniform sampler2D uColor;
+uniform sampler2D uSeeds;
+uniform float uPadding;
+
+void main()
+{
+    ivec2 p = ivec2(gl_FragCoord.xy);
+    vec2 seed = texelFetch(uSeeds, p, 0).xy;
+    vec2 d = seed - vec2(p);
+    if (seed.x < 0.0 || dot(d, d) > uPadding * uPadding) {
+        FragColor = vec4(0.0, 0.0, 0.0, 1.0);
+        return;
+    }
+    vec4 c = texelFetch(uColor, ivec2(seed), 0);
+    FragColor = vec4(min(c.rgb / c.a, vec3(1.0)), c.a);
+}
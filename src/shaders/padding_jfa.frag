@@ -0,0 +1,31 @@
+#version 330 core
+// Edge padding, jump flood step: keep the nearest seed among the 3x3
+// neighbours uStep pixels apart. Steps halve down to 1 (plus one extra 1).
+out vec4 FragColor;
+
+uniform sampler2D uSeeds;
+uniform int uStep;
+
+void main()
+{
+    ivec2 p = ivec2(gl_FragCoord.xy);
+    ivec2 size = textureSize(uSeeds, 0);
+    vec2 best = vec2(-1.0);
+    float bestDist = 1e30;
+
+    for (int y = -1; y <= 1; ++y) {
+        for (int x = -1; x <= 1; ++x) {
+            ivec2 q = p + ivec2(x, y) * uStep;
+            if (any(lessThan(q, ivec2(0))) || any(greaterThanEqual(q, size))) continue;
+            vec2 seed = texelFetch(uSeeds, q, 0).xy;
+            if (seed.x < 0.0) continue;
+            vec2 d = seed - vec2(p);
+            float dist = dot(d, d);
+            if (dist < bestDist) {
+                bestDist = dist;
+                best = seed;
+            }
+        }
+    }
+    FragColor = vec4(best, 0.0, 0.0);
+}
@@ -0,0 +1,13 @@
+#version 330 core
+// Edge padding, pass 1: every opaque pixel is its own nearest seed.
+// RG = pixel coordinates of the nearest opaque pixel found so far, -1 = none.
+out vec4 FragColor;
+
+uniform sampler2D uColor;
+
+void main()
+{
+    ivec2 p = ivec2(gl_FragCoord.xy);
+    bool opaque = texelFetch(uColor, p, 0).a > 0.0;
+    FragColor = vec4(opaque ? vec2(p) : vec2(-1.0), 0.0, 0.0);
+}
@@ -129,6 +129,7 @@ class LayerItemWidget(QWidget):
         if color.isValid():
             new_c = [color.redF(), color.greenF(), color.blueF()]
             self.layer.color = new_c
+            self.layer.mark_dirty()
             self.update_color_style()
             self.layer_changed.emit(self.layer)
 
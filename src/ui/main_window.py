@@ -1,9 +1,10 @@
-from PySide6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QFrame, QFileDialog, QMessageBox, QPushButton
+from PySide6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QFrame, QFileDialog, QMessageBox, QPushButton, QLabel
 from PySide6.QtGui import QAction, QActionGroup
 from PySide6.QtCore import Qt, QTimer
 from src.ui.preview_widget import PreviewWidget
 from src.ui.layer_list import LayerListWidget
 from src.ui.properties import PropertiesWidget
+from src.ui.render_scheduler import RenderScheduler
 from src.core.layer_registry import LayerRegistry
 from src.core.project_io import ProjectIO
 from src.core.settings import Settings
@@ -89,6 +90,11 @@ class MainWindow(QMainWindow):
             pad_menu.addAction(act)
             self.pad_actions[p] = act
 
+        options_menu.addSeparator()
+        profile_action = QAction(tr("menu.options.profiler"), self, checkable=True)
+        profile_action.toggled.connect(lambda checked: self.preview.set_profiling(checked))
+        options_menu.addAction(profile_action)
+
         # Help Menu
         help_menu = menubar.addMenu(tr("menu.help"))
         about_action = help_menu.addAction(tr("menu.help.about"))
@@ -147,8 +153,11 @@ class MainWindow(QMainWindow):
         
         self.main_layout.addWidget(prop_container, 0) # Fixed width
 
-        # Update Logic (Event Driven)
+        # Update Logic (Event Driven): repaints are coalesced per display frame
+        self.render_scheduler = RenderScheduler(self.preview, self)
         self.properties.propertyChanged.connect(self.request_render)
+        self.properties.interactionStarted.connect(self.render_scheduler.begin_interaction)
+        self.properties.interactionFinished.connect(self.render_scheduler.end_interaction)
         self.properties.propertyChanged.connect(self.layer_list.update_active_layer_visuals) # Sync Colors/Names
         self.layer_list.layer_changed.connect(self.on_layer_changed)
         self.layer_list.stack_changed.connect(self.request_render)
@@ -156,9 +165,20 @@ class MainWindow(QMainWindow):
         # Select Base Layer by default
         if self.preview.base_layer:
              self.layer_list.select_layer(self.preview.base_layer)
+
+        # Background Exports (created on first export, the preview context must exist)
+        self.export_queue = None
+        self._export_queue_failed = False
+        self.export_status = QLabel()
+        self.export_cancel_btn = QPushButton(tr("btn.cancel_exports"))
+        self.export_cancel_btn.clicked.connect(self.cancel_exports)
+        self.statusBar().addPermanentWidget(self.export_status)
+        self.statusBar().addPermanentWidget(self.export_cancel_btn)
+        self.export_status.hide()
+        self.export_cancel_btn.hide()
         
     def request_render(self):
-        self.preview.update()
+        self.render_scheduler.request()
 
     def set_language(self, code):
         s = Settings()
@@ -180,11 +200,19 @@ class MainWindow(QMainWindow):
             new_layers = ProjectIO.load_project(file_path, None)
             
             if new_layers is not None:
+                # Decode every image of the project at once, in the background;
+                # layers show up in the preview as their images arrive
+                from src.core.resource_manager import ResourceManager
+                rm = ResourceManager()
+                rm.prefetch_textures([getattr(layer, attr, None) for layer in new_layers
+                                      for attr in ("image_path", "normal_map_path")])
+                
                 # Clear and Replace
                 self.preview.layer_stack.clear()
-                for layer in new_layers:
-                    self.preview.layer_stack.add_layer(layer)
-                    layer.initialize() # Re-init GL resources (shaders/buffers)
+                with rm.async_textures():
+                    for layer in new_layers:
+                        self.preview.layer_stack.add_layer(layer)
+                        layer.initialize() # Re-init GL resources (shaders/buffers)
                 
                 # Update UI
                 self.layer_list.refresh()
@@ -343,8 +371,72 @@ class MainWindow(QMainWindow):
         full_path = os.path.join(start_dir, default_name)
         
         file_path, _ = QFileDialog.getSaveFileName(self, tr("dialog.export_image"), full_path, "Images (*.png *.jpg)")
-        if file_path:
-            self.preview.save_render(file_path)
+        if not file_path:
+            return
+
+        queue = self._get_export_queue()
+        if queue is None:
+            self.preview.save_render(file_path) # Blocking fallback
+            return
+        # Rendered from a snapshot of the stack on the export thread; editing can go on
+        settings = Settings()
+        engine = self.preview.engine
+        queue.submit(self.preview.layer_stack, file_path, settings.export_resolution,
+                     max(0, settings.export_padding), analytic=engine.analytic_geometry,
+                     fused=engine.compositor.fused, png_options=settings.get_png_options())
+
+    def _get_export_queue(self):
+        if self.export_queue is None and not self._export_queue_failed:
+            from src.core.headless import HeadlessContext
+            from src.core.export_queue import ExportQueue
+            try:
+                # Shares textures and programs with the preview
+                context = HeadlessContext(share_context=self.preview.context())
+            except RuntimeError as e:
+                print(f"MainWindow: Background export unavailable, exporting on the UI thread: {e}")
+                self._export_queue_failed = True
+                return None
+            self.export_queue = ExportQueue(context, parent=self)
+            self.export_queue.progress.connect(self.on_export_progress)
+            self.export_queue.finished.connect(self.on_export_finished)
+        return self.export_queue
+
+    def on_export_progress(self, job_id, status, fraction):
+        job = self.export_queue.jobs.get(job_id)
+        pending = self.export_queue.pending()
+        if job is None or not pending:
+            return
+        self.export_status.setText(tr("msg.export_progress", name=os.path.basename(job.path),
+                                      percent=int(fraction * 100), pending=len(pending)))
+        self.export_status.show()
+        self.export_cancel_btn.show()
+
+    def on_export_finished(self, job_id, status):
+        job = self.export_queue.jobs.get(job_id)
+        if not self.export_queue.pending():
+            self.export_status.hide()
+            self.export_cancel_btn.hide()
+        if job is None:
+            return
+        if status == "done":
+            self.statusBar().showMessage(tr("msg.export_done", path=job.path), 5000)
+        elif status == "failed":
+            QMessageBox.warning(self, tr("dialog.export_image"), tr("msg.export_failed", path=job.path, error=job.error))
+
+    def cancel_exports(self):
+        if self.export_queue is not None:
+            self.export_queue.cancel_all()
+
+    def closeEvent(self, event):
+        if self.export_queue is not None:
+            # Write the queued exports before the preview (and its share group) goes away
+            self.statusBar().showMessage(tr("msg.export_finishing"))
+            self.export_queue.shutdown()
+            self.export_queue = None
+        # Image hashes computed this session: not read again next time
+        from src.core.asset_index import AssetIndex
+        AssetIndex().save()
+        super().closeEvent(event)
 
     def set_resolution(self, res):
         s = Settings()
@@ -4,6 +4,9 @@ from PySide6.QtGui import QColor
 
 class FloatSlider(QWidget):
     valueChanged = Signal(float)
+    # Slider handle pressed / released (RenderScheduler previews at reduced resolution in between)
+    dragStarted = Signal()
+    dragFinished = Signal()
 
     def __init__(self, value=0.0, min_slider=0.0, max_slider=1.0, parent=None):
         super().__init__(parent)
@@ -31,6 +34,8 @@ class FloatSlider(QWidget):
         # Connect signals
         self.slider.valueChanged.connect(self._on_slider_changed)
         self.spinbox.valueChanged.connect(self._on_spinbox_changed)
+        self.slider.sliderPressed.connect(self.dragStarted)
+        self.slider.sliderReleased.connect(self.dragFinished)
         
         # Initial sync
         self._update_slider_from_val(value)
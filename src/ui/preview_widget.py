@@ -1,21 +1,31 @@
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, Signal
 from OpenGL.GL import *
 from OpenGL.GL import shaders
 import numpy as np
+import time
 
 from src.core.engine import Engine
 from src.core.layer_stack import LayerStack
 from src.layers.base_layer import BaseLayer
-from src.layers.blend_layer import BlendLayer
 from src.core.settings import Settings
 from src.core.geometry import GeometryEngine
-from PIL import Image
+from src.core.resource_manager import ResourceManager
 import os
 
-from PySide6.QtGui import QSurfaceFormat, QImage
+from PySide6.QtGui import QSurfaceFormat
 
 class PreviewWidget(QOpenGLWidget):
+    # Emitted (from a decode thread) when an image decoded in the background can be uploaded
+    texture_decoded = Signal(str)
+    # Emitted once, after the first frame is drawn
+    first_frame = Signal()
+    # Emitted after every frame with the time it took (ms), see RenderScheduler
+    frame_rendered = Signal(float)
+
+    # Retry interval (ms) of a frame skipped while a background export renders
+    BUSY_RETRY_MS = 16
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumSize(400, 400)
@@ -48,11 +58,22 @@ class PreviewWidget(QOpenGLWidget):
         # Quad for drawing texture to screen
         self.quad_shader = None
         self.quad_vao = None
+        self.quad_sampler = None # Bilinear upscaling of reduced-resolution frames
         
         # Global State
         self.current_shape_name = "Standard"
         self.current_normal_path = ""
         self.normal_map_id = None
+        self._normal_ref_path = None # Normal map image referenced in the texture cache
+        # Layers drawn last frame: the ones removed from the stack since are released
+        self._drawn_layers = []
+        self._first_frame_drawn = False
+        self._warm_up_queue = None # Shader pairs of layer types not compiled yet (after the first frame)
+        self.profiler = None # FrameProfiler while the profile overlay is shown, see set_profiling
+        
+        # Images are decoded off the UI thread: repaint (and upload) when one is ready
+        self.texture_decoded.connect(self.update)
+        ResourceManager().add_decode_listener(self.texture_decoded.emit)
         
         # NOTE: Animation removed as requested.
         print("DEBUG: PreviewWidget Instance Created (Rev 3 - No Anim)")
@@ -119,74 +140,53 @@ class PreviewWidget(QOpenGLWidget):
         self.engine.set_preview_mode(mode_int)
 
     def _update_all_geometry(self, mode):
-        vertices, indices = [], []
-        
-        if mode == "Standard":
-            # Single Sphere
-            vertices, indices = GeometryEngine.generate_sphere()
-            
-        elif mode == "With Normal Map":
-            # Side-by-Side Spheres
-            vertices, indices = GeometryEngine.generate_comparison_spheres()
-            
-        else:
-            # Fallback
-            vertices, indices = GeometryEngine.generate_sphere()
-            
-        # Update all layers
-        # TODO: Handle multi-threading if ever needed, but for now main thread
-        # We need CURRENT OpenGL Context?
-        # update_geometry mainly writes to arrays? No, it buffers data to GPU using GL calls.
-        # So we MUST be in context. _update_global_state is called in paintGL (Context Active).
+        # "Standard": Single Sphere, "With Normal Map": Side-by-Side Spheres (unknown modes fall back to Standard)
+        # Meshes are cached per shape, so this only uploads on first use.
+        # Must run with the context current (_update_global_state is called in paintGL).
+        mesh = GeometryEngine.get_mesh(mode)
         for layer in self.layer_stack:
-            layer.update_geometry(vertices, indices)
+            layer.set_mesh(mesh)
             
     def _load_normal_map(self, path):
+        # Shared with image layers through the ResourceManager cache, referenced while shown.
+        # None while decoding in the background: retried by _update_global_state.
+        rm = ResourceManager()
         self.current_normal_path = path
-        if self.normal_map_id:
-            glDeleteTextures([self.normal_map_id])
-            self.normal_map_id = None
+        self.normal_map_id = None
+        if path != self._normal_ref_path:
+            if self._normal_ref_path:
+                rm.release_texture_ref(self._normal_ref_path)
+            self._normal_ref_path = None
             
         if not path or not os.path.exists(path):
             return
 
-        try:
-            img = Image.open(path)
-            img = img.transpose(Image.FLIP_TOP_BOTTOM)
-            img_data = img.convert("RGB").tobytes() # Normals don't need alpha usually
-            w, h = img.size
-            
-            self.normal_map_id = glGenTextures(1)
-            glBindTexture(GL_TEXTURE_2D, self.normal_map_id)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-            
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, w, h, 0, GL_RGB, GL_UNSIGNED_BYTE, img_data)
-            glGenerateMipmap(GL_TEXTURE_2D)
-            glBindTexture(GL_TEXTURE_2D, 0)
-            
+        if self._normal_ref_path is None:
+            self.normal_map_id = rm.acquire_texture(path)
+            self._normal_ref_path = path
+        else:
+            self.normal_map_id = rm.get_texture(path)
+        if self.normal_map_id:
             print(f"Loaded Normal Map: {path}")
-            
-        except Exception as e:
-            print(f"Failed to load normal map {path}: {e}")
 
-        
     def initializeGL(self):
         print(f"PreviewWidget: InitializeGL called. Context: {self.context()}")
         try:
             # Initialize Engine (FBOs)
             self.engine.initialize()
+            self.engine.set_cache_budget(Settings().prefix_cache_budget_mb)
+            self.engine.set_analytic_geometry(Settings().analytic_geometry)
+            ResourceManager().set_texture_budget(Settings().texture_cache_budget_mb)
             
-            # Initialize Layers
-            for layer in self.layer_stack:
-                try:
-                    layer.initialize()
-                except Exception as e:
-                    print(f"ERROR initializing layer {layer.name}: {e}")
-                    import traceback
-                    traceback.print_exc()
+            # Initialize Layers (images load in the background)
+            with ResourceManager().async_textures():
+                for layer in self.layer_stack:
+                    try:
+                        layer.initialize()
+                    except Exception as e:
+                        print(f"ERROR initializing layer {layer.name}: {e}")
+                        import traceback
+                        traceback.print_exc()
             
             # Initialize Screen Quad
             self._init_quad()
@@ -203,9 +203,101 @@ class PreviewWidget(QOpenGLWidget):
         self.height_ = h
 
     def paintGL(self):
+        rm = ResourceManager()
+        # Shared programs and textures: while a background export (ExportQueue) renders
+        # with them, show the last frame again and retry shortly instead of waiting
+        if not rm.lock.acquire(blocking=False):
+            self._paint(render=False)
+            QTimer.singleShot(self.BUSY_RETRY_MS, self.update)
+            return
+        try:
+            # Upload the images decoded since the last frame; layers still waiting for theirs
+            # are left out of this frame (and repainted by texture_decoded)
+            rm.upload_pending()
+            start = time.perf_counter()
+            with rm.async_textures():
+                self._paint()
+        finally:
+            rm.lock.release()
+        if self.engine.render_scale < 1.0:
+            glFinish() # Dragging: the scheduler adapts the scale to the time the GPU really took
+        self.frame_rendered.emit((time.perf_counter() - start) * 1000.0)
+        if self.profiler:
+            self._draw_profile_overlay()
+        if not self._first_frame_drawn:
+            self._first_frame_drawn = True
+            self.first_frame.emit()
+            QTimer.singleShot(0, self._warm_up_shaders)
+
+    def set_profiling(self, enabled):
+        """Time every layer pass (src.core.frame_profiler) and show the results over the preview"""
+        if enabled == (self.profiler is not None):
+            return
+        if enabled:
+            from src.core.frame_profiler import FrameProfiler
+            self.profiler = FrameProfiler()
+        else:
+            if self.isValid():
+                # Query objects belong to the widget's context
+                self.makeCurrent()
+                self.profiler.release()
+                self.doneCurrent()
+            self.profiler = None
+        self.engine.set_profiler(self.profiler)
+        self.update()
+
+    def _draw_profile_overlay(self):
+        # Results arrive a frame or two late (the queries are not waited for)
+        self.profiler.poll()
+        if self.profiler.pending:
+            QTimer.singleShot(50, self.update)
+        from PySide6.QtGui import QPainter, QColor, QFont
+        painter = QPainter(self)
+        font = QFont("Monospace", 9)
+        font.setStyleHint(QFont.StyleHint.TypeWriter)
+        painter.setFont(font)
+        text = self.profiler.report()
+        rect = painter.boundingRect(self.rect().adjusted(8, 8, -8, -8), Qt.AlignLeft | Qt.AlignTop, text)
+        painter.fillRect(rect.adjusted(-4, -4, 4, 4), QColor(0, 0, 0, 160))
+        painter.setPen(QColor(230, 230, 230))
+        painter.drawText(rect, Qt.AlignLeft | Qt.AlignTop, text)
+        painter.end()
+        # The paint engine may leave these on for the next frame's passes
+        glDisable(GL_BLEND)
+        glDisable(GL_SCISSOR_TEST)
+
+    def set_render_scale(self, scale):
+        """Internal resolution relative to the widget (RenderScheduler lowers it while dragging)"""
+        self.engine.set_render_scale(scale)
+
+    def _warm_up_shaders(self):
+        """
+        Compile the shaders of the layer types not in the stack (and import their
+        modules), one per event loop turn, so adding a layer later does not stall.
+        """
+        from src.core.layer_registry import LayerRegistry
+        if self._warm_up_queue is None:
+            self._warm_up_queue = list(LayerRegistry.get_registered_names())
+        if not self._warm_up_queue:
+            return
+        layer_cls = LayerRegistry.get_class(self._warm_up_queue.pop(0))
+        if layer_cls is not None and layer_cls.fragment_shader and self.isValid():
+            self.makeCurrent()
+            try:
+                ResourceManager().get_shader(layer_cls.vertex_shader, layer_cls.fragment_shader)
+            finally:
+                self.doneCurrent()
+        QTimer.singleShot(0, self._warm_up_shaders)
+
+    def _paint(self, render=True):
         # Save the QOpenGLWidget's FBO (it might not be 0!)
         default_fbo = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
-        
+        if render:
+            self._render_layers()
+        self._draw_frame(default_fbo)
+
+    def _render_layers(self):
+        """Render the stack into the engine's FBO (ResourceManager.lock held)"""
         # Check Updates
         self._update_global_state()
         
@@ -216,6 +308,9 @@ class PreviewWidget(QOpenGLWidget):
                 self._warned_shader = True
                 self._init_quad()
 
+        # Free what layers removed from the stack (deleted, project replaced) held, e.g. image references
+        self._release_removed_layers()
+
         # Check for uninitialized layers (e.g. newly duplicated)
         for layer in self.layer_stack:
             if not hasattr(layer, 'shader_program') or layer.shader_program is None:
@@ -223,17 +318,16 @@ class PreviewWidget(QOpenGLWidget):
                     # We are in PaintGL, so Context is Active
                     layer.initialize()
                     # Also sync geometry
-                    layer.update_geometry(*GeometryEngine.generate_sphere() if self.current_shape_name=="Standard" else GeometryEngine.generate_comparison_spheres())
+                    layer.set_mesh(GeometryEngine.get_mesh(self.current_shape_name))
                 except Exception as e:
                     print(f"Error lazy-initializing layer {layer.name}: {e}")
 
         # 1. Render Layers to FBO via Engine
-        # print("Render Stack") 
         self.engine.render(self.layer_stack)
-        
-        # 2. Render FBO Texture to Screen
-        # Restore the widget's FBO
-        glBindFramebuffer(GL_FRAMEBUFFER, default_fbo)
+        glFlush() # Submit before the export context uses the same objects
+
+    def _draw_frame(self, default_fbo):
+        """Draw the engine's last frame to the widget"""
         # 2. Render FBO Texture to Screen
         # Restore the widget's FBO
         glBindFramebuffer(GL_FRAMEBUFFER, default_fbo)
@@ -253,9 +347,11 @@ class PreviewWidget(QOpenGLWidget):
             
             glActiveTexture(GL_TEXTURE0)
             glBindTexture(GL_TEXTURE_2D, self.engine.get_texture_id())
+            glBindSampler(0, self.quad_sampler or 0)
             glUniform1i(glGetUniformLocation(self.quad_shader, "screenTexture"), 0)
             
             glDrawArrays(GL_TRIANGLES, 0, 6)
+            glBindSampler(0, 0)
             glBindVertexArray(0)
             
         # Re-enable defaults if needed (though next frame clears anyway)
@@ -265,6 +361,16 @@ class PreviewWidget(QOpenGLWidget):
         # Actually standard widget behavior might reset it, but better safe.
         glViewport(0, 0, self.width_, self.height_)
 
+    def _release_removed_layers(self):
+        current = {id(layer) for layer in self.layer_stack}
+        for layer in self._drawn_layers:
+            if id(layer) not in current:
+                try:
+                    layer.release()
+                except Exception as e:
+                    print(f"Error releasing layer {layer.name}: {e}")
+        self._drawn_layers = list(self.layer_stack)
+
     def _init_quad(self):
         # Remove any existing VAO to force fresh start
         if self.quad_vao:
@@ -298,35 +404,22 @@ class PreviewWidget(QOpenGLWidget):
         glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(3 * 4))
         
         glBindVertexArray(0)
-        
-        try:
-            # Construct absolute path to ensure headers are found
-            from src.core.utils import get_resource_path
-            # base_dir should be .../src
-            # shaders are in .../src/shaders
-            vert_path = get_resource_path("src/shaders/quad.vert")
-            frag_path = get_resource_path("src/shaders/quad.frag")
-            
-            print(f"Loading shaders from: {vert_path}")
-            
-            if not os.path.exists(vert_path):
-                print(f"ERROR: Vertex shader not found at {vert_path}")
-            if not os.path.exists(frag_path):
-                print(f"ERROR: Fragment shader not found at {frag_path}")
 
-            with open(vert_path, "r", encoding="utf-8") as f: vert_src = f.read()
-            with open(frag_path, "r", encoding="utf-8") as f: frag_src = f.read()
-            
-            vs = shaders.compileShader(vert_src, GL_VERTEX_SHADER)
-            fs = shaders.compileShader(frag_src, GL_FRAGMENT_SHADER)
-            self.quad_shader = shaders.compileProgram(vs, fs)
-            print(f"Quad Shader Compiled Successfully: {self.quad_shader}")
-        except Exception as e:
-            print(f"Quad Shader FATAL error: {e}")
-            import traceback
-            traceback.print_exc()
+        # Same as nearest at full resolution (texel centers), smooth when upscaling
+        if not self.quad_sampler:
+            self.quad_sampler = glGenSamplers(1)
+            glSamplerParameteri(self.quad_sampler, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            glSamplerParameteri(self.quad_sampler, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            glSamplerParameteri(self.quad_sampler, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            glSamplerParameteri(self.quad_sampler, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        
+        # Shared program cache (compiled once, saved across runs)
+        self.quad_shader = ResourceManager().get_shader("src/shaders/quad.vert", "src/shaders/quad.frag")
+        if not self.quad_shader:
+            print("Quad Shader FATAL error: see the compile error above")
 
     def save_render(self, path, resolution=None, padding=None):
+        # Blocking export on the UI thread (MainWindow queues exports on ExportQueue when it can)
         # Use Settings for resolution if not provided
         settings = Settings()
         res = resolution if resolution is not None else settings.export_resolution
@@ -344,179 +437,33 @@ class PreviewWidget(QOpenGLWidget):
             # 2. Force Standard Geometry
             # Note: We don't change self.current_shape_name visually to avoid UI flicker if possible,
             # but since we are blocking main thread, it's fine.
-            verts, inds = GeometryEngine.generate_sphere() # Default radius 1.0 now
-            
-            for layer in self.layer_stack:
-                layer.update_geometry(verts, inds)
+            # The analytic mode derives the sphere from the preview mode override, no mesh needed.
+            swap_mesh = not self.engine.analytic_geometry
+            if swap_mesh:
+                export_mesh = GeometryEngine.get_mesh("Standard") # Default radius 1.0 now
+                
+                for layer in self.layer_stack:
+                    layer.set_mesh(export_mesh)
                 
             # 3. Render Offscreen via Engine with Override Mode = 0 (Standard) and Force No Normal
-            image = self.engine.render_offscreen(res, res, self.layer_stack, preview_mode_override=0, force_no_normal=True)
-            
-            # 4. Apply Padding (Edge Extension) if requested
-            padding = pad
-            if padding > 0 and image and not image.isNull():
-                print(f"Applying padding: {padding}px")
-                try:
-                    # Convert to Numpy
-                    # QImage to bytes
-                    if image.format() != QImage.Format.Format_RGBA8888:
-                        image = image.convertToFormat(QImage.Format.Format_RGBA8888)
-                        
-                    width = image.width()
-                    height = image.height()
-                    ptr = image.constBits()
-                    
-                    # Use np.frombuffer with the pointer
-                    # Note: constBits returns a memoryview-compatible object in PySide6?
-                    # Or we need to be careful about the size.
-                    # bytesPerLine * height is the total size.
-                    
-                    bpl = image.bytesPerLine()
-                    total_bytes = bpl * height
-                    
-                    # Create array from buffer
-                    # We assume tight packing for simple reshaping, but if bpl != w*4, we have padding.
-                    arr_raw = np.frombuffer(ptr, dtype=np.uint8, count=total_bytes)
-                    
-                    # Reshape including potential stride padding
-                    # Shape: (Height, BytesPerLine)
-                    # Then slice to (Height, Width * 4)
-                    arr_strided = arr_raw.reshape(height, bpl)
-                    
-                    # Extract valid data (first w*4 bytes of each line)
-                    # Shape (Height, Width, 4)
-                    arr = arr_strided[:, :width*4].reshape(height, width, 4)
-                    
-                    print(f"Numpy Array Shape: {arr.shape}")
-                    
-                    # Algorithm: Iterative Dilation
-                    # For N steps:
-                    #   Find edge pixels (alpha=0 but neighbor alpha>0)
-                    #   Fill with neighbor color
-                    
-                    # To avoid complex loops in Python, use checking shifts.
-                    # We want to fill transparent pixels with data from non-transparent neighbors.
-                    
-                    current_img = arr.copy()
-                    
-                    for _ in range(padding):
-                        # Mask of VALID pixels (Alpha > 0)
-                        mask = current_img[:, :, 3] > 0
-                        
-                        # We want pixels that represent HOLES (Alpha == 0)
-                        holes = ~mask
-                        
-                        # Prepare an accumulator for new colors to fill holes
-                        # We will average available neighbors? Or just take one (max)?
-                        # Max is dangerous for colors.
-                        # Simple directional smear:
-                        # For each of 8 directions, if neighbor is valid, copy it.
-                        
-                        # We can do this efficiently by shifting the image.
-                        # If pixel is hole, take pixel from shift.
-                        
-                        # Priority: Up, Down, Left, Right ...
-                        
-                        shifts = [
-                            (-1, 0), (1, 0), (0, -1), (0, 1), # Cardinal
-                            (-1, -1), (-1, 1), (1, -1), (1, 1) # Diagonal
-                        ]
-                        
-                        mixed_color = np.zeros_like(current_img, dtype=np.float32)
-                        # Count must match mixed_color dimensions for easy division, or manage broadcasting
-                        # Let's use (H, W, 1) for count
-                        count = np.zeros((height, width, 1), dtype=np.float32)
-                        
-                        for dy, dx in shifts:
-                            # Shifted image (rolled)
-                            # Note: np.roll wraps around, which is bad. We need slice.
-                            # Use slicing to shift.
-                            
-                            rolled = np.zeros_like(current_img)
-                            
-                            # Source slices
-                            sy_start = max(0, -dy)
-                            sy_end = min(height, height - dy)
-                            sx_start = max(0, -dx)
-                            sx_end = min(width, width - dx)
-                            
-                            # Dest slices
-                            dy_start = max(0, dy)
-                            dy_end = min(height, height + dy)
-                            dx_start = max(0, dx)
-                            dx_end = min(width, width + dx)
-                            
-                            rolled[dy_start:dy_end, dx_start:dx_end] = current_img[sy_start:sy_end, sx_start:sx_end]
-                            
-                            # Mask of rolled
-                            rolled_mask = rolled[:, :, 3] > 0
-                            
-                            # Where current is hole AND rolled is valid -> candidate
-                            fill_candidate = holes & rolled_mask
-                            
-                            # Accumulate
-                            # mixed_color[mask] returns (N, 4)
-                            mixed_color[fill_candidate] += rolled[fill_candidate]
-                            
-                            # count is (H, W, 1). count[mask] returns (N, 1)
-                            count[fill_candidate] += 1 
-                            
-                        # Normalize average
-                        # valid_fills is mask where count > 0
-                        valid_fills = count[:, :, 0] > 0
-                        
-                        # Divide
-                        # mixed_color[valid_fills] is (N, 4)
-                        # count[valid_fills] is (N, 1)
-                        # Broadcasting works: (N, 4) / (N, 1) -> (N, 4)
-                        mixed_color[valid_fills] /= count[valid_fills] 
-                        
-                        # Update current_img where we have valid fills
-                        # Convert back to uint8
-                        fill_values = mixed_color.astype(np.uint8)
-                        
-                        current_img[valid_fills] = fill_values[valid_fills]
-                        # Explicitly set alpha to 0 for filled pixels?
-                        # No, the user WANTS extended color.
-                        # But Matcap usage usually relies on Alpha masking to apply to sphere only?
-                        pass
-                        
-                    # 5. Fill remaining transparent area with Black (Background)
-                    # User requested: "Fill transparent part around generated image with black"
-                    # This refers to the area OUTSIDE the padding.
-                    
-                    final_mask = current_img[:, :, 3] == 0
-                    current_img[final_mask] = [0, 0, 0, 255]
-                    
-                    # Convert back to QImage
-                    # Ref: https://doc.qt.io/qtforpython/PySide6/QtGui/QImage.html
-                    # Must ensure data controls life cycle or copy
-                    
-                    # current_img is H, W, 4
-                    current_img = current_img.copy() # Ensure contiguous
-                    h, w, c = current_img.shape
-                    new_qimage = QImage(current_img.data, w, h, w * 4, QImage.Format.Format_RGBA8888).copy()
-                    image = new_qimage
-                    print("Padding applied successfully.")
-                    
-                except Exception as e:
-                    print(f"Padding failed: {e}")
-                    import traceback
-                    traceback.print_exc()
-            
-            if image and not image.isNull():
-                image.save(path)
+            # 4. Edge padding (Compositor.pad): transparent pixels near the sphere take its edge
+            #    color, the rest becomes opaque black. The file is encoded from the mapped
+            #    readback buffer, without intermediate copies of the frame.
+            if pad > 0:
+                print(f"Applying padding: {pad}px")
+            with ResourceManager().lock:
+                saved = self.engine.save_offscreen(path, res, res, self.layer_stack, preview_mode_override=0,
+                                                   force_no_normal=True, padding=max(0, pad),
+                                                   png_options=settings.get_png_options())
+            if saved:
                 print(f"Saved render to {path} ({res}x{res})")
             else:
                 print("Failed to capture render.")
                 
-            # 4. Restore Geometry (if needed)
-            if old_shape != "Standard":
-                # Restore to whatever it was
+            # 5. Restore Geometry (if needed)
+            if swap_mesh and old_shape != "Standard":
+                # Restore to whatever it was (cached mesh, no upload)
                 self._update_all_geometry(old_shape)
-            else:
-                # WAS Standard, but we regenerated it anyway. No harm keeping it.
-                pass
                 
         except Exception as e:
             print(f"Save Render Error: {e}")
@@ -1,12 +1,5 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QFormLayout, QComboBox
 from PySide6.QtCore import Qt, Signal # Added Signal
-from src.layers.base_layer import BaseLayer
-from src.layers.spot_light_layer import SpotLightLayer
-from src.layers.fresnel_layer import FresnelLayer
-from src.layers.spot_light_layer import SpotLightLayer
-from src.layers.noise_layer import NoiseLayer
-from src.layers.image_layer import ImageLayer
-from src.layers.adjustment_layer import AdjustmentLayer
 from src.ui.params import FloatSlider, ColorPicker
 
 from src.core.i18n import tr
@@ -28,6 +21,9 @@ def get_translated_name(name):
 
 class PropertiesWidget(QWidget):
     propertyChanged = Signal() # New Signal
+    # A slider is being dragged / was released (see RenderScheduler)
+    interactionStarted = Signal()
+    interactionFinished = Signal()
 
     def __init__(self):
         super().__init__()
@@ -40,9 +36,13 @@ class PropertiesWidget(QWidget):
         self.content_widget = QWidget()
         self.main_layout.addWidget(self.content_widget)
         self.current_layer = None
+        self._dragging = 0 # Sliders held down
         
     def set_layer(self, layer):
         self.current_layer = layer
+        # A slider removed while held never reports its release
+        while self._dragging:
+            self._on_drag_finished()
         
         # 1. Remove old content widget
         self.main_layout.removeWidget(self.content_widget)
@@ -63,11 +63,13 @@ class PropertiesWidget(QWidget):
         display_name = get_translated_name(layer.name)
         self.layout.addWidget(QLabel(tr("prop.header", name=display_name)))
         
-        # Dynamic based on type (simplest way for now)
+        # Dynamic based on type (simplest way for now).
+        # By class name: importing the layer classes here would load every layer module at startup.
+        kind = type(layer).__name__
         form = QFormLayout()
         self.layout.addLayout(form)
         
-        if isinstance(layer, BaseLayer):
+        if kind == "BaseLayer":
             self._add_color_control(form, tr("prop.color"), layer.base_color, lambda v: self._update_whole_color(layer.base_color, v, layer))
             
             # Preview Settings
@@ -92,7 +94,7 @@ class PropertiesWidget(QWidget):
             # Common properties for all effect layers
             self._add_blend_mode_control(form, layer)
             
-            if isinstance(layer, SpotLightLayer):
+            if kind == "SpotLightLayer":
                 self._add_float_control(form, tr("prop.intensity"), layer.intensity, 0.0, 5.0, lambda v: self._set_attr(layer, 'intensity', v))
                 self._add_float_control(form, tr("prop.range"), layer.range, 0.0, 1.0, lambda v: self._set_attr(layer, 'range', v))
                 self._add_float_control(form, tr("prop.blur"), layer.blur, 0.0, 1.0, lambda v: self._set_attr(layer, 'blur', v))
@@ -106,13 +108,13 @@ class PropertiesWidget(QWidget):
                 self._add_float_control(form, tr("prop.direction_z"), layer.direction[2], -1.0, 1.0, lambda v: self._update_list(layer.direction, 2, v, layer))
                 self._add_color_control(form, tr("prop.color"), layer.color, lambda v: self._update_whole_color(layer.color, v, layer))
 
-            elif isinstance(layer, FresnelLayer):
+            elif kind == "FresnelLayer":
                 self._add_float_control(form, tr("prop.intensity"), layer.intensity, 0.0, 5.0, lambda v: self._set_attr(layer, 'intensity', v))
                 self._add_float_control(form, tr("prop.power"), layer.power, 0.0, 20.0, lambda v: self._set_attr(layer, 'power', v))
                 self._add_float_control(form, tr("prop.bias"), layer.bias, -1.0, 1.0, lambda v: self._set_attr(layer, 'bias', v))
                 self._add_color_control(form, tr("prop.color"), layer.color, lambda v: self._update_whole_color(layer.color, v, layer))
 
-            elif isinstance(layer, ImageLayer):
+            elif kind == "ImageLayer":
                 # Image Layer
                 self._add_file_picker(form, tr("prop.image"), layer.image_path, lambda path: self._set_attr(layer, 'image_path', path))
                 self._add_combo_control(form, tr("prop.mapping"), ["UV", "Planar"], layer.mapping_mode, lambda v: self._set_attr(layer, 'mapping_mode', v))
@@ -123,23 +125,21 @@ class PropertiesWidget(QWidget):
                 self._add_float_control(form, tr("prop.blur"), layer.blur, 0.0, 1.0, lambda v: self._set_attr(layer, 'blur', v))
                 self._add_float_control(form, tr("prop.opacity"), layer.opacity, 0.0, 1.0, lambda v: self._set_attr(layer, 'opacity', v))
                 
-            elif isinstance(layer, AdjustmentLayer):
+            elif kind == "AdjustmentLayer":
                 self._add_float_control(form, tr("prop.hue"), layer.hue, -0.5, 0.5, lambda v: self._set_attr(layer, 'hue', v))
                 self._add_float_control(form, tr("prop.saturation"), layer.saturation, 0.0, 2.0, lambda v: self._set_attr(layer, 'saturation', v))
                 self._add_float_control(form, tr("prop.brightness"), layer.brightness, -1.0, 1.0, lambda v: self._set_attr(layer, 'brightness', v))
                 self._add_float_control(form, tr("prop.contrast"), layer.contrast, 0.0, 2.0, lambda v: self._set_attr(layer, 'contrast', v))
 
-            elif isinstance(layer, NoiseLayer):
+            elif kind == "NoiseLayer":
+                self._add_combo_control(form, tr("prop.noise_type"), layer.NOISE_TYPES, layer.noise_type, lambda v: self._set_attr(layer, 'noise_type', v))
                 self._add_float_control(form, tr("prop.intensity"), layer.intensity, 0.0, 1.0, lambda v: self._set_attr(layer, 'intensity', v))
                 self._add_float_control(form, tr("prop.scale"), layer.scale, 0.1, 10.0, lambda v: self._set_attr(layer, 'scale', v))
-                self._add_float_control(form, tr("prop.seed_offset"), layer.seed, 0, 100, lambda v: self._regen_noise(layer, v)) # Hacky seed change
+                # Seed and octaves are shader uniforms: no texture is rebuilt while dragging
+                self._add_float_control(form, tr("prop.seed_offset"), layer.seed, 0, 100, lambda v: self._set_attr(layer, 'seed', int(v)))
+                self._add_float_control(form, tr("prop.octaves"), layer.octaves, 1, 8, lambda v: self._set_attr(layer, 'octaves', int(round(v))))
                 self._add_color_control(form, tr("prop.color"), layer.color, lambda v: self._update_whole_color(layer.color, v, layer))
                 
-    def _regen_noise(self, layer, val):
-        layer.seed = int(val)
-        layer.regenerate()
-        self.propertyChanged.emit()
-
     def _add_blend_mode_control(self, layout, layer):
         combo = QComboBox()
         modes = [
@@ -155,6 +155,7 @@ class PropertiesWidget(QWidget):
             
         def on_change(text):
             setattr(layer, 'blend_mode', text)
+            layer.mark_dirty()
             self.propertyChanged.emit()
             
         combo.currentTextChanged.connect(on_change)
@@ -169,24 +170,39 @@ class PropertiesWidget(QWidget):
     def _add_float_control(self, layout, label, value, min_v, max_v, callback):
         slider = FloatSlider(value, min_v, max_v)
         slider.valueChanged.connect(callback)
+        slider.dragStarted.connect(self._on_drag_started)
+        slider.dragFinished.connect(self._on_drag_finished)
         layout.addRow(label, slider)
 
+    def _on_drag_started(self):
+        self._dragging += 1
+        self.interactionStarted.emit()
+
+    def _on_drag_finished(self):
+        if self._dragging:
+            self._dragging -= 1
+            self.interactionFinished.emit()
+
     def _set_attr(self, obj, name, val):
         setattr(obj, name, val)
+        obj.mark_dirty()
         self.propertyChanged.emit()
         
     def _update_list(self, target, idx, val, layer):
         target[idx] = val
+        layer.mark_dirty()
         self.propertyChanged.emit()
         
     def _set_image_path(self, layer, path):
         layer.image_path = path
         # Trigger reload immediately if possible, but layer handles logic in render loop or we can explicit call
         layer.load_texture(path)
+        layer.mark_dirty()
         self.propertyChanged.emit()
 
     def _set_normal_map(self, layer, path):
          layer.normal_map_path = path
+         layer.mark_dirty()
          # No immediate reload method on BaseLayer yet, logic will be handled in PreviewWidget
          # But maybe we should notify PreviewWidget?
          # Property changes are picked up next frame.
@@ -222,4 +238,5 @@ class PropertiesWidget(QWidget):
         target_list[0] = new_color[0]
         target_list[1] = new_color[1]
         target_list[2] = new_color[2]
+        layer.mark_dirty()
         self.propertyChanged.emit()
@@ -0,0 +1,96 @@
+import math
+import time
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtGui import QGuiApplication
+
+from src.core.settings import Settings
+
+
+class RenderScheduler(QObject):
+    """
+    Preview repaints for parameter changes. Bursts of requests (every slider
+    tick) are coalesced into at most one frame per display refresh.
+
+    While a control is dragged (begin_interaction / end_interaction) the
+    preview renders at Settings.interactive_render_scale. The scale drops
+    further when frames take longer than Settings.interactive_frame_budget_ms,
+    and recovers when they are fast again. Releasing the control renders one
+    full-resolution frame.
+    """
+    MIN_SCALE = 0.2
+
+    def __init__(self, preview, parent=None):
+        super().__init__(parent)
+        self.preview = preview
+        settings = Settings()
+        self.interactive_scale = min(1.0, max(self.MIN_SCALE, settings.interactive_render_scale))
+        self.frame_budget_ms = settings.interactive_frame_budget_ms
+
+        screen = QGuiApplication.primaryScreen()
+        refresh = screen.refreshRate() if screen is not None else 0
+        self.frame_interval_ms = 1000.0 / (refresh if refresh > 0 else 60.0)
+
+        self._interactions = 0
+        self._scale = 1.0
+        self._pending = False
+        self._last_frame = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+        preview.frame_rendered.connect(self._on_frame_rendered)
+
+    @property
+    def interactive(self):
+        return self._interactions > 0
+
+    @property
+    def scale(self):
+        return self._scale
+
+    def request(self):
+        """Repaint at the next frame slot (requests until then share the frame)"""
+        self._pending = True
+        if self._timer.isActive():
+            return
+        wait = self.frame_interval_ms - (time.perf_counter() - self._last_frame) * 1000.0
+        self._timer.start(max(0, int(math.ceil(wait))))
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self._pending = False
+        self._last_frame = time.perf_counter()
+        self.preview.update()
+
+    def begin_interaction(self):
+        self._interactions += 1
+        if self._interactions == 1:
+            self._set_scale(self.interactive_scale)
+
+    def end_interaction(self):
+        if self._interactions == 0:
+            return
+        self._interactions -= 1
+        if self._interactions == 0:
+            # Refinement: one frame at full resolution
+            self._set_scale(1.0)
+            self.request()
+
+    def _set_scale(self, scale):
+        self._scale = scale
+        self.preview.set_render_scale(scale)
+
+    def _on_frame_rendered(self, ms):
+        # Keep dragging frames within the budget: cost is about proportional to the pixel count
+        if not self.interactive or ms <= 0.0:
+            return
+        if ms > self.frame_budget_ms:
+            scale = self._scale * max(0.5, math.sqrt(self.frame_budget_ms / ms))
+        elif ms < self.frame_budget_ms * 0.5:
+            scale = self._scale * 1.25
+        else:
+            return
+        scale = min(self.interactive_scale, max(self.MIN_SCALE, scale))
+        if abs(scale - self._scale) > 0.01:
+            self._set_scale(scale)
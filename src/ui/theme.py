@@ -1,12 +1,12 @@
-from qt_material import apply_stylesheet
-
 def apply_app_theme(app):
     """
     Applies the application theme using qt_material.
+    Imported here: main.py applies the theme after the window is shown.
     """
     # Using 'dark_teal.xml' as the default theme
     # We can extend this to load from a config or allow switching later.
     try:
+        from qt_material import apply_stylesheet
         apply_stylesheet(app, theme='dark_teal.xml')
         
         # Override highlights to be less bright (User Request)
@@ -0,0 +1,8 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# GL tests run on src.core.headless, which has to choose PyOpenGL's platform
+# (EGL when there is no display) before any test module imports OpenGL.
+import src.core.headless  # noqa: F401
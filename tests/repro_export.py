@@ -1,50 +1,23 @@
 
 import sys
 import os
-import numpy as np
-from PySide6.QtWidgets import QApplication
-from PySide6.QtOpenGLWidgets import QOpenGLWidget
-from PySide6.QtCore import QSize
-from PIL import Image
 
 # Add src to path
 sys.path.append(os.getcwd())
 
-from src.core.engine import Engine
+from src.core.headless import HeadlessRenderer
+
+import numpy as np
+from PIL import Image
+
 from src.core.layer_stack import LayerStack
 from src.layers.base_layer import BaseLayer
 from src.core.geometry import GeometryEngine
 
-class TestWidget(QOpenGLWidget):
-    def __init__(self):
-        super().__init__()
-        self.resize(500, 500)
-        self.engine = None
-    
-    def initializeGL(self):
-        self.engine = Engine()
-        self.engine.initialize()
-        
-    def paintGL(self):
-        pass # Not needed for offscreen test
-
 def test_export_size():
-    app = QApplication(sys.argv)
-    
-    widget = TestWidget()
-    widget.show() # Need to show to get context?
-    
-    # Process events to let init happen
-    app.processEvents()
-    
-    # Make sure we have context
-    widget.makeCurrent()
-    
-    if not widget.engine:
-        print("Engine not initialized!")
-        return
-        
-    engine = widget.engine
+    # No window needed: offscreen GL context
+    renderer = HeadlessRenderer(500, 500)
+    engine = renderer.engine
     
     # Create Stack
     stack = LayerStack()
@@ -57,8 +30,7 @@ def test_export_size():
     stack.add_layer(layer)
     
     # Geometry (Radius 1.0)
-    v, i = GeometryEngine.generate_sphere(radius=1.0)
-    layer.update_geometry(v, i)
+    layer.set_mesh(GeometryEngine.get_mesh("Standard"))
     
     # Render Offscreen 2048x2048
     res = 2048
@@ -112,7 +84,7 @@ def test_export_size():
             relative_size = diameter / res
             print(f"Relative Size: {relative_size:.2f}")
             
-    widget.close()
+    renderer.release()
 
 if __name__ == "__main__":
     test_export_size()
@@ -0,0 +1,87 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessRenderer
+
+import numpy as np
+
+from src.core.layer_stack import LayerStack
+from src.layers.base_layer import BaseLayer
+from src.layers.spot_light_layer import SpotLightLayer
+from src.layers.fresnel_layer import FresnelLayer
+
+SIZE = 128
+
+
+class TestAnalyticRender(unittest.TestCase):
+    """Analytic geometry must look like the mesh inside the sphere and anti-alias its rim."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.renderer = HeadlessRenderer(SIZE, SIZE)
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.release()
+
+    def setUp(self):
+        self.stack = LayerStack()
+        base = BaseLayer()
+        base.base_color = [0.3, 0.2, 0.1]
+        self.stack.add_layer(base)
+        spot = SpotLightLayer()
+        spot.direction = [0.3, 0.2, 1.0]
+        spot.blend_mode = "Normal"
+        self.stack.add_layer(spot)
+        fresnel = FresnelLayer()
+        fresnel.blend_mode = "Screen"
+        self.stack.add_layer(fresnel)
+
+        # Distance from the view center in sphere radii (the export view fills the frame)
+        y, x = np.mgrid[0:SIZE, 0:SIZE]
+        self.radius = np.hypot(x + 0.5 - SIZE / 2, y + 0.5 - SIZE / 2) / (SIZE / 2)
+
+    def tearDown(self):
+        engine = self.renderer.engine
+        engine.set_analytic_geometry(False)
+        engine.set_fused_rendering(False)
+        self.renderer.context.make_current()
+        for layer in self.stack:
+            layer.release()
+
+    def _render(self, analytic):
+        self.renderer.engine.set_analytic_geometry(analytic)
+        return self.renderer.render(self.stack).astype(np.int16)
+
+    def test_matches_mesh(self):
+        for fused in (False, True):
+            with self.subTest(fused=fused):
+                self.renderer.engine.set_fused_rendering(fused)
+                mesh = self._render(analytic=False)
+                analytic = self._render(analytic=True)
+
+                interior = self.radius < 0.8
+                self.assertTrue((mesh[..., 3][interior] == 255).all())
+                self.assertTrue((analytic[..., 3][interior] == 255).all())
+                # The mesh interpolates the normals of its facets: small differences only
+                diff = np.abs(analytic - mesh)[interior][:, :3]
+                self.assertLess(diff.mean(), 1.0)
+                self.assertLessEqual(diff.max(), 12)
+
+                # Pixels cut by the silhouette get partial coverage; the mesh is aliased
+                rim = (self.radius > 0.97) & (self.radius < 1.03)
+                partial = (analytic[..., 3] > 0) & (analytic[..., 3] < 255)
+                self.assertGreater(int(partial[rim].sum()), SIZE)
+                self.assertFalse(partial[~rim].any())
+                mesh_alpha = mesh[..., 3]
+                self.assertFalse(((mesh_alpha > 0) & (mesh_alpha < 255)).any())
+
+
+if __name__ == '__main__':
+    unittest.main()
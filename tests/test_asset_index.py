@@ -0,0 +1,82 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.asset_index import AssetIndex, content_hash
+from src.core.project_io import ProjectIO
+
+
+class TestAssetIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.index = AssetIndex()
+        self.previous_file = self.index.index_file
+        self.index.set_index_file(os.path.join(self.tmp, "index.json"))
+
+    def tearDown(self):
+        self.index.set_index_file(self.previous_file)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _file(self, name, data):
+        path = os.path.join(self.tmp, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_content_hash(self):
+        a = self._file("a.bin", os.urandom(3 << 20))
+        b = self._file("b.bin", open(a, "rb").read())
+        self.assertEqual(content_hash(a), content_hash(b))
+        self.assertEqual(len(content_hash(a)), 32)
+        self.assertEqual(self.index.hash_file(a, open(a, "rb").read()), content_hash(a))
+
+    def test_unchanged_files_are_not_read_again(self):
+        path = self._file("a.bin", b"first")
+        digest = self.index.hash_file(path)
+        with mock.patch("src.core.asset_index.content_hash") as rehash:
+            self.assertEqual(self.index.hash_file(path), digest)
+            rehash.assert_not_called()
+
+        st = os.stat(path)
+        self._file("a.bin", b"other")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertIsNone(self.index.lookup(path))
+        self.assertNotEqual(self.index.hash_file(path), digest)
+
+    def test_persistence(self):
+        path = self._file("a.bin", b"data")
+        gone = self._file("gone.bin", b"gone")
+        digest = self.index.hash_file(path)
+        self.index.hash_file(gone)
+        os.remove(gone)
+        self.index.save()
+
+        self.index.set_index_file(self.index.index_file) # Reload from disk
+        self.assertEqual(self.index.lookup(path), digest)
+        self.assertNotIn(os.path.abspath(gone), self.index._entries)
+
+    def test_project_assets_are_deduplicated(self):
+        data = os.urandom(1000)
+        first = self._file("first.png", data)
+        second = self._file("second.PNG", data)
+        assets = os.path.join(self.tmp, "bundle", "assets")
+        os.makedirs(assets)
+
+        name = ProjectIO._store_asset(first, assets)
+        self.assertEqual(name, content_hash(first) + ".png")
+        with mock.patch("shutil.copy2") as copy:
+            self.assertEqual(ProjectIO._store_asset(second, assets), name)
+            self.assertEqual(ProjectIO._store_asset(first, assets), name)
+            # Already in the bundle: referenced as it is
+            self.assertEqual(ProjectIO._store_asset(os.path.join(assets, name), assets), name)
+            copy.assert_not_called()
+        self.assertEqual(os.listdir(assets), [name])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import headless
+
+from src.core import batch_export
+from src.core.batch_export import BatchRenderer
+from src.core.layer_stack import LayerStack
+from src.core.project_io import ProjectIO
+from src.layers.base_layer import BaseLayer
+
+
+class FaultyRenderer(BatchRenderer):
+    """Crashes the worker on the first attempt of "crash" projects, hangs on "hang" projects."""
+    def render_project(self, project_path, out_path):
+        name = os.path.basename(os.path.dirname(project_path))
+        if name.startswith("crash"):
+            marker = project_path + ".crashed"
+            if not os.path.exists(marker):
+                open(marker, "w").close()
+                os._exit(3)
+        elif name.startswith("hang"):
+            time.sleep(60)
+        return super().render_project(project_path, out_path)
+
+
+class TestBatchExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _save_project(self, name):
+        stack = LayerStack()
+        stack.add_layer(BaseLayer())
+        ok, errors = ProjectIO.save_project(os.path.join(self.tmp, name), stack)
+        self.assertTrue(ok, errors)
+        return os.path.join(self.tmp, name, "project.json")
+
+    def test_output_paths_are_unique(self):
+        paths = ["/a/x/project.json", "/b/x/project.json", "/c/y.json"]
+        self.assertEqual(
+            batch_export.output_paths(paths, "out", "png"),
+            [os.path.join("out", n) for n in ("x.png", "x_2.png", "y.png")]
+        )
+
+    def test_workers_retry_crashes_and_time_out(self):
+        names = ["a", "crash", "b", "hang", "c"]
+        projects = [self._save_project(n) for n in names]
+        outputs = batch_export.output_paths(projects, os.path.join(self.tmp, "out"), "png")
+        os.makedirs(os.path.join(self.tmp, "out"))
+        options = {"resolution": 32, "padding": 0, "fmt": "png"}
+
+        entries, info = batch_export._render_parallel(
+            list(zip(projects, outputs)), options, workers=2, timeout=4, retries=1,
+            renderer_class=FaultyRenderer
+        )
+        if info["backend"] is None:
+            self.skipTest(entries[0]["error"])
+
+        # Results come back in input order
+        self.assertEqual([e["project"] for e in entries], projects)
+        status = {n: e["status"] for n, e in zip(names, entries)}
+        self.assertEqual(status, {"a": "ok", "crash": "ok", "b": "ok", "hang": "error", "c": "ok"})
+        self.assertEqual(entries[1]["attempts"], 2)
+        self.assertIn("Timed out", entries[3]["error"])
+        self.assertEqual((info["crashes"], info["retried"], info["timeouts"]), (1, 1, 1))
+        for entry in entries:
+            if entry["status"] == "ok":
+                self.assertTrue(os.path.exists(entry["output"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import os
+import io
+import contextlib
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import harness
+from benchmarks.__main__ import main
+
+
+def results(**cases):
+    return {"schema": harness.SCHEMA, "quick": True,
+            "results": {name.replace("__", "."): {"ms": ms} for name, ms in cases.items()}}
+
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_compare(self):
+        base = results(a__slow=10.0, a__fast=10.0, a__noise=0.2, a__same=10.0, a__gone=1.0)
+        new = results(a__slow=12.0, a__fast=5.0, a__noise=0.6, a__same=10.5, a__added=1.0)
+        status = {row[0]: row[4] for row in harness.compare(base, new, tolerance=0.1, min_delta_ms=0.5)}
+        self.assertEqual(status, {
+            "a.slow": "regression",
+            "a.fast": "improvement",
+            "a.noise": "ok", # 3x slower, but below the absolute threshold
+            "a.same": "ok",
+            "a.gone": "missing",
+            "a.added": "new",
+        })
+
+    def test_list(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(main(["list"]), 0)
+        names = out.getvalue().split()
+        for name in ("incremental", "readback", "png", "blur", "batch"):
+            self.assertIn(name, names)
+        self.assertEqual(names, list(harness.SUITES))
+
+    def test_run_and_compare_cli(self):
+        out = os.path.join(self.tmp, "run.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = main(["run", "geometry", "--quick", "-k", "geometry.sphere_*", "-o", out])
+        self.assertEqual(code, 0)
+        data = harness.load_results(out)
+        self.assertEqual(sorted(data["results"]), ["geometry.sphere_128", "geometry.sphere_30"])
+        entry = data["results"]["geometry.sphere_30"]
+        self.assertLessEqual(entry["ms"], entry["median_ms"])
+        self.assertEqual(entry["params"], {"segments": 30})
+
+        slower = json.loads(json.dumps(data))
+        slower["results"]["geometry.sphere_30"]["ms"] = entry["ms"] * 2 + 10.0
+        slower_path = os.path.join(self.tmp, "slower.json")
+        harness.save_results(slower, slower_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["compare", out, out]), 0)
+            self.assertEqual(main(["compare", out, slower_path]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import cli
+
+import numpy as np
+from PIL import Image
+
+from src.core.layer_stack import LayerStack
+from src.core.project_io import ProjectIO
+from src.layers.base_layer import BaseLayer
+from src.layers.noise_layer import NoiseLayer
+
+
+class TestCliRender(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _save_project(self, name, color):
+        stack = LayerStack()
+        base = BaseLayer()
+        base.base_color = color
+        stack.add_layer(base)
+        stack.add_layer(NoiseLayer())
+        ok, errors = ProjectIO.save_project(os.path.join(self.tmp, "projects", name), stack)
+        self.assertTrue(ok, errors)
+
+    def test_expand_inputs(self):
+        self._save_project("a", [1.0, 0.0, 0.0])
+        self._save_project("b", [0.0, 0.0, 1.0])
+        projects = os.path.join(self.tmp, "projects")
+        expected = [os.path.join(projects, n, "project.json") for n in ("a", "b")]
+        self.assertEqual(cli.expand_inputs([os.path.join(projects, "*", "project.json")]), expected)
+        self.assertEqual(cli.expand_inputs([os.path.join(projects, "b"), os.path.join(projects, "a")]), expected)
+
+    def test_render_batch(self):
+        self._save_project("red", [1.0, 0.0, 0.0])
+        self._save_project("blue", [0.0, 0.0, 1.0])
+        out_dir = os.path.join(self.tmp, "out")
+        missing = os.path.join(self.tmp, "missing", "project.json")
+        argv = ["render", os.path.join(self.tmp, "projects", "*"), missing,
+                "-r", "64", "-p", "2", "-o", out_dir]
+        try:
+            code = cli.main(argv)
+        except RuntimeError as e:
+            self.skipTest(str(e))
+
+        self.assertEqual(code, 1) # The missing project is reported, the others still render
+        with open(os.path.join(out_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual((manifest["rendered"], manifest["failed"]), (2, 1))
+        entries = {os.path.basename(os.path.dirname(e["project"])): e for e in manifest["projects"]}
+        self.assertEqual(entries["missing"]["status"], "error")
+
+        for name, channel in (("red", 0), ("blue", 2)):
+            entry = entries[name]
+            self.assertEqual(entry["status"], "ok")
+            self.assertIn("render_ms", entry)
+            pixels = np.asarray(Image.open(entry["output"]))
+            self.assertEqual(pixels.shape, (64, 64, 4))
+            self.assertTrue((pixels[..., 3] == 255).all()) # Padding fills the background
+            center = pixels[32, 32]
+            self.assertGreater(int(center[channel]), int(center[2 - channel]) + 20)
+
+    def test_render_profile(self):
+        self._save_project("red", [1.0, 0.0, 0.0])
+        out_dir = os.path.join(self.tmp, "out")
+        argv = ["render", os.path.join(self.tmp, "projects", "red"), "-r", "32", "-p", "0", "-o", out_dir, "--profile"]
+        try:
+            code = cli.main(argv)
+        except RuntimeError as e:
+            self.skipTest(str(e))
+
+        self.assertEqual(code, 0)
+        with open(os.path.join(out_dir, "manifest.json"), encoding="utf-8") as f:
+            profile = json.load(f)["projects"][0]["profile"]
+        self.assertEqual([layer["type"] for layer in profile["layers"]], ["BaseLayer", "NoiseLayer"])
+        self.assertIsNotNone(profile["gpu_ms"])
+        self.assertGreater(profile["counters"]["draw_calls"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+from src.core.compositor_pool import CompositorPool
+
+
+class FakeCompositor:
+    """Stands in for Compositor: no GL, 8 bytes per pixel like the real FBO set."""
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.initialized = 0
+        self.released = False
+
+    def initialize(self):
+        self.initialized += 1
+
+    def memory_bytes(self):
+        return self.width * self.height * 8
+
+    def release(self):
+        self.released = True
+
+
+@mock.patch("src.core.compositor_pool.Compositor", FakeCompositor)
+class TestCompositorPool(unittest.TestCase):
+    def test_reuse_same_resolution(self):
+        pool = CompositorPool()
+        a = pool.acquire(512, 512)
+        b = pool.acquire(512, 512)
+        self.assertIs(a, b)
+        self.assertEqual(a.initialized, 1)
+        self.assertEqual(a.cache_budget_mb, 0)
+
+    def test_lru_eviction_under_cap(self):
+        pool = CompositorPool(max_mb=3.5)  # 512^2 = 2 MB, 512x256 = 1 MB
+        small = pool.acquire(512, 512)
+        other = pool.acquire(512, 256)
+        pool.acquire(512, 512)  # touch: `other` becomes least recently used
+        pool.acquire(256, 512)
+        self.assertTrue(other.released)
+        self.assertFalse(small.released)
+        self.assertLessEqual(pool.memory_bytes(), pool.max_bytes)
+
+    def test_oversized_request_is_kept(self):
+        pool = CompositorPool(max_mb=1)
+        big = pool.acquire(1024, 1024)
+        self.assertFalse(big.released)
+        self.assertEqual(len(pool), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
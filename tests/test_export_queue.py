@@ -0,0 +1,85 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessContext
+
+import numpy as np
+from PIL import Image
+
+from src.core.export_queue import ExportQueue
+from src.core.layer_stack import LayerStack
+from src.layers.base_layer import BaseLayer
+from src.layers.noise_layer import NoiseLayer
+
+
+class TestExportQueue(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from PySide6.QtGui import QGuiApplication
+        if QGuiApplication.instance() is None:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+            cls.app = QGuiApplication(sys.argv[:1])
+        try:
+            context = HeadlessContext()
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+        cls.queue = ExportQueue(context)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.queue.shutdown()
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _stack(self, color):
+        stack = LayerStack()
+        base = BaseLayer()
+        base.base_color = color
+        stack.add_layer(base)
+        stack.add_layer(NoiseLayer())
+        return stack
+
+    def test_exports_snapshot(self):
+        stack = self._stack([1.0, 0.0, 0.0])
+        events = []
+        self.queue.progress.connect(lambda job_id, status, fraction: events.append((job_id, status)))
+        red = self.queue.submit(stack, os.path.join(self.tmp, "red.png"), 64, 2)
+        # Edits after submit do not change the queued export
+        stack[0].base_color = [0.0, 0.0, 1.0]
+        stack[0].mark_dirty()
+        blue = self.queue.submit(stack, os.path.join(self.tmp, "blue.png"), 64, 0)
+        self.assertTrue(self.queue.wait(60))
+
+        for job, channel, opaque in ((red, 0, True), (blue, 2, False)):
+            self.assertEqual(job.status, "done", job.error)
+            self.assertIn("render_ms", job.timings)
+            pixels = np.asarray(Image.open(job.path))
+            self.assertEqual(pixels.shape, (64, 64, 4))
+            self.assertEqual(bool((pixels[..., 3] == 255).all()), opaque) # Padding fills the background
+            center = pixels[32, 32]
+            self.assertGreater(int(center[channel]), int(center[2 - channel]) + 20)
+        statuses = [status for job_id, status in events if job_id == red.id]
+        self.assertEqual(statuses[0], "queued")
+        self.assertEqual(statuses[-1], "done")
+
+    def test_cancel(self):
+        stack = self._stack([0.5, 0.5, 0.5])
+        jobs = [self.queue.submit(stack, os.path.join(self.tmp, f"{i}.png"), 64, 4) for i in range(3)]
+        self.assertTrue(self.queue.cancel(jobs[-1].id))
+        self.assertTrue(self.queue.wait(60))
+        self.assertEqual([job.status for job in jobs], ["done", "done", "cancelled"])
+        self.assertFalse(os.path.exists(jobs[-1].path))
+        self.assertFalse(self.queue.cancel(jobs[0].id)) # Already written
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessContext
+
+from src.core.engine import Engine
+from src.core.frame_profiler import FrameProfiler
+from src.core.layer_stack import LayerStack
+from src.layers.base_layer import BaseLayer
+from src.layers.spot_light_layer import SpotLightLayer
+from src.layers.fresnel_layer import FresnelLayer
+from src.layers.adjustment_layer import AdjustmentLayer
+
+SIZE = 64
+
+
+class TestFrameProfiler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.context = HeadlessContext()
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.context.release()
+
+    def setUp(self):
+        self.engine = Engine(SIZE, SIZE)
+        self.engine.initialize()
+        self.profiler = FrameProfiler()
+        self.engine.set_profiler(self.profiler)
+
+        self.stack = LayerStack()
+        self.stack.add_layer(BaseLayer())
+        self.spot = SpotLightLayer() # Add: blend.frag pass
+        self.stack.add_layer(self.spot)
+        fresnel = FresnelLayer()
+        fresnel.blend_mode = "Overlay"
+        self.stack.add_layer(fresnel)
+        self.stack.add_layer(AdjustmentLayer())
+        for layer in self.stack:
+            layer.initialize()
+
+    def tearDown(self):
+        for layer in self.stack:
+            layer.release()
+        self.profiler.release()
+        self.engine.release()
+
+    def _render(self):
+        self.engine.render_offscreen_pixels(SIZE, SIZE, self.stack)
+        self.profiler.finish()
+        return self.profiler.last_frame
+
+    def test_layer_timings(self):
+        frame = self._render()
+        self.assertEqual(frame["path"], "multipass")
+        self.assertEqual([layer["pass"] for layer in frame["layers"]], ["direct", "blend", "blend", "adjustment"])
+        self.assertIsNotNone(frame["gpu_ms"])
+        for layer in frame["layers"]:
+            self.assertGreaterEqual(layer["gpu_ms"], 0.0)
+            self.assertGreater(layer["cpu_ms"], 0.0)
+
+        # Accumulator clear; base: direct draw; spot, fresnel: layer FBO (program bound by the
+        # compositor and again by layer.render) + blend.frag pass; adjustment pass.
+        # Every layer program also binds the normal map on unit 5.
+        counters = frame["counters"]
+        self.assertEqual(counters["draw_calls"], 1 + 2 + 2 + 1)
+        self.assertEqual(counters["clears"], 1 + 2 + 2 + 1)
+        self.assertEqual(counters["program_binds"], 1 + 3 + 3 + 1)
+        self.assertEqual(counters["fbo_binds"], 2 + 2 + 4 + 4 + 2)
+        self.assertEqual(counters["texture_binds"], 1 + 3 + 3 + 1)
+        self.assertEqual(counters["blits"], 0)
+        self.assertEqual(counters["state_changes"],
+                         counters["program_binds"] + counters["fbo_binds"] + counters["texture_binds"])
+
+    def test_cached_layers(self):
+        # The preview compositor keeps prefix snapshots (offscreen ones do not)
+        self.engine.render(self.stack)
+        self.spot.intensity = 0.5
+        self.spot.mark_dirty()
+        self.engine.render(self.stack)
+        self.profiler.finish()
+        frame = self.profiler.last_frame
+        passes = [layer["pass"] for layer in frame["layers"]]
+        self.assertEqual(passes[0], "cached")
+        self.assertEqual(passes[-1], "adjustment")
+        self.assertGreater(frame["counters"]["blits"], 0)
+
+    def test_fused_frame(self):
+        self.engine.set_fused_rendering(True)
+        frame = self._render()
+        self.assertEqual(frame["path"], "fused")
+        self.assertEqual(len(frame["layers"]), 1)
+        self.assertEqual(frame["counters"]["draw_calls"], 1)
+        self.assertEqual(frame["counters"]["program_binds"], 1)
+        self.assertEqual(frame["counters"]["texture_binds"], 1) # Normal map only
+
+    def test_unchanged_frames_are_not_recorded(self):
+        self._render()
+        self._render()
+        self.assertEqual(len(self.profiler.frames), 1)
+
+    def test_profiling_off(self):
+        self.engine.set_profiler(None)
+        self._render()
+        self.assertEqual(len(self.profiler.frames), 0)
+        self.assertEqual(self.profiler.pending, 0)
+
+    def test_calls_outside_frames_are_not_counted(self):
+        frame = self._render()
+        counters = dict(frame["counters"])
+        # Padding runs after the frame was recorded
+        self.engine.render_offscreen_pixels(SIZE, SIZE, self.stack, padding=4)
+        self.profiler.finish()
+        self.assertEqual(frame["counters"], counters)
+
+    def test_histogram_and_dump(self):
+        for intensity in (0.2, 0.4, 0.6):
+            self.spot.intensity = intensity
+            self.spot.mark_dirty()
+            self._render()
+        hist = self.profiler.histogram()
+        self.assertEqual(hist["count"], 3)
+        self.assertEqual(sum(count for _, count in hist["bins"]), 3)
+        self.assertLessEqual(hist["p50"], hist["max"])
+        self.assertIn("Spot", self.profiler.report())
+
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "profile.json")
+            self.profiler.dump(path)
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.assertEqual(len(data["frames"]), 3)
+        self.assertEqual(data["histogram"]["gpu_ms"]["count"], 3)
+        self.assertEqual(data["frames"][-1]["layers"][-1]["type"], "AdjustmentLayer")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessRenderer
+
+import numpy as np
+from PIL import Image
+
+from src.core.frame_profiler import FrameProfiler
+from src.core.layer_stack import LayerStack
+from src.core.resource_manager import ResourceManager
+from src.layers.base_layer import BaseLayer
+from src.layers.spot_light_layer import SpotLightLayer
+from src.layers.fresnel_layer import FresnelLayer
+from src.layers.image_layer import ImageLayer
+from src.layers.adjustment_layer import AdjustmentLayer
+
+SIZE = 128
+
+
+class TestFusedRender(unittest.TestCase):
+    """The fused program must match the multi-pass reference."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.renderer = HeadlessRenderer(SIZE, SIZE)
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+        cls.profiler = FrameProfiler()
+        cls.renderer.engine.set_profiler(cls.profiler)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.context.make_current()
+        cls.profiler.release()
+        cls.renderer.release()
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.image_path = os.path.join(self.tmp, "gradient.png")
+        ramp = np.linspace(0, 255, 64, dtype=np.uint8)
+        pixels = np.zeros((64, 64, 4), dtype=np.uint8)
+        pixels[..., 0] = ramp[None, :]
+        pixels[..., 1] = ramp[:, None]
+        pixels[..., 2] = 96
+        pixels[..., 3] = np.where(ramp[:, None] > 32, 200, 255)
+        Image.fromarray(pixels, "RGBA").save(self.image_path)
+        self.stack = None
+
+    def tearDown(self):
+        self.renderer.context.make_current()
+        for layer in self.stack or []:
+            layer.release()
+        ResourceManager().release_texture(self.image_path)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _build_stack(self, modes):
+        stack = LayerStack()
+        base = BaseLayer()
+        base.base_color = [0.2, 0.15, 0.1]
+        stack.add_layer(base)
+        for i, mode in enumerate(modes):
+            kind = i % 3
+            if kind == 0:
+                layer = SpotLightLayer()
+                layer.direction = [0.3, 0.2, 1.0]
+                layer.color = [1.0, 0.8, 0.6]
+            elif kind == 1:
+                layer = FresnelLayer()
+                layer.power = 2.0 + i
+            else:
+                layer = ImageLayer()
+                layer.image_path = self.image_path
+                layer.opacity = 0.8
+            layer.blend_mode = mode
+            stack.add_layer(layer)
+        # No hue shift: it magnifies the 8-bit rounding of the multi-pass accumulator it reads
+        adjustment = AdjustmentLayer()
+        adjustment.saturation = 1.2
+        adjustment.brightness = 0.05
+        stack.add_layer(adjustment)
+        self.stack = stack
+        return stack
+
+    def _render(self, stack, fused):
+        engine = self.renderer.engine
+        engine.set_fused_rendering(fused)
+        pixels = self.renderer.render(stack).astype(np.int16)
+        self.profiler.finish()
+        self.assertEqual(self.profiler.last_frame["path"], "fused" if fused else "multipass")
+        return pixels
+
+    def _assert_matches(self, modes):
+        stack = self._build_stack(modes)
+        reference = self._render(stack, fused=False)
+        fused = self._render(stack, fused=True)
+        # The multi-pass path quantizes each layer to 8 bits before blending
+        self.assertLessEqual(np.abs(fused - reference).max(), 2)
+        self.assertGreater(reference[..., :3].max(), 0)
+
+    def test_mixed_stack(self):
+        self._assert_matches(["Normal", "Add", "Multiply", "Screen", "Overlay", "Normal"])
+
+    def test_shader_blend_modes(self):
+        self._assert_matches(["Soft Light", "Difference", "Hard Light", "Subtract", "Lighten", "Darken"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+import math
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.geometry import GeometryEngine
+
+
+def loop_sphere(radius, stacks, sectors, offset_x):
+    vertices = []
+    for i in range(stacks + 1):
+        lat = math.pi * i / stacks
+        for j in range(sectors + 1):
+            lon = 2 * math.pi * j / sectors
+            x = math.sin(lat) * math.cos(lon)
+            y = math.cos(lat)
+            z = math.sin(lat) * math.sin(lon)
+            vertices.extend([x*radius + offset_x, y*radius, z*radius, x, y, z,
+                             j / sectors, i / stacks, -math.sin(lon), 0.0, math.cos(lon)])
+    indices = []
+    for i in range(stacks):
+        for j in range(sectors):
+            first = (i * (sectors + 1)) + j
+            second = first + sectors + 1
+            indices.extend([first, second, first + 1, second, second + 1, first + 1])
+    return np.array(vertices, dtype=np.float32), np.array(indices, dtype=np.uint32)
+
+
+class TestGeometry(unittest.TestCase):
+    def test_matches_loop_generator(self):
+        for args in [(1.0, 30, 30, 0.0), (0.45, 7, 12, -0.5)]:
+            verts, inds = GeometryEngine.generate_sphere(*args)
+            ref_verts, ref_inds = loop_sphere(*args)
+            self.assertEqual(verts.dtype, np.float32)
+            self.assertEqual(inds.dtype, np.uint32)
+            np.testing.assert_allclose(verts, ref_verts, atol=1e-6)
+            np.testing.assert_array_equal(inds, ref_inds)
+
+    def test_memoized_and_read_only(self):
+        a = GeometryEngine.generate_sphere(stacks=16, sectors=16)
+        b = GeometryEngine.generate_sphere(radius=1, stacks=16, sectors=16, offset_x=0)
+        self.assertIs(a[0], b[0])
+        with self.assertRaises(ValueError):
+            a[0][0] = 5.0
+
+    def test_comparison_spheres(self):
+        verts, inds = GeometryEngine.generate_comparison_spheres()
+        single, single_inds = GeometryEngine.generate_sphere(radius=0.45, offset_x=-0.5)
+        self.assertEqual(len(verts), 2 * len(single))
+        self.assertEqual(int(inds.max()), len(verts) // 11 - 1)
+        np.testing.assert_array_equal(inds[len(single_inds):], single_inds + len(single) // 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
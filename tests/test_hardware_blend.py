@@ -0,0 +1,89 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessContext
+
+import numpy as np
+
+from src.core.engine import Engine
+from src.core.layer_stack import LayerStack
+from src.layers.base_layer import BaseLayer
+from src.layers.spot_light_layer import SpotLightLayer
+from src.layers.fresnel_layer import FresnelLayer
+from src.layers.noise_layer import NoiseLayer
+from src.layers.adjustment_layer import AdjustmentLayer
+
+SIZE = 256
+
+
+class TestHardwareBlend(unittest.TestCase):
+    """Hardware-blended layers must match the blend.frag composite pass."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.context = HeadlessContext()
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.context.release()
+
+    def _build_stack(self, modes):
+        stack = LayerStack()
+        base = BaseLayer()
+        base.base_color = [0.2, 0.1, 0.1]
+        stack.add_layer(base)
+        kinds = [SpotLightLayer, FresnelLayer, NoiseLayer]
+        for i, mode in enumerate(modes):
+            layer = kinds[i % len(kinds)]()
+            layer.blend_mode = mode
+            stack.add_layer(layer)
+        stack.add_layer(AdjustmentLayer())
+        for layer in stack:
+            layer.initialize()
+        return stack
+
+    def _render(self, stack, hardware_blend):
+        engine = Engine(SIZE, SIZE)
+        engine.initialize()
+        engine.compositor.hardware_blend = hardware_blend
+        engine.render(stack)
+        pixels = engine.compositor.final_fbo.read_pixels().astype(np.int16)
+        engine.compositor.release()
+        return pixels
+
+    def _assert_matches(self, modes):
+        stack = self._build_stack(modes)
+        reference = self._render(stack, hardware_blend=False)
+        fast = self._render(stack, hardware_blend=True)
+        # The shader path quantizes each layer to 8 bits before blending
+        self.assertLessEqual(np.abs(fast - reference).max(), 2)
+        self.assertGreater(reference.max(), 0)
+
+    def test_hardware_modes(self):
+        self._assert_matches(["Normal", "Multiply", "Screen", "Normal", "Screen", "Multiply"])
+
+    def test_mixed_with_shader_modes(self):
+        self._assert_matches(["Add", "Overlay", "Normal", "Difference", "Screen", "Soft Light"])
+
+    def test_offscreen_follows_engine(self):
+        stack = self._build_stack(["Normal", "Multiply", "Screen"])
+        engine = Engine(SIZE, SIZE)
+        engine.initialize()
+        engine.compositor.hardware_blend = False
+        engine.render(stack)
+        reference = engine.compositor.final_fbo.read_pixels()
+        exported = engine.render_offscreen_pixels(SIZE, SIZE, stack)
+        self.assertFalse(engine.offscreen_pool.acquire(SIZE, SIZE).hardware_blend)
+        # Same program path: bit-identical to the preview render
+        self.assertTrue(np.array_equal(exported, reference))
+        engine.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessRenderer
+
+import numpy as np
+
+from src.core.layer_stack import LayerStack
+from src.layers.base_layer import BaseLayer
+from src.layers.fresnel_layer import FresnelLayer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestHeadless(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.renderer = HeadlessRenderer(128, 128)
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.release()
+
+    def _stack(self):
+        stack = LayerStack()
+        base = BaseLayer()
+        base.base_color = [0.2, 0.4, 0.6]
+        stack.add_layer(base)
+        fresnel = FresnelLayer()
+        fresnel.blend_mode = "Add"
+        stack.add_layer(fresnel)
+        return stack
+
+    def test_render_pixels(self):
+        pixels = self.renderer.render(self._stack())
+        self.assertEqual(pixels.shape, (128, 128, 4))
+        self.assertEqual(pixels.dtype, np.uint8)
+
+        # Sphere center: base color (the rim light is ~0 there), corners stay transparent
+        np.testing.assert_allclose(pixels[64, 64], [51, 102, 153, 255], atol=2)
+        self.assertEqual(pixels[0, 0, 3], 0)
+        # Rim brighter than the center
+        self.assertGreater(int(pixels[64, 1, :3].sum()), int(pixels[64, 64, :3].sum()))
+
+    def test_edit_without_mark_dirty(self):
+        stack = self._stack()
+        self.renderer.render(stack)
+        stack[0].base_color = [1.0, 0.0, 0.0]
+        pixels = self.renderer.render(stack)
+        np.testing.assert_allclose(pixels[64, 64], [255, 0, 0, 255], atol=2)
+
+    def test_new_stack_after_release(self):
+        # Pooled compositors outlive the stacks: a new stack (ids of freed layers) is drawn, not reused
+        for color, expected in (([0.2, 0.4, 0.6], [51, 102, 153, 255]), ([0.0, 1.0, 0.0], [0, 255, 0, 255])):
+            stack = self._stack()
+            stack[0].base_color = color
+            pixels = self.renderer.render(stack, width=64, height=64)
+            np.testing.assert_allclose(pixels[32, 32], expected, atol=2)
+            for layer in stack:
+                layer.release()
+            del stack
+
+    def test_other_resolution(self):
+        pixels = self.renderer.render(self._stack(), width=64, height=32)
+        self.assertEqual(pixels.shape, (32, 64, 4))
+        self.assertEqual(pixels[16, 32, 3], 255)
+
+    def test_mapped_pixels(self):
+        stack = self._stack()
+        expected = self.renderer.render(stack, width=64, height=64)
+        with self.renderer.map_pixels(stack, width=64, height=64) as pixels:
+            # Flipped view of the mapped pack buffer: top row first, writable
+            self.assertEqual(pixels.shape, (64, 64, 4))
+            self.assertTrue(pixels.flags.writeable)
+            np.testing.assert_array_equal(pixels, expected)
+
+    def test_save_rgba(self):
+        from PIL import Image
+        from src.core.image_io import save_rgba
+        tmp = tempfile.mkdtemp()
+        try:
+            stack = self._stack()
+            for name in ("out.png", "out.jpg"):
+                path = os.path.join(tmp, name)
+                with self.renderer.map_pixels(stack, width=64, height=64, padding=4) as pixels:
+                    expected = pixels.copy()
+                    save_rgba(path, pixels)
+                saved = np.asarray(Image.open(path).convert("RGBA"))
+                if name.endswith(".png"):
+                    np.testing.assert_array_equal(saved, expected)
+                else: # Alpha dropped (padding made every pixel opaque), same encoder as a plain RGB save
+                    reference = os.path.join(tmp, "reference.jpg")
+                    Image.fromarray(expected[..., :3]).save(reference)
+                    np.testing.assert_array_equal(saved, np.asarray(Image.open(reference).convert("RGBA")))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def test_no_ui_imports(self):
+        code = ("import sys, src.core.headless, src.core.engine; "
+                "sys.exit(any(m.startswith('src.ui') for m in sys.modules))")
+        self.assertEqual(subprocess.call([sys.executable, "-c", code], cwd=ROOT), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
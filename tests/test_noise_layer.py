@@ -0,0 +1,100 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessRenderer
+
+import numpy as np
+
+from src.core.layer_stack import LayerStack
+from src.core.layer_serializer import LayerSerializer
+from src.core.resource_manager import ResourceManager
+from src.layers.base_layer import BaseLayer
+from src.layers.noise_layer import NoiseLayer
+
+SIZE = 128
+
+
+class TestNoiseLayer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.renderer = HeadlessRenderer(SIZE, SIZE)
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.release()
+
+    def setUp(self):
+        self.renderer.engine.set_fused_rendering(False)
+        self.renderer.engine.set_analytic_geometry(False)
+        self.stack = LayerStack()
+        base = BaseLayer()
+        base.base_color = [1.0, 1.0, 1.0]
+        self.stack.add_layer(base)
+        self.noise = NoiseLayer()
+        self.stack.add_layer(self.noise)
+
+    def tearDown(self):
+        self.renderer.context.make_current()
+        for layer in self.stack:
+            layer.release()
+
+    def _render(self, **params):
+        for name, value in params.items():
+            setattr(self.noise, name, value)
+        self.noise.mark_dirty()
+        return self.renderer.render(self.stack)[..., :3].astype(np.int16)
+
+    def test_seed_is_a_uniform(self):
+        first = self._render(seed=1)
+        stats = ResourceManager().texture_stats()
+        second = self._render(seed=2)
+        self.assertIsNone(self.noise.texture_id)
+        self.assertEqual(ResourceManager().texture_stats(), stats)
+        self.assertGreater(np.abs(first - second).max(), 32)
+        np.testing.assert_array_equal(self._render(seed=1), first)
+
+    def test_types_differ(self):
+        images = [self._render(noise_type=kind, scale=0.2) for kind in ("Value", "Simplex", "fBm", "Worley")]
+        for i in range(len(images)):
+            self.assertGreater(images[i].std(), 5.0)
+            for j in range(i):
+                self.assertGreater(np.abs(images[i] - images[j]).mean(), 2.0)
+
+    def test_render_variants_match(self):
+        reference = self._render(noise_type="fBm", scale=0.05, octaves=3)
+        self.renderer.engine.set_fused_rendering(True)
+        fused = self._render()
+        self.assertLessEqual(np.abs(fused - reference).max(), 2)
+        self.renderer.engine.set_analytic_geometry(True)
+        analytic = self._render()
+        # Per-pixel sphere vs. the mesh: compare away from the silhouette
+        center = slice(SIZE // 4, 3 * SIZE // 4)
+        self.assertLess(np.abs(analytic[center, center] - reference[center, center]).mean(), 4.0)
+
+    def test_baked_texture_is_cached_per_seed(self):
+        self._render(noise_type="Baked", seed=3)
+        first = self.noise.texture_id
+        self.assertTrue(first)
+        self._render(seed=4)
+        self.assertNotEqual(self.noise.texture_id, first)
+        self._render(seed=3)
+        self.assertEqual(self.noise.texture_id, first) # Reused from the texture cache
+        self._render(noise_type="Simplex")
+        self.assertIsNone(self.noise.texture_id)
+
+    def test_legacy_projects_keep_baked_noise(self):
+        data = LayerSerializer.to_dict(NoiseLayer())
+        del data["params"]["noise_type"]
+        legacy = NoiseLayer()
+        LayerSerializer.from_dict(legacy, data)
+        self.assertEqual(legacy.noise_type, "Baked")
+
+
+if __name__ == '__main__':
+    unittest.main()
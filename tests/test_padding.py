@@ -0,0 +1,88 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessRenderer
+
+import numpy as np
+
+from src.core.layer_stack import LayerStack
+from src.core.padding import apply_padding, nearest_valid, unpremultiply
+from src.layers.base_layer import BaseLayer
+from src.layers.fresnel_layer import FresnelLayer
+
+
+class TestPadding(unittest.TestCase):
+    def test_unpremultiply(self):
+        pixels = np.array([[[64, 32, 0, 128], [10, 20, 30, 0], [255, 0, 0, 255]]], dtype=np.uint8)
+        out = unpremultiply(pixels)
+        np.testing.assert_array_equal(out[0, 0], [128, 64, 0, 128])
+        np.testing.assert_array_equal(out[0, 1], [10, 20, 30, 0])
+        np.testing.assert_array_equal(out[0, 2], [255, 0, 0, 255])
+
+    def test_padding_extends_edge_then_fills_black(self):
+        pixels = np.zeros((1, 6, 4), dtype=np.uint8)
+        pixels[0, 0] = [200, 100, 50, 255]
+        out = apply_padding(pixels, 2)
+        np.testing.assert_array_equal(out[0, 1], [200, 100, 50, 255])
+        np.testing.assert_array_equal(out[0, 2], [200, 100, 50, 255])
+        np.testing.assert_array_equal(out[0, 3], [0, 0, 0, 255])
+        self.assertEqual(pixels[0, 1, 3], 0) # Input untouched
+
+    def test_nearest_valid_matches_brute_force(self):
+        rng = np.random.default_rng(7)
+        valid = rng.random((40, 56)) > 0.985
+        reach = 9
+        ys, xs, src_ys, src_xs = nearest_valid(valid, reach)
+
+        vy, vx = np.nonzero(valid)
+        gy, gx = np.mgrid[0:40, 0:56]
+        d2 = (gy[..., None] - vy) ** 2 + (gx[..., None] - vx) ** 2
+        best = d2.min(axis=2)
+        expected = ~valid & (best <= reach * reach)
+
+        reached = np.zeros_like(valid)
+        reached[ys, xs] = True
+        np.testing.assert_array_equal(reached, expected)
+        self.assertTrue(valid[src_ys, src_xs].all())
+        np.testing.assert_array_equal((ys - src_ys) ** 2 + (xs - src_xs) ** 2, best[ys, xs])
+
+
+class TestGpuPadding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.renderer = HeadlessRenderer(96, 96)
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.release()
+
+    def test_jump_flood_matches_cpu(self):
+        stack = LayerStack()
+        base = BaseLayer()
+        base.base_color = [0.8, 0.3, 0.1]
+        stack.add_layer(base)
+        stack.add_layer(FresnelLayer())
+
+        straight = unpremultiply(self.renderer.render(stack))
+        reference = apply_padding(straight, 12)
+        gpu = self.renderer.render(stack, padding=12)
+
+        self.assertTrue((gpu[..., 3] == 255).any())
+        diff = np.abs(gpu.astype(np.int16) - reference.astype(np.int16)).max(axis=2)
+        # Where they differ, the GPU must have picked another equidistant edge pixel
+        vy, vx = np.nonzero(straight[..., 3] > 0)
+        for y, x in zip(*np.nonzero(diff > 2)):
+            d2 = (vy - y) ** 2 + (vx - x) ** 2
+            nearest = d2 == d2.min()
+            colors = straight[vy[nearest], vx[nearest]].astype(np.int16)
+            self.assertLessEqual(np.abs(colors - gpu[y, x]).max(axis=1).min(), 2, (y, x))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from PIL import Image
+
+from src.core.png_writer import write_png, adler32_combine, FILTERS, STRATEGIES
+
+
+class TestPngWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "out.png")
+        rng = np.random.default_rng(7)
+        # Smooth gradient plus noise: every filter predictor gets exercised
+        y, x = np.mgrid[0:45, 0:61]
+        self.pixels = np.stack([x * 4, y * 5, (x + y) * 2, 255 - x], axis=-1).astype(np.uint8)
+        self.pixels[::3] += rng.integers(0, 40, self.pixels[::3].shape, dtype=np.uint8)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _roundtrip(self, pixels, **options):
+        write_png(self.path, pixels, **options)
+        with Image.open(self.path) as img:
+            img.load()
+            return np.asarray(img)
+
+    def test_filters_roundtrip(self):
+        for png_filter in FILTERS:
+            for channels in (3, 4):
+                pixels = np.ascontiguousarray(self.pixels[..., :channels])
+                # Several bands, several threads, bands not dividing the height
+                decoded = self._roundtrip(pixels, png_filter=png_filter, band_rows=7, threads=3)
+                np.testing.assert_array_equal(decoded, pixels, err_msg=f"{png_filter} x{channels}")
+
+    def test_flipped_view_and_options(self):
+        flipped = self.pixels[::-1]  # Like FrameBuffer.map_pixels
+        for level, strategy in ((0, "default"), (1, "rle"), (9, "filtered"), (6, "huffman")):
+            decoded = self._roundtrip(flipped, level=level, strategy=strategy, band_rows=4, threads=2)
+            np.testing.assert_array_equal(decoded, flipped)
+        self.assertEqual(set(STRATEGIES), {"default", "filtered", "rle", "huffman"})
+
+    def test_single_band(self):
+        decoded = self._roundtrip(self.pixels, threads=1)
+        np.testing.assert_array_equal(decoded, self.pixels)
+
+    def test_adler32_combine(self):
+        a, b = os.urandom(1000), os.urandom(70000)
+        self.assertEqual(adler32_combine(zlib.adler32(a), zlib.adler32(b), len(b)), zlib.adler32(a + b))
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            write_png(self.path, self.pixels, png_filter="best")
+        with self.assertRaises(ValueError):
+            write_png(self.path, self.pixels[..., :2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessRenderer
+
+from OpenGL.GL import glGetProgramiv, glDeleteProgram, GL_LINK_STATUS
+
+from src.core.resource_manager import ResourceManager
+
+VERT = """#version 330 core
+layout (location = 0) in vec3 aPos;
+void main() { gl_Position = vec4(aPos, 1.0); }
+"""
+FRAG = """#version 330 core
+out vec4 FragColor;
+uniform vec4 tint;
+void main() { FragColor = tint * %s; }
+"""
+
+
+class TestProgramCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.renderer = HeadlessRenderer(64, 64)
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+        cls.cache = ResourceManager().program_cache
+        if not cls.cache.supported():
+            cls.renderer.release()
+            raise unittest.SkipTest("Driver without program binary formats")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.release()
+
+    def setUp(self):
+        self.renderer.context.make_current()
+        self.previous_dir = self.cache.directory
+        self.cache.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache.directory, ignore_errors=True)
+        self.cache.directory = self.previous_dir
+
+    def test_compile_once_then_load(self):
+        rm = ResourceManager()
+        frag = FRAG % "0.5"
+        misses, hits = self.cache.misses, self.cache.hits
+        program = rm.get_shader_from_source(VERT, frag, label="cache test")
+        self.assertTrue(program)
+        self.assertEqual(self.cache.misses, misses + 1)
+        self.assertEqual(len(os.listdir(self.cache.directory)), 1)
+
+        rm.release_shader(program)
+        program = rm.get_shader_from_source(VERT, frag, label="cache test")
+        self.assertEqual(self.cache.hits, hits + 1)
+        self.assertTrue(glGetProgramiv(program, GL_LINK_STATUS))
+        self.assertIn("tint", rm.program_info(program).uniforms)
+        rm.release_shader(program)
+
+    def test_key_depends_on_sources(self):
+        self.assertEqual(self.cache.key(VERT, FRAG % "1.0"), self.cache.key(VERT, FRAG % "1.0"))
+        self.assertNotEqual(self.cache.key(VERT, FRAG % "1.0"), self.cache.key(VERT, FRAG % "2.0"))
+
+    def test_corrupt_binary_falls_back(self):
+        rm = ResourceManager()
+        frag = FRAG % "0.25"
+        rm.release_shader(rm.get_shader_from_source(VERT, frag))
+        key = self.cache.key(VERT, frag)
+        path = os.path.join(self.cache.directory, key + ".bin")
+        with open(path, "r+b") as f:
+            f.seek(16)
+            f.write(b"\xff" * 64)
+
+        self.assertIsNone(self.cache.load(key))
+        self.assertFalse(os.path.exists(path))
+        program = rm.get_shader_from_source(VERT, frag)
+        self.assertTrue(glGetProgramiv(program, GL_LINK_STATUS))
+        self.assertTrue(os.path.exists(path)) # Stored again
+        rm.release_shader(program)
+
+    def test_size_cap(self):
+        max_bytes = self.cache.max_bytes
+        try:
+            self.cache.max_bytes = 1 # Only the newest entry survives
+            programs = [ResourceManager().get_shader_from_source(VERT, FRAG % f"{i}.0") for i in (3, 4)]
+            self.assertEqual(os.listdir(self.cache.directory), [self.cache.key(VERT, FRAG % "4.0") + ".bin"])
+        finally:
+            self.cache.max_bytes = max_bytes
+        for program in programs:
+            ResourceManager().release_shader(program)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import sys
+import os
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessRenderer
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+from OpenGL.GL import glBindTexture, glGetTexLevelParameteriv, GL_TEXTURE_2D, GL_TEXTURE_WIDTH, GL_TEXTURE_HEIGHT
+
+from src.core.layer_stack import LayerStack
+from src.layers.base_layer import BaseLayer
+from src.layers.spot_light_layer import SpotLightLayer
+
+SIZE = 128
+
+
+class FakePreview(QObject):
+    frame_rendered = Signal(float)
+
+    def __init__(self):
+        super().__init__()
+        self.updates = 0
+        self.scales = []
+
+    def update(self):
+        self.updates += 1
+
+    def set_render_scale(self, scale):
+        self.scales.append(scale)
+
+
+class TestRenderScheduler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from PySide6.QtGui import QGuiApplication
+        if QGuiApplication.instance() is None:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+            cls.app = QGuiApplication(sys.argv[:1])
+
+    def setUp(self):
+        from src.ui.render_scheduler import RenderScheduler
+        self.preview = FakePreview()
+        self.scheduler = RenderScheduler(self.preview)
+        self.scheduler.interactive_scale = 0.5
+        self.scheduler.frame_budget_ms = 30.0
+
+    def _process(self, ms):
+        from PySide6.QtCore import QCoreApplication
+        end = time.perf_counter() + ms / 1000.0
+        while time.perf_counter() < end:
+            QCoreApplication.processEvents()
+            time.sleep(0.001)
+
+    def test_requests_are_coalesced(self):
+        for _ in range(20):
+            self.scheduler.request()
+        self._process(3 * self.scheduler.frame_interval_ms)
+        self.assertEqual(self.preview.updates, 1)
+
+        # A request right after a frame waits for the next frame slot
+        self.scheduler.request()
+        self.assertEqual(self.preview.updates, 1)
+        self._process(3 * self.scheduler.frame_interval_ms)
+        self.assertEqual(self.preview.updates, 2)
+
+    def test_interaction_scale(self):
+        self.scheduler.begin_interaction()
+        self.scheduler.begin_interaction() # Nested: only the outermost counts
+        self.assertEqual(self.preview.scales, [0.5])
+
+        self.preview.frame_rendered.emit(120.0) # Over budget: cheaper frames
+        self.assertLess(self.scheduler.scale, 0.5)
+        self.assertGreaterEqual(self.scheduler.scale, self.scheduler.MIN_SCALE)
+        for _ in range(10):
+            self.preview.frame_rendered.emit(5.0) # Fast again: back up to the interactive scale
+        self.assertEqual(self.scheduler.scale, 0.5)
+
+        self.scheduler.end_interaction()
+        self.assertTrue(self.scheduler.interactive)
+        self.scheduler.end_interaction()
+        self.assertFalse(self.scheduler.interactive)
+        self.assertEqual(self.preview.scales[-1], 1.0)
+        self._process(3 * self.scheduler.frame_interval_ms)
+        self.assertEqual(self.preview.updates, 1) # Full-resolution refinement
+
+        self.preview.frame_rendered.emit(500.0) # Not interactive: scale stays
+        self.assertEqual(self.scheduler.scale, 1.0)
+
+
+class TestRenderScale(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.renderer = HeadlessRenderer(SIZE, SIZE)
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.release()
+
+    @staticmethod
+    def _texture_size(texture_id):
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        size = (glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_WIDTH),
+                glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_HEIGHT))
+        glBindTexture(GL_TEXTURE_2D, 0)
+        return size
+
+    def test_reduced_resolution(self):
+        engine = self.renderer.engine
+        stack = LayerStack()
+        stack.add_layer(BaseLayer())
+        stack.add_layer(SpotLightLayer())
+        self.renderer.initialize_layers(stack)
+
+        engine.render(stack)
+        full_texture = engine.get_texture_id()
+        full = engine.compositor.final_fbo.read_pixels().astype(np.int16)
+
+        engine.set_render_scale(0.5)
+        self.assertEqual(engine.render_size(), (SIZE // 2, SIZE // 2))
+        engine.render(stack)
+        self.assertNotEqual(engine.get_texture_id(), full_texture)
+        self.assertEqual(self._texture_size(engine.get_texture_id()), (SIZE // 2, SIZE // 2))
+        half = engine._scaled_compositor.final_fbo.read_pixels().astype(np.int16)
+        # Same image at half the resolution (compared inside the sphere)
+        reference = full.reshape(SIZE // 2, 2, SIZE // 2, 2, 4).mean(axis=(1, 3))
+        inner = slice(SIZE // 8, 3 * SIZE // 8)
+        self.assertLess(np.abs(half[inner, inner] - reference[inner, inner]).mean(), 3.0)
+
+        # Back to full resolution: the full-size compositor's result is still valid
+        engine.set_render_scale(1.0)
+        engine.render(stack)
+        self.assertEqual(engine.get_texture_id(), full_texture)
+        self.assertEqual(self._texture_size(full_texture), (SIZE, SIZE))
+        for layer in stack:
+            layer.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
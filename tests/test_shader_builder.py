@@ -0,0 +1,70 @@
+import unittest
+
+from src.core.shader_builder import AnalyticSphere, DirectBlendBuilder, FusedShaderBuilder, GLSLModule, rename_identifiers
+
+
+class TestFusedShaderBuilder(unittest.TestCase):
+    def test_module_parsing(self):
+        mod = GLSLModule.from_file("src/shaders/layer_noise.frag")
+        self.assertIn("noiseTexture", mod.uniforms)
+        self.assertIn("normalMap", mod.uniforms)
+        self.assertTrue(mod.main_body.strip())
+
+    def test_frame_globals_block_matches(self):
+        # Every stage linked together must declare the shared block identically
+        paths = ["src/shaders/layer_base.vert", "src/shaders/layer_spot.frag", "src/shaders/layer_fresnel.frag",
+                 "src/shaders/layer_noise.frag", "src/shaders/layer_image.frag"]
+        blocks = {" ".join(GLSLModule.from_file(p).blocks["FrameGlobals"].split()) for p in paths}
+        self.assertEqual(len(blocks), 1)
+
+    def test_rename_skips_member_access(self):
+        out = rename_identifiers("color.x + scale * v.color", {"color": "color_L0", "scale": "scale_L0"})
+        self.assertEqual(out, "color_L0.x + scale_L0 * v.color")
+
+    def test_build_stack(self):
+        entries = [
+            ("src/shaders/layer_base.frag", 0, None),
+            ("src/shaders/layer_noise.frag", 2, None),
+            ("src/shaders/layer_adjustment.frag", 0, "uTexture"),
+        ]
+        src, suffixes, units = FusedShaderBuilder().build(entries, max_units=16)
+
+        self.assertEqual(suffixes, ["_L0", "_L1", "_L2"])
+        self.assertEqual(units[1], {"noiseTexture": FusedShaderBuilder.FIRST_LAYER_UNIT})
+        self.assertIn("uniform vec3 baseColor_L0;", src)
+        self.assertIn("uniform sampler2D noiseTexture_L1;", src)
+        self.assertEqual(src.count("uniform sampler2D normalMap;"), 1)
+        # The adjustment layer reads the accumulator instead of a texture
+        self.assertNotIn("uTexture", src)
+        self.assertIn("acc = clamp(layer2(acc), 0.0, 1.0);", src)
+
+    def test_texture_unit_limit(self):
+        entries = [("src/shaders/layer_noise.frag", 0, None)] * 4
+        with self.assertRaises(ValueError):
+            FusedShaderBuilder().build(entries, max_units=8)
+
+    def test_analytic_variant(self):
+        src = DirectBlendBuilder().build("src/shaders/layer_image.frag", analytic=True, premultiply=False)
+
+        # Mesh varyings become globals filled in by sphereSurface() from the quad position
+        self.assertNotIn("in vec3 Normal;", src)
+        self.assertIn("in vec2 ClipPos;", src)
+        self.assertIn("mat3 TBN;", src)
+        self.assertIn(AnalyticSphere.PROLOGUE, src)
+        self.assertIn("c.a *= coverage;", src)
+        self.assertEqual(src.count("uniform FrameGlobals"), 1)
+
+    def test_analytic_fused_stack(self):
+        entries = [("src/shaders/layer_base.frag", 0, None), ("src/shaders/layer_spot.frag", 1, None)]
+        src, _, _ = FusedShaderBuilder().build(entries, max_units=16, analytic=True)
+        self.assertIn("float sphereSurface(", src)
+        self.assertIn("acc = compositeLayer(clamp(layer1(acc), 0.0, 1.0), acc, 1, coverage);", src)
+
+    def test_analytic_rejects_unknown_inputs(self):
+        mod = GLSLModule("in vec3 WorldPos;\nout vec4 FragColor;\nvoid main() { FragColor = vec4(WorldPos, 1.0); }")
+        with self.assertRaises(ValueError):
+            AnalyticSphere().check_inputs(mod, "custom.frag")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+import os
+import re
+import subprocess
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Time from main() to the shown main window (offscreen platform, no first frame)
+TIME_TO_WINDOW_BUDGET_MS = 2500
+
+
+def run_python(args, **env):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True,
+                          timeout=120, env=dict(os.environ, **env))
+
+
+class TestStartup(unittest.TestCase):
+    def test_lazy_layer_registry(self):
+        code = (
+            "import sys\n"
+            "import src.layers\n"
+            "from src.core.layer_registry import LayerRegistry\n"
+            "names = LayerRegistry.get_registered_names()\n"
+            "assert 'ImageLayer' in names and 'BaseLayer' in names, names\n"
+            "assert 'src.layers.image_layer' not in sys.modules\n"
+            "assert 'PIL.Image' not in sys.modules\n"
+            "assert not LayerRegistry.is_loaded('ImageLayer')\n"
+            "layer = LayerRegistry.create('ImageLayer')\n"
+            "assert type(layer).__name__ == 'ImageLayer'\n"
+            "assert LayerRegistry.is_loaded('ImageLayer')\n"
+            "assert LayerRegistry.create('NoSuchLayer') is None\n"
+            "print('ok')\n"
+        )
+        result = run_python(["-c", code])
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("ok", result.stdout)
+
+    def test_window_loads_only_used_layer_modules(self):
+        # The preview's default stack is a base layer and a spot light; other types load when first added
+        code = (
+            "import sys\n"
+            "from PySide6.QtWidgets import QApplication\n"
+            "app = QApplication([])\n"
+            "from src.ui.main_window import MainWindow\n"
+            "import src.layers\n"
+            "window = MainWindow()\n"
+            "window.show()\n"
+            "app.processEvents()\n"
+            "print('loaded', sorted(m for m in sys.modules if m.startswith('src.layers.') and m.endswith('_layer')))\n"
+        )
+        result = run_python(["-c", code], QT_QPA_PLATFORM="offscreen")
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        match = re.search(r"^loaded (.*)$", result.stdout, re.MULTILINE)
+        self.assertIsNotNone(match, result.stdout)
+        self.assertEqual(match.group(1), "['src.layers.base_layer', 'src.layers.spot_light_layer']")
+
+    def test_time_to_window(self):
+        result = run_python(["-m", "src.main", "--profile-startup"], QT_QPA_PLATFORM="offscreen")
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn("Startup profile", result.stdout)
+        self.assertIn("import main window", result.stdout)
+        match = re.search(r"time to window:\s+([\d.]+) ms", result.stdout)
+        self.assertIsNotNone(match, result.stdout)
+        self.assertLess(float(match.group(1)), TIME_TO_WINDOW_BUDGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessRenderer
+
+import numpy as np
+from PIL import Image
+from OpenGL.GL import glBindTexture, glDeleteTextures, glGetTexImage, glGetTexLevelParameteriv, GL_TEXTURE_2D, GL_TEXTURE_WIDTH, GL_RGBA, GL_UNSIGNED_BYTE
+
+from src.core.layer_stack import LayerStack
+from src.core.resource_manager import ResourceManager
+from src.core.texture_blur import blur_level, blur_texture
+from src.core.texture_cache import texture_bytes
+from src.layers.base_layer import BaseLayer
+from src.layers.image_layer import ImageLayer
+
+
+def gaussian_rows(row, sigma):
+    """Reference: wrapped Gaussian along a row, truncated at 3 sigma like gaussian_blur.frag"""
+    radius = int(np.ceil(3.0 * sigma))
+    offsets = np.arange(-radius, radius + 1)
+    weights = np.exp(-0.5 * offsets ** 2 / sigma ** 2)
+    return sum(w * np.roll(row, -o) for o, w in zip(offsets, weights)) / weights.sum()
+
+
+class TestTextureBlur(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.renderer = HeadlessRenderer(64, 64)
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.release()
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.rm = ResourceManager()
+        self.renderer.context.make_current()
+
+    def tearDown(self):
+        for name in os.listdir(self.tmp):
+            self.rm.release_texture(os.path.join(self.tmp, name))
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _stripes(self, size):
+        # Vertical stripes, period size / 2: wraps seamlessly (GL_REPEAT)
+        column = np.where((np.arange(size) // (size // 4)) % 2 == 0, 255, 0).astype(np.uint8)
+        pixels = np.empty((size, size, 4), dtype=np.uint8)
+        pixels[..., :3] = column[None, :, None]
+        pixels[..., 3] = 255
+        path = os.path.join(self.tmp, f"stripes_{size}.png")
+        Image.fromarray(pixels).save(path)
+        return path, column.astype(np.float64)
+
+    @staticmethod
+    def _read(texture_id):
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        width = glGetTexLevelParameteriv(GL_TEXTURE_2D, 0, GL_TEXTURE_WIDTH)
+        data = glGetTexImage(GL_TEXTURE_2D, 0, GL_RGBA, GL_UNSIGNED_BYTE)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        return np.frombuffer(data, dtype=np.uint8).reshape(-1, width, 4)
+
+    def test_blur_level(self):
+        self.assertEqual(blur_level(256, 256, 0.01), 0) # 2.56 texels
+        self.assertEqual(blur_level(1024, 512, 0.01), 2) # 10.24 -> 2.56 texels
+        self.assertEqual(blur_level(1, 1, 10.0), 0)
+
+    def test_matches_gaussian(self):
+        for size, sigma_uv in ((256, 0.01), (1024, 0.01)):
+            path, column = self._stripes(size)
+            texture_id, nbytes = blur_texture(self.rm.get_texture(path), sigma_uv)
+            try:
+                pixels = self._read(texture_id).astype(np.float64)
+                level = blur_level(size, size, sigma_uv)
+                expected = gaussian_rows(column, sigma_uv * size).reshape(-1, 1 << level).mean(axis=1)
+                self.assertEqual(pixels.shape[1], size >> level)
+                self.assertEqual(nbytes, texture_bytes(size >> level, size >> level))
+                # Rows are identical and follow the reference (8-bit intermediate, mip pre-filter)
+                self.assertLessEqual(np.abs(pixels[..., 0] - expected[None, :]).max(), 3.0)
+                np.testing.assert_array_equal(pixels[..., 3], 255)
+            finally:
+                glDeleteTextures([texture_id])
+
+    def test_layer_rebuilds_per_quantised_blur(self):
+        path, _ = self._stripes(256)
+        stack = LayerStack()
+        stack.add_layer(BaseLayer())
+        layer = ImageLayer()
+        layer.image_path = path
+        stack.add_layer(layer)
+        self.renderer.render(stack)
+        sharp = layer.get_textures()["imageTexture"]
+        self.assertEqual(sharp, layer.texture_id)
+
+        layer.blur = 0.5
+        layer.mark_dirty()
+        self.renderer.render(stack)
+        blurred = layer.get_textures()["imageTexture"]
+        self.assertNotEqual(blurred, sharp)
+
+        layer.blur = 0.5 + 0.25 / ImageLayer.BLUR_STEPS # Same step
+        layer.mark_dirty()
+        self.renderer.render(stack)
+        self.assertEqual(layer.get_textures()["imageTexture"], blurred)
+
+        layer.blur = 0.75
+        layer.mark_dirty()
+        self.renderer.render(stack)
+        self.assertNotIn(layer.get_textures()["imageTexture"], (sharp, blurred))
+
+        layer.blur = 0.5 # Back: still cached
+        layer.mark_dirty()
+        self.renderer.render(stack)
+        self.assertEqual(layer.get_textures()["imageTexture"], blurred)
+
+        layer.blur = 0.0
+        layer.mark_dirty()
+        self.renderer.render(stack)
+        self.assertEqual(layer.get_textures()["imageTexture"], sharp)
+        for l in stack:
+            l.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+from src.core.texture_cache import TextureCache, texture_bytes
+
+MB = 1024 * 1024
+
+
+@mock.patch("src.core.texture_cache.glDeleteTextures")
+class TestTextureCache(unittest.TestCase):
+    def test_texture_bytes(self, delete):
+        self.assertEqual(texture_bytes(4, 4), (16 + 4 + 1) * 4)
+        self.assertEqual(texture_bytes(8, 2), (16 + 4 + 2 + 1) * 4)
+        self.assertEqual(texture_bytes(8, 2, mipmaps=False), 64)
+        self.assertAlmostEqual(texture_bytes(1024, 1024) / (1024 * 1024 * 4), 4 / 3, places=3)
+
+    def test_lru_eviction_of_unreferenced(self, delete):
+        cache = TextureCache(budget_mb=3)
+        cache.add("a", 1, MB)
+        cache.add("b", 2, MB)
+        cache.add("c", 3, MB)
+        cache.get("a") # touch: "b" becomes least recently used
+        cache.add("d", 4, MB)
+        delete.assert_called_once_with([2])
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.memory_bytes(), cache.budget_bytes)
+
+    def test_referenced_entries_stay(self, delete):
+        cache = TextureCache(budget_mb=1)
+        cache.acquire("a")
+        cache.acquire("a")
+        cache.add("a", 1, 2 * MB) # Referenced while loading, over budget on its own
+        cache.add("b", 2, MB)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+
+        cache.release("a")
+        self.assertIn("a", cache)
+        self.assertEqual(cache.ref_count("a"), 1)
+        cache.release("a")
+        self.assertNotIn("a", cache)
+        self.assertEqual(len(cache), 0)
+
+    def test_stats_and_budget(self, delete):
+        cache = TextureCache(budget_mb=10)
+        cache.acquire("a")
+        cache.add("a", 1, 2 * MB)
+        cache.add("b", 2, 3 * MB)
+        stats = cache.stats()
+        self.assertEqual((stats["textures"], stats["referenced"]), (2, 1))
+        self.assertEqual((stats["bytes"], stats["referenced_bytes"]), (5 * MB, 2 * MB))
+        self.assertEqual(stats["budget_bytes"], 10 * MB)
+
+        cache.set_budget(0)
+        self.assertEqual(list(cache._entries), ["a"])
+
+    def test_remove_and_clear_keep_references(self, delete):
+        cache = TextureCache()
+        cache.acquire("a")
+        cache.add("a", 1, MB)
+        cache.remove("a")
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.ref_count("a"), 1)
+        cache.add("a", 2, MB)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.ref_count("a"), 1)
+        self.assertEqual(delete.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
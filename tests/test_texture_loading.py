@@ -0,0 +1,176 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.headless import HeadlessRenderer
+
+import numpy as np
+from PIL import Image
+
+from src.core.resource_manager import ResourceManager
+from src.layers.image_layer import ImageLayer
+
+
+class TestTextureLoading(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.renderer = HeadlessRenderer(64, 64)
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.release()
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.rm = ResourceManager()
+        self.renderer.context.make_current()
+
+    def tearDown(self):
+        for name in os.listdir(self.tmp):
+            self.rm.release_texture(os.path.join(self.tmp, name))
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _image(self, name, size=(40, 24)):
+        path = os.path.join(self.tmp, name)
+        Image.fromarray(np.full((size[1], size[0], 4), 128, dtype=np.uint8)).save(path)
+        return path
+
+    def _wait_decoded(self, path):
+        self.rm._pending[path].result(timeout=10)
+
+    def test_async_request_is_coalesced(self):
+        path = self._image("a.png")
+        with self.rm.async_textures():
+            self.assertIsNone(self.rm.get_texture(path))
+            future = self.rm._pending[path]
+            self.assertIsNone(self.rm.get_texture(path))
+            self.assertIs(self.rm._pending[path], future)
+        self.assertTrue(self.rm.is_loading(path))
+
+        self._wait_decoded(path)
+        self.assertEqual(self.rm.upload_pending(), [path])
+        self.assertFalse(self.rm.is_loading(path))
+        tex = self.rm.get_texture(path)
+        self.assertTrue(tex)
+        with self.rm.async_textures():
+            self.assertEqual(self.rm.get_texture(path), tex)
+
+    def test_sync_request_joins_pending_decode(self):
+        path = self._image("b.png")
+        self.rm.prefetch_textures([path, None, os.path.join(self.tmp, "missing.png")])
+        self.assertEqual(list(self.rm._pending), [path])
+        self.assertTrue(self.rm.get_texture(path))
+        self.assertFalse(self.rm.is_loading(path))
+        self.assertEqual(self.rm.upload_pending(), [])
+
+    def test_sync_decode_does_not_hold_lock(self):
+        # Background exports decode their images while the preview renders
+        path = self._image("lock.png")
+        free = []
+
+        def try_lock():
+            if self.rm.lock.acquire(blocking=False):
+                self.rm.lock.release()
+                free.append(True)
+
+        decode = ResourceManager._decode_image
+        def decode_checking_lock(full_path):
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+            return decode(full_path)
+
+        ResourceManager._decode_image = staticmethod(decode_checking_lock)
+        try:
+            self.assertTrue(self.rm.acquire_texture(path))
+        finally:
+            ResourceManager._decode_image = staticmethod(decode)
+            self.rm.release_texture_ref(path)
+        self.assertEqual(free, [True])
+
+    def test_decode_listener(self):
+        path = self._image("c.png")
+        decoded = threading.Event()
+        seen = []
+
+        def listener(full_path):
+            seen.append(full_path)
+            decoded.set()
+
+        self.rm.add_decode_listener(listener)
+        try:
+            self.rm.prefetch_textures([path])
+            self.assertTrue(decoded.wait(10))
+        finally:
+            self.rm.remove_decode_listener(listener)
+        self.assertEqual(seen, [path])
+
+    def test_failed_decode(self):
+        path = os.path.join(self.tmp, "broken.png")
+        with open(path, "wb") as f:
+            f.write(b"not an image")
+        self.rm.prefetch_textures([path])
+        self._wait_decoded(path)
+        self.assertEqual(self.rm.upload_pending(), [path])
+        with self.rm.async_textures():
+            self.assertIsNone(self.rm.get_texture(path))
+        self.assertFalse(self.rm.is_loading(path))
+
+    def test_image_layer_waits_for_texture(self):
+        path = self._image("d.png")
+        layer = ImageLayer()
+        layer.image_path = path
+        with self.rm.async_textures():
+            layer.initialize()
+            self.assertAlmostEqual(layer.aspect_ratio, 40 / 24)
+            self.assertFalse(layer.prepare())
+
+        self._wait_decoded(path)
+        self.rm.upload_pending()
+        with self.rm.async_textures():
+            self.assertTrue(layer.prepare())
+        self.assertEqual(layer.texture_id, self.rm.get_texture(path))
+        layer.release()
+
+    def test_identical_images_share_texture(self):
+        first = self._image("g.png")
+        second = os.path.join(self.tmp, "copy_of_g.png")
+        shutil.copyfile(first, second)
+        tex = self.rm.get_texture(first)
+        self.assertEqual(self.rm.get_texture(second), tex)
+        self.assertEqual(len([p for p in (first, second) if p in self.rm.texture_cache]), 2)
+
+        # Changed on disk: new content, new texture
+        Image.new("RGBA", (8, 8), (1, 2, 3, 255)).save(second)
+        os.utime(second, ns=(0, os.stat(first).st_mtime_ns + 10**9))
+        self.assertNotEqual(self.rm.get_texture(second), tex)
+        self.assertEqual(self.rm.get_texture(first), tex)
+
+    def test_image_layer_references(self):
+        first, second = self._image("e.png"), self._image("f.png")
+        cache = self.rm.texture_cache
+        layer = ImageLayer()
+        layer.image_path = first
+        layer.initialize()
+        self.assertEqual(cache.ref_count(first), 1)
+
+        layer.image_path = second
+        self.assertTrue(layer.prepare())
+        self.assertEqual((cache.ref_count(first), cache.ref_count(second)), (0, 1))
+        self.assertIn(first, cache) # Unreferenced, kept within the budget
+
+        layer.release()
+        self.assertEqual(cache.ref_count(second), 0)
+        self.assertIsNone(layer.texture_id)
+
+
+if __name__ == '__main__':
+    unittest.main()